@@ -14,6 +14,7 @@ const client_1 = require("@prisma/client");
 const dotenv_1 = __importDefault(require("dotenv"));
 const supabase_1 = require("./utils/supabase");
 const email_1 = require("./utils/email");
+const queryLog_1 = require("./utils/queryLog");
 // Load environment variables
 dotenv_1.default.config();
 // Import routes
@@ -36,12 +37,18 @@ const messageHandlers_1 = require("./sockets/messageHandlers");
 const app = (0, express_1.default)();
 const server = (0, http_1.createServer)(app);
 const PORT = process.env.PORT || 5000;
-// Initialize Prisma
+// Initialize Prisma (PRISMA_DATASOURCE_URL points benchmarks at a database copy)
 exports.prisma = new client_1.PrismaClient({
-    log: process.env.NODE_ENV === "development"
-        ? ["query", "info", "warn", "error"]
-        : ["error"],
+    ...(process.env.PRISMA_DATASOURCE_URL && {
+        datasourceUrl: process.env.PRISMA_DATASOURCE_URL,
+    }),
+    log: queryLog_1.queryLogEnabled
+        ? [{ emit: "event", level: "query" }, "warn", "error"]
+        : process.env.NODE_ENV === "development"
+            ? ["query", "info", "warn", "error"]
+            : ["error"],
 });
+(0, queryLog_1.attachQueryLog)(exports.prisma);
 // Initialize Socket.io with proper CORS
 const io = new socket_io_1.Server(server, {
     cors: {
@@ -68,6 +75,7 @@ app.use((0, helmet_1.default)({
 }));
 // Logging middleware
 app.use((0, morgan_1.default)(process.env.NODE_ENV === "production" ? "combined" : "dev"));
+app.use(queryLog_1.requestCorrelation);
 // CORS middleware
 app.use((0, cors_1.default)({
     origin: [
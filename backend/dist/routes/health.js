@@ -6,6 +6,7 @@ Object.defineProperty(exports, "__esModule", { value: true });
 const express_1 = __importDefault(require("express"));
 const supabase_1 = require("../utils/supabase");
 const email_1 = require("../utils/email");
+const runtimeStats_1 = require("../utils/runtimeStats");
 const router = express_1.default.Router();
 // Health check endpoint
 router.get("/", async (req, res) => {
@@ -57,5 +58,7 @@ router.get("/", async (req, res) => {
         });
     }
 });
+// Process runtime stats for the benchmark harness (enabled by RUNTIME_STATS=1)
+router.get("/runtime", runtimeStats_1.runtimeStats);
 exports.default = router;
 //# sourceMappingURL=health.js.map
\ No newline at end of file
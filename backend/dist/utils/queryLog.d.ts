@@ -0,0 +1,5 @@
+import { PrismaClient } from "@prisma/client";
+import { NextFunction, Request, Response } from "express";
+export declare const queryLogEnabled: boolean;
+export declare const attachQueryLog: (prisma: PrismaClient) => void;
+export declare const requestCorrelation: (req: Request, res: Response, next: NextFunction) => void;
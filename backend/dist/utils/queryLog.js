@@ -0,0 +1,52 @@
+"use strict";
+var __importDefault = (this && this.__importDefault) || function (mod) {
+    return (mod && mod.__esModule) ? mod : { "default": mod };
+};
+Object.defineProperty(exports, "__esModule", { value: true });
+exports.requestCorrelation = exports.attachQueryLog = exports.queryLogEnabled = void 0;
+const fs_1 = __importDefault(require("fs"));
+// Set PRISMA_QUERY_LOG to a file path to append one JSON line per Prisma query,
+// plus start/end markers for every request (keyed by X-Request-Id when sent).
+const sinkPath = process.env.PRISMA_QUERY_LOG;
+const sink = sinkPath ? fs_1.default.createWriteStream(sinkPath, { flags: "a" }) : null;
+exports.queryLogEnabled = sink !== null;
+let requestCounter = 0;
+const writeRecord = (record) => {
+    sink.write(JSON.stringify({ ts: Date.now(), ...record }) + "\n");
+};
+const attachQueryLog = (prisma) => {
+    if (!sink)
+        return;
+    prisma.$on("query", (event) => {
+        writeRecord({
+            type: "query",
+            query: event.query,
+            params: event.params,
+            durationMs: event.duration,
+        });
+    });
+    console.log(`🧾 Prisma query log enabled: ${sinkPath}`);
+};
+exports.attachQueryLog = attachQueryLog;
+const requestCorrelation = (req, res, next) => {
+    if (!sink)
+        return next();
+    const requestId = req.header("x-request-id") || `auto-${++requestCounter}`;
+    writeRecord({
+        type: "request",
+        phase: "start",
+        id: requestId,
+        method: req.method,
+        url: req.originalUrl,
+    });
+    res.on("finish", () => {
+        writeRecord({
+            type: "request",
+            phase: "end",
+            id: requestId,
+            status: res.statusCode,
+        });
+    });
+    next();
+};
+exports.requestCorrelation = requestCorrelation;
@@ -0,0 +1,3 @@
+import { Request, Response } from "express";
+export declare const runtimeStatsEnabled: boolean;
+export declare const runtimeStats: (req: Request, res: Response) => Response<any, Record<string, any>>;
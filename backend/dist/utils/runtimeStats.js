@@ -0,0 +1,58 @@
+"use strict";
+var __importDefault = (this && this.__importDefault) || function (mod) {
+    return (mod && mod.__esModule) ? mod : { "default": mod };
+};
+Object.defineProperty(exports, "__esModule", { value: true });
+exports.runtimeStats = exports.runtimeStatsEnabled = void 0;
+const v8_1 = __importDefault(require("v8"));
+const perf_hooks_1 = require("perf_hooks");
+// Set RUNTIME_STATS=1 to expose GET /health/runtime for the benchmark harness.
+// Event-loop delay and GC pauses are reset on every read, so each response
+// covers the interval since the previous one.
+exports.runtimeStatsEnabled = process.env.RUNTIME_STATS === "1";
+const LOOP_RESOLUTION_MS = 10;
+const loopDelay = (0, perf_hooks_1.monitorEventLoopDelay)({ resolution: LOOP_RESOLUTION_MS });
+const gc = { count: 0, pauseMs: 0, maxPauseMs: 0 };
+if (exports.runtimeStatsEnabled) {
+    loopDelay.enable();
+    new perf_hooks_1.PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+            gc.count += 1;
+            gc.pauseMs += entry.duration;
+            gc.maxPauseMs = Math.max(gc.maxPauseMs, entry.duration);
+        }
+    }).observe({ entryTypes: ["gc"] });
+}
+const toMs = (ns) => (Number.isFinite(ns) ? ns / 1e6 : 0);
+const runtimeStats = (req, res) => {
+    if (!exports.runtimeStatsEnabled) {
+        return res.status(404).json({ message: "Runtime stats are disabled" });
+    }
+    const memory = process.memoryUsage();
+    const stats = {
+        pid: process.pid,
+        timestamp: Date.now(),
+        uptime: process.uptime(),
+        cpu: process.cpuUsage(),
+        memory: {
+            rss: memory.rss,
+            heapUsed: memory.heapUsed,
+            heapTotal: memory.heapTotal,
+            external: memory.external,
+            heapLimit: v8_1.default.getHeapStatistics().heap_size_limit,
+        },
+        eventLoop: {
+            resolutionMs: LOOP_RESOLUTION_MS,
+            meanMs: toMs(loopDelay.mean),
+            p99Ms: toMs(loopDelay.percentile(99)),
+            maxMs: toMs(loopDelay.max),
+        },
+        gc: { ...gc },
+    };
+    loopDelay.reset();
+    gc.count = 0;
+    gc.pauseMs = 0;
+    gc.maxPauseMs = 0;
+    return res.status(200).json(stats);
+};
+exports.runtimeStats = runtimeStats;
@@ -8,6 +8,11 @@ import { PrismaClient } from "@prisma/client";
 import dotenv from "dotenv";
 import { checkDatabaseConnection } from "./utils/supabase";
 import { verifyEmailConnection } from "./utils/email";
+import {
+  attachQueryLog,
+  queryLogEnabled,
+  requestCorrelation,
+} from "./utils/queryLog";
 
 // Load environment variables
 dotenv.config();
@@ -35,13 +40,18 @@ const app = express();
 const server = createServer(app);
 const PORT = process.env.PORT || 5000;
 
-// Initialize Prisma
+// Initialize Prisma (PRISMA_DATASOURCE_URL points benchmarks at a database copy)
 export const prisma = new PrismaClient({
-  log:
-    process.env.NODE_ENV === "development"
+  ...(process.env.PRISMA_DATASOURCE_URL && {
+    datasourceUrl: process.env.PRISMA_DATASOURCE_URL,
+  }),
+  log: queryLogEnabled
+    ? [{ emit: "event", level: "query" }, "warn", "error"]
+    : process.env.NODE_ENV === "development"
       ? ["query", "info", "warn", "error"]
       : ["error"],
 });
+attachQueryLog(prisma);
 
 // Initialize Socket.io with proper CORS
 const io = new Server(server, {
@@ -75,6 +85,7 @@ app.use(
 
 // Logging middleware
 app.use(morgan(process.env.NODE_ENV === "production" ? "combined" : "dev"));
+app.use(requestCorrelation);
 
 // CORS middleware
 app.use(
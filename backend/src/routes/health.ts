@@ -1,6 +1,7 @@
 import express from "express";
 import { supabase } from "../utils/supabase";
 import { verifyEmailConnection } from "../utils/email";
+import { runtimeStats } from "../utils/runtimeStats";
 
 const router = express.Router();
 
@@ -57,4 +58,7 @@ router.get("/", async (req, res) => {
   }
 });
 
+// Process runtime stats for the benchmark harness (enabled by RUNTIME_STATS=1)
+router.get("/runtime", runtimeStats);
+
 export default router;
@@ -0,0 +1,54 @@
+import fs from "fs";
+import { Prisma, PrismaClient } from "@prisma/client";
+import { NextFunction, Request, Response } from "express";
+
+// Set PRISMA_QUERY_LOG to a file path to append one JSON line per Prisma query,
+// plus start/end markers for every request (keyed by X-Request-Id when sent).
+const sinkPath = process.env.PRISMA_QUERY_LOG;
+const sink = sinkPath ? fs.createWriteStream(sinkPath, { flags: "a" }) : null;
+
+export const queryLogEnabled = sink !== null;
+let requestCounter = 0;
+
+const writeRecord = (record: Record<string, unknown>) => {
+  sink!.write(JSON.stringify({ ts: Date.now(), ...record }) + "\n");
+};
+
+export const attachQueryLog = (prisma: PrismaClient) => {
+  if (!sink) return;
+  (prisma as any).$on("query", (event: Prisma.QueryEvent) => {
+    writeRecord({
+      type: "query",
+      query: event.query,
+      params: event.params,
+      durationMs: event.duration,
+    });
+  });
+  console.log(`🧾 Prisma query log enabled: ${sinkPath}`);
+};
+
+export const requestCorrelation = (
+  req: Request,
+  res: Response,
+  next: NextFunction,
+) => {
+  if (!sink) return next();
+  const requestId = req.header("x-request-id") || `auto-${++requestCounter}`;
+
+  writeRecord({
+    type: "request",
+    phase: "start",
+    id: requestId,
+    method: req.method,
+    url: req.originalUrl,
+  });
+  res.on("finish", () => {
+    writeRecord({
+      type: "request",
+      phase: "end",
+      id: requestId,
+      status: res.statusCode,
+    });
+  });
+  next();
+};
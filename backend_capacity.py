@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Capacity Finder for Au Pair Backend API
+Ramps the open-loop arrival rate step by step against an endpoint mix until p99
+breaks the SLO, errors climb or throughput stops tracking the offered load, then
+reports the maximum sustainable throughput overall and per endpoint.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Dict, List
+
+from backend_load import (DEFAULT_CONNECTIONS, LoadResult, build_targets, build_user_targets,
+                          login_for_load, run_load)
+from backend_loadpool import run_pool
+from backend_metrics import RequestMetrics
+from backend_results import save_run
+from backend_test import BASE_URL
+from backend_tokens import pool_tokens
+
+DEFAULT_MIX = [
+    "/api/demo/users/search?role=AU_PAIR",
+    "/api/matches",
+    "/api/conversations"
+]
+DEFAULT_START_RATE = 20.0
+DEFAULT_STEP_FACTOR = 1.5
+DEFAULT_MAX_RATE = 20000.0
+DEFAULT_STEP_DURATION = 20.0
+DEFAULT_COOLDOWN = 3.0
+DEFAULT_SLO_P99_MS = 500.0
+DEFAULT_MAX_ERROR_RATE = 0.01
+# Achieved/offered ratio below which the backend is considered saturated
+SATURATION_RATIO = 0.9
+
+
+def step_verdict(summary: Dict[str, Dict], offered: float, slo_p99_ms: float,
+                 max_error_rate: float) -> Dict:
+    """Evaluate one ramp step across the whole mix and per endpoint"""
+    endpoints = {}
+    for name, stats in summary.items():
+        failures = []
+        if stats["p99"] > slo_p99_ms:
+            failures.append(f"p99 {stats['p99']:.0f}ms > {slo_p99_ms:.0f}ms")
+        if stats["error_rate"] > max_error_rate:
+            failures.append(f"errors {stats['error_rate']*100:.1f}% > {max_error_rate*100:.1f}%")
+        endpoints[name] = {"throughput": stats["throughput"], "p99": stats["p99"],
+                           "error_rate": stats["error_rate"], "failures": failures}
+
+    achieved = sum(stats["throughput"] for stats in summary.values())
+    attempted = sum(stats["attempted"] for stats in summary.values())
+    errors = sum(stats["error_rate"] * stats["attempted"] for stats in summary.values())
+    failures = [f"{name}: {reason}" for name, verdict in endpoints.items() for reason in verdict["failures"]]
+    if offered and achieved < SATURATION_RATIO * offered:
+        failures.append(f"achieved {achieved:.1f} req/s < {SATURATION_RATIO:.0%} of offered {offered:.1f}")
+    return {
+        "offered": offered,
+        "achieved": achieved,
+        "error_rate": errors / attempted if attempted else 0.0,
+        "p99": max((stats["p99"] for stats in summary.values()), default=0.0),
+        "endpoints": endpoints,
+        "failures": failures
+    }
+
+
+def run_step(rate: float, duration: float, targets, workers: int, connections: int) -> LoadResult:
+    """Run one ramp step in-process or across the worker pool"""
+    if workers > 1:
+        return run_pool(rate, duration, workers, connections=connections, targets=targets)
+    return asyncio.run(run_load(rate, duration, connections=connections, targets=targets))
+
+
+def find_capacity(endpoints: List[str] = None, start_rate: float = DEFAULT_START_RATE,
+                  step_factor: float = DEFAULT_STEP_FACTOR, max_rate: float = DEFAULT_MAX_RATE,
+                  step_duration: float = DEFAULT_STEP_DURATION, slo_p99_ms: float = DEFAULT_SLO_P99_MS,
+                  max_error_rate: float = DEFAULT_MAX_ERROR_RATE, workers: int = 1,
+                  connections: int = DEFAULT_CONNECTIONS, cooldown: float = DEFAULT_COOLDOWN,
+                  users: int = 0, metrics: RequestMetrics = None) -> Dict:
+    """Ramp until the mix breaks its SLO and return the step history and capacity
+
+    With metrics, every step's latencies are merged into it keyed by route and offered rate.
+    """
+    if users:
+        targets = build_user_targets(pool_tokens(users), endpoints or DEFAULT_MIX)
+    else:
+        targets = build_targets(login_for_load(), endpoints or DEFAULT_MIX)
+    if not targets:
+        raise ValueError(f"No endpoints match {endpoints}")
+
+    steps = []
+    sustainable: Dict[str, Dict] = {}
+    broken = set()
+    rate = start_rate
+    while rate <= max_rate:
+        print(f"\n=== Ramp step: {rate:.1f} req/s for {step_duration:.0f}s ===")
+        result = run_step(rate, step_duration, targets, workers, connections)
+        verdict = step_verdict(result.summary(), rate, slo_p99_ms, max_error_rate)
+        steps.append(verdict)
+        if metrics is not None:
+            metrics.merge(RequestMetrics.from_dict({f"{key} @ {rate:.1f} req/s": route
+                                                    for key, route in result.metrics.to_dict().items()}))
+
+        # An endpoint's capacity is its throughput at the last step it passed
+        for name, endpoint in verdict["endpoints"].items():
+            if endpoint["failures"]:
+                broken.add(name)
+            elif name not in broken:
+                sustainable[name] = {"offered": rate, "throughput": endpoint["throughput"],
+                                     "p99": endpoint["p99"]}
+
+        status = "✅ PASS" if not verdict["failures"] else "❌ FAIL"
+        print(f"{status}: offered {rate:.1f} req/s, achieved {verdict['achieved']:.1f} req/s, "
+              f"p99 {verdict['p99']:.1f}ms, errors {verdict['error_rate']*100:.2f}%")
+        for failure in verdict["failures"]:
+            print(f"    Details: {failure}")
+        if verdict["failures"]:
+            break
+
+        rate *= step_factor
+        time.sleep(cooldown)
+
+    passed = [step for step in steps if not step["failures"]]
+    return {
+        "slo_p99_ms": slo_p99_ms,
+        "max_error_rate": max_error_rate,
+        "steps": steps,
+        "max_sustainable_rate": passed[-1]["offered"] if passed else 0.0,
+        "max_sustainable_throughput": passed[-1]["achieved"] if passed else 0.0,
+        "endpoints": sustainable,
+        "saturated": bool(steps and steps[-1]["failures"])
+    }
+
+
+def print_capacity(report: Dict):
+    """Print the ramp history and the capacity per endpoint"""
+    print("\n" + "="*50)
+    print("CAPACITY SUMMARY")
+    print("="*50)
+    print(f"SLO: p99 <= {report['slo_p99_ms']:.0f}ms, errors <= {report['max_error_rate']*100:.1f}%")
+    print(f"\n{'offered':>10} {'achieved':>10} {'p99 ms':>10} {'errors':>8}")
+    for step in report["steps"]:
+        marker = "" if not step["failures"] else "  <- knee"
+        print(f"{step['offered']:10.1f} {step['achieved']:10.1f} {step['p99']:10.1f} "
+              f"{step['error_rate']*100:7.2f}%{marker}")
+
+    print(f"\nMax sustainable: {report['max_sustainable_throughput']:.1f} req/s "
+          f"(offered {report['max_sustainable_rate']:.1f} req/s)")
+    if not report["saturated"]:
+        print("⚠️  Ramp ended at --max-rate before the SLO broke; capacity is at least this high")
+    for name, capacity in sorted(report["endpoints"].items()):
+        print(f"  {name}: {capacity['throughput']:.1f} req/s at p99 {capacity['p99']:.1f}ms")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Find the saturation knee of the Au Pair backend")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="path in the endpoint mix (repeatable, default: search/matches/conversations)")
+    parser.add_argument("--start-rate", type=float, default=DEFAULT_START_RATE, help="first step in req/s")
+    parser.add_argument("--step-factor", type=float, default=DEFAULT_STEP_FACTOR,
+                        help="rate multiplier between steps")
+    parser.add_argument("--max-rate", type=float, default=DEFAULT_MAX_RATE, help="stop ramping above this rate")
+    parser.add_argument("--step-duration", type=float, default=DEFAULT_STEP_DURATION, help="seconds per step")
+    parser.add_argument("--cooldown", type=float, default=DEFAULT_COOLDOWN, help="pause between steps")
+    parser.add_argument("--slo-p99", type=float, default=DEFAULT_SLO_P99_MS, help="p99 SLO in milliseconds")
+    parser.add_argument("--max-error-rate", type=float, default=DEFAULT_MAX_ERROR_RATE,
+                        help="highest tolerated error fraction")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes per step")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="maximum concurrent connections")
+    parser.add_argument("--users", type=int, default=0,
+                        help="rotate across this many pre-authenticated pool users")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    print("🚀 Starting Au Pair Backend Capacity Search")
+    print(f"Testing against: {BASE_URL}")
+
+    metrics = RequestMetrics()
+    report = find_capacity(args.endpoints, args.start_rate, args.step_factor, args.max_rate,
+                           args.step_duration, args.slo_p99, args.max_error_rate, args.workers,
+                           args.connections, args.cooldown, args.users, metrics)
+    print_capacity(report)
+    if not args.no_save:
+        save_run("capacity", metrics, dict(vars(args), base_url=BASE_URL), report, args.label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
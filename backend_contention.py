@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Booking Contention Stress Test for Au Pair Backend
+Fires waves of simultaneous, overlapping POST /api/bookings requests from many
+host families at a small set of au pairs, mixed with availability reads, at
+increasing concurrency. Reports throughput, latency and server errors (SQLite
+busy/lock failures surface as 500s), then checks the database for double-bookings.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from backend_load import AsyncHTTPClient
+from backend_metrics import RequestMetrics
+from backend_queries import DB_PATH
+from backend_results import save_run
+from backend_test import BASE_URL
+from backend_tokens import TokenPool
+
+DEFAULT_AU_PAIRS = 3
+DEFAULT_HOSTS = 20
+DEFAULT_CONCURRENCY = "1,8,32"
+DEFAULT_WAVES = 10
+DEFAULT_SLOTS = 4
+DEFAULT_READ_FRACTION = 0.3
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+BOOKING_ROUTE = "POST /api/bookings"
+AVAILABILITY_ROUTE = "GET /api/bookings/au-pair/:id/availability"
+ACTIVE_STATUSES = ("PENDING", "APPROVED")
+
+
+def epoch_ms(value) -> float:
+    """Prisma stores SQLite DateTime as epoch milliseconds or ISO text"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() * 1000.0
+
+
+def iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def prepare_fixtures(db_path: str, hosts: List[Dict], au_pairs: List[Dict]):
+    """Mirror the pool users into the Prisma database with APPROVED host x au pair matches"""
+    now = int(time.time() * 1000)
+    connection = sqlite3.connect(db_path, timeout=30)
+    try:
+        connection.execute("BEGIN")
+        connection.executemany(
+            'INSERT OR IGNORE INTO users (id, email, password, role, isActive, createdAt, updatedAt) '
+            'VALUES (?, ?, ?, ?, 1, ?, ?)',
+            [(user["id"], user["email"], "!contention-fixture", user["role"], now, now) for user in hosts + au_pairs])
+        connection.executemany(
+            'INSERT OR IGNORE INTO matches (id, hostId, auPairId, status, initiatedBy, createdAt, updatedAt) '
+            "VALUES (?, ?, ?, 'APPROVED', 'HOST_FAMILY', ?, ?)",
+            [(str(uuid.uuid4()), host["id"], au_pair["id"], now, now) for host in hosts for au_pair in au_pairs])
+        connection.execute(
+            f"UPDATE matches SET status = 'APPROVED' WHERE auPairId IN ({', '.join('?' for _ in au_pairs)})",
+            [au_pair["id"] for au_pair in au_pairs])
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+
+
+def clear_bookings(db_path: str, au_pairs: List[Dict]) -> int:
+    """Remove earlier bookings for the target au pairs so each level starts from an empty calendar"""
+    connection = sqlite3.connect(db_path, timeout=30)
+    try:
+        cursor = connection.execute(f"DELETE FROM bookings WHERE auPairId IN ({', '.join('?' for _ in au_pairs)})",
+                                    [au_pair["id"] for au_pair in au_pairs])
+        connection.commit()
+        return cursor.rowcount
+    finally:
+        connection.close()
+
+
+def find_double_bookings(db_path: str, au_pairs: List[Dict]) -> Tuple[int, List[Tuple]]:
+    """(active bookings, overlapping pairs) for the target au pairs.
+
+    Overlap uses the route's own inclusive lte/gte comparison, so bookings that
+    merely touch count as a conflict too.
+    """
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            f"SELECT id, auPairId, startDate, endDate FROM bookings "
+            f"WHERE auPairId IN ({', '.join('?' for _ in au_pairs)}) AND status IN ({', '.join('?' for _ in ACTIVE_STATUSES)})",
+            [au_pair["id"] for au_pair in au_pairs] + list(ACTIVE_STATUSES)).fetchall()
+    finally:
+        connection.close()
+    by_au_pair: Dict[str, List[Tuple[float, float, str]]] = {}
+    for booking_id, au_pair_id, start, end in rows:
+        by_au_pair.setdefault(au_pair_id, []).append((epoch_ms(start), epoch_ms(end), booking_id))
+    overlaps = []
+    for au_pair_id, bookings in by_au_pair.items():
+        bookings.sort()
+        for i, (start, end, booking_id) in enumerate(bookings):
+            for other_start, other_end, other_id in bookings[i + 1:]:
+                if other_start > end:
+                    break
+                overlaps.append((au_pair_id, booking_id, other_id))
+    return len(rows), overlaps
+
+
+class ContentionLevel:
+    """Outcomes for one concurrency level"""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.metrics = RequestMetrics()
+        self.outcomes = Counter()
+        self.latencies: Dict[str, List[float]] = {BOOKING_ROUTE: [], AVAILABILITY_ROUTE: []}
+        self.elapsed = 0.0
+        self.bookings = 0
+        self.overlaps: List[Tuple] = []
+
+    def record(self, route: str, status: Optional[int], message: str, seconds: float):
+        self.latencies[route].append(seconds * 1000)
+        if status is None:
+            self.outcomes[f"{route}: {message}"] += 1
+            self.metrics.record_error_as(route, message, {"total": seconds})
+            return
+        self.metrics.record_as(route, status, {"total": seconds})
+        if route == BOOKING_ROUTE:
+            if status == 201:
+                self.outcomes["created"] += 1
+            elif status == 400 and "conflicting" in message:
+                self.outcomes["rejected as conflict"] += 1
+            elif status >= 500:
+                self.outcomes["server error (SQLite busy/lock or other)"] += 1
+            else:
+                self.outcomes[f"booking {status}: {message[:60]}"] += 1
+        elif status >= 500:
+            self.outcomes["availability server error"] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        summary = {}
+        for route, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            pick = lambda pct: ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)] if ordered else 0.0
+            summary[route] = {"requests": len(ordered), "p50": pick(50), "p99": pick(99),
+                              "throughput": len(ordered) / self.elapsed if self.elapsed else 0.0}
+        summary["outcomes"] = dict(self.outcomes)
+        summary["double_bookings"] = len(self.overlaps)
+        return summary
+
+
+def booking_request(rng: random.Random, au_pair: Dict, slots: List[int]) -> Dict:
+    """An overlapping request: a random offset into one of the shared slots"""
+    start = rng.choice(slots) + rng.randrange(12) * HOUR_MS
+    end = start + rng.randint(2, 10) * HOUR_MS
+    return {"targetUserId": au_pair["id"], "startDate": iso(start), "endDate": iso(end),
+            "totalHours": (end - start) // HOUR_MS, "hourlyRate": 15, "notes": "contention stress"}
+
+
+async def _send(client: AsyncHTTPClient, level: ContentionLevel, route: str, method: str, path: str,
+                token: str, body: Dict = None):
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = None
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+        payload = json.dumps(body).encode()
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, payload, headers)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+        level.record(route, None, type(e).__name__, time.perf_counter() - start)
+        return
+    try:
+        message = response.json().get("message", "")
+    except (ValueError, AttributeError):
+        message = ""
+    level.record(route, response.status_code, message, time.perf_counter() - start)
+
+
+async def run_level(concurrency: int, waves: int, hosts: List[Dict], au_pairs: List[Dict],
+                    slots: List[int], read_fraction: float, seed: int) -> ContentionLevel:
+    """Release `waves` bursts of `concurrency` simultaneous requests"""
+    level = ContentionLevel(concurrency)
+    rng = random.Random(f"{seed}:{concurrency}")
+    client = AsyncHTTPClient(BASE_URL, max_connections=concurrency)
+    start = time.perf_counter()
+    try:
+        for _ in range(waves):
+            burst = []
+            for _ in range(concurrency):
+                host = rng.choice(hosts)
+                au_pair = rng.choice(au_pairs)
+                if rng.random() < read_fraction:
+                    window = f"startDate={iso(slots[0])}&endDate={iso(slots[-1] + DAY_MS)}"
+                    burst.append(_send(client, level, AVAILABILITY_ROUTE, "GET",
+                                       f"/api/bookings/au-pair/{au_pair['id']}/availability?{window}",
+                                       host["accessToken"]))
+                else:
+                    burst.append(_send(client, level, BOOKING_ROUTE, "POST", "/api/bookings",
+                                       host["accessToken"], booking_request(rng, au_pair, slots)))
+            await asyncio.gather(*burst)
+    finally:
+        level.elapsed = time.perf_counter() - start
+        await client.close()
+    return level
+
+
+def print_contention_summary(levels: List[ContentionLevel]):
+    print("\n" + "="*50)
+    print("BOOKING CONTENTION SUMMARY")
+    print("="*50)
+    for level in levels:
+        summary = level.summary()
+        status = "❌" if level.overlaps else "✅"
+        print(f"\n{status} concurrency {level.concurrency}: {level.bookings} active bookings, "
+              f"{len(level.overlaps)} double-bookings")
+        for route in (BOOKING_ROUTE, AVAILABILITY_ROUTE):
+            stats = summary[route]
+            if stats["requests"]:
+                print(f"    {route}: {stats['requests']} requests, {stats['throughput']:.1f} req/s, "
+                      f"p50 {stats['p50']:.1f}ms  p99 {stats['p99']:.1f}ms")
+        for outcome, count in level.outcomes.most_common():
+            print(f"    {outcome}: {count}")
+        for au_pair_id, first, second in level.overlaps[:3]:
+            print(f"    Details: au pair {au_pair_id} booked by both {first} and {second}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stress concurrent, overlapping bookings against a few au pairs")
+    parser.add_argument("--au-pairs", type=int, default=DEFAULT_AU_PAIRS, help="au pairs whose calendars collide")
+    parser.add_argument("--hosts", type=int, default=DEFAULT_HOSTS, help="host families sending bookings")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="comma-separated simultaneous requests")
+    parser.add_argument("--waves", type=int, default=DEFAULT_WAVES, help="bursts per concurrency level")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS, help="shared day slots per au pair")
+    parser.add_argument("--read-fraction", type=float, default=DEFAULT_READ_FRACTION,
+                        help="share of requests that read availability instead of booking")
+    parser.add_argument("--db", default=DB_PATH, help="Prisma SQLite database the backend is using")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 2
+    print("🚀 Starting Au Pair booking contention stress")
+    print(f"Testing against: {BASE_URL}, database: {args.db}")
+
+    # Pool users alternate AU_PAIR / HOST_FAMILY by index
+    pool = asyncio.run(TokenPool().ensure(2 * max(args.hosts, args.au_pairs)))
+    hosts = [user for user in pool if user["role"] == "HOST_FAMILY" and user.get("id")][:args.hosts]
+    au_pairs = [user for user in pool if user["role"] == "AU_PAIR" and user.get("id")][:args.au_pairs]
+    if not hosts or not au_pairs:
+        print("❌ Could not obtain pool users for both roles")
+        return 2
+    prepare_fixtures(args.db, hosts, au_pairs)
+
+    tomorrow = (int(time.time() * 1000) // DAY_MS + 1) * DAY_MS
+    slots = [tomorrow + day * DAY_MS for day in range(args.slots)]
+    levels = []
+    for concurrency in (int(level) for level in args.concurrency.split(",") if level):
+        clear_bookings(args.db, au_pairs)
+        print(f"\n▶️  {args.waves} waves of {concurrency} simultaneous requests")
+        level = asyncio.run(run_level(concurrency, args.waves, hosts, au_pairs, slots,
+                                      args.read_fraction, args.seed))
+        level.bookings, level.overlaps = find_double_bookings(args.db, au_pairs)
+        levels.append(level)
+    clear_bookings(args.db, au_pairs)
+
+    print_contention_summary(levels)
+    if not args.no_save:
+        metrics = RequestMetrics()
+        summary = {}
+        for level in levels:
+            for route, route_data in level.metrics.routes.items():
+                metrics.routes[f"{route} [c={level.concurrency}]"] = route_data
+            summary[f"c={level.concurrency}"] = level.summary()
+        save_run("contention", metrics, dict(vars(args), base_url=BASE_URL), summary, args.label)
+    return 1 if any(level.overlaps for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+CPU-profile Capture and Hot-function Report for Au Pair Backend
+Starts backend/dist/index.js under the V8 CPU profiler (node --cpu-prof), drives
+each endpoint or scenario in turn at a fixed rate and splits the resulting
+.cpuprofile by the time window each one was under load. Prints the hottest
+functions by self and total time per route and writes collapsed stacks for
+flamegraph.pl / speedscope.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from backend_load import build_targets, login_for_load, run_load
+from backend_metrics import RequestMetrics
+from backend_queries import BACKEND_DIR, start_backend
+from backend_results import save_run
+from backend_test import BASE_URL, PROTECTED_ENDPOINTS
+
+DEFAULT_RATE = 50.0
+DEFAULT_DURATION = 10.0
+DEFAULT_INTERVAL_US = 1000
+DEFAULT_TOP = 15
+DEFAULT_OUTPUT_DIR = "cpu_profiles"
+# Quiet gap between scenarios so one route's tail does not leak into the next window
+SETTLE_SECONDS = 1.0
+SHUTDOWN_TIMEOUT = 30.0
+DEFAULT_SCENARIOS = [endpoint for method, endpoint in PROTECTED_ENDPOINTS if method == "GET"]
+IDLE = "(idle)"
+# V8 pseudo-frames that are not JavaScript functions
+META_FRAMES = ("(root)", "(program)", IDLE, "(garbage collector)")
+
+
+def frame_name(call_frame: Dict) -> str:
+    """Readable frame label: function plus script location relative to its package or the backend"""
+    function = call_frame.get("functionName") or "(anonymous)"
+    url = call_frame.get("url") or ""
+    if not url:
+        return function
+    if "node_modules/" in url:
+        url = url.rsplit("node_modules/", 1)[1]
+    elif url.startswith("file://"):
+        url = os.path.relpath(url[len("file://"):], BACKEND_DIR)
+    return f"{function} {url}:{call_frame.get('lineNumber', -1) + 1}"
+
+
+def frame_origin(call_frame: Dict) -> str:
+    """Package that owns a frame: an npm package, the app itself, node internals or V8"""
+    url = call_frame.get("url") or ""
+    if "node_modules/" in url:
+        package = url.rsplit("node_modules/", 1)[1].split("/")
+        return "/".join(package[:2]) if package[0].startswith("@") else package[0]
+    if url.startswith("node:"):
+        return "node"
+    if url:
+        return "app"
+    return call_frame.get("functionName") if call_frame.get("functionName") in META_FRAMES else "native"
+
+
+class CpuProfile:
+    """A parsed .cpuprofile with absolute sample times on the monotonic clock"""
+
+    def __init__(self, data: Dict):
+        self.nodes = {node["id"]: node for node in data["nodes"]}
+        self.parent = {child: node["id"] for node in data["nodes"] for child in node.get("children", ())}
+        self._stacks: Dict[int, Tuple[str, ...]] = {}
+        # V8 timestamps are microseconds on CLOCK_MONOTONIC, the clock behind time.monotonic() on Linux
+        times, now = [], data["startTime"]
+        for delta in data["timeDeltas"]:
+            now += delta
+            times.append(now)
+        # Each sample stands for the time until the next one
+        weights = [later - earlier for earlier, later in zip(times, times[1:])] + \
+            [max(data["endTime"] - times[-1], 0)] if times else []
+        self.samples = [(at / 1e6, node, weight) for at, node, weight in zip(times, data["samples"], weights)]
+
+    @classmethod
+    def load(cls, path: str) -> "CpuProfile":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def stack(self, node_id: int) -> Tuple[str, ...]:
+        """Frame labels from the outermost caller to node_id, without (root)"""
+        if node_id not in self._stacks:
+            frames = []
+            current = node_id
+            while current in self.nodes:
+                frames.append(frame_name(self.nodes[current]["callFrame"]))
+                current = self.parent.get(current)
+            self._stacks[node_id] = tuple(reversed(frames[:-1] if len(frames) > 1 else frames))
+        return self._stacks[node_id]
+
+    def window(self, start: float = None, end: float = None) -> List[Tuple[int, int]]:
+        """(node, weight in us) for samples taken between start and end (monotonic seconds)"""
+        return [(node, weight) for at, node, weight in self.samples
+                if (start is None or at >= start) and (end is None or at <= end)]
+
+
+def analyze(profile: CpuProfile, samples: List[Tuple[int, int]]) -> Dict:
+    """Self/total time per function, self time per package and collapsed stacks"""
+    self_time, total_time, origins, folded = Counter(), Counter(), Counter(), Counter()
+    wall = idle = 0
+    for node, weight in samples:
+        wall += weight
+        call_frame = profile.nodes[node]["callFrame"]
+        if call_frame.get("functionName") == IDLE:
+            idle += weight
+            continue
+        stack = profile.stack(node)
+        self_time[stack[-1]] += weight
+        # Recursive functions count once per sample towards their total time
+        for frame in set(stack):
+            total_time[frame] += weight
+        origins[frame_origin(call_frame)] += weight
+        folded[";".join(stack)] += weight
+    busy = wall - idle
+    return {
+        "samples": len(samples),
+        "wall_ms": wall / 1000,
+        "busy_ms": busy / 1000,
+        "cpu_share": busy / wall if wall else 0.0,
+        "hot": [(frame, weight / 1000, total_time[frame] / 1000) for frame, weight in self_time.most_common()],
+        "origins": {origin: weight / 1000 for origin, weight in origins.most_common()},
+        "folded": folded,
+    }
+
+
+def write_folded(path: str, folded: Counter):
+    """Collapsed stacks ("a;b;c <microseconds>"), the input format of flamegraph.pl and speedscope"""
+    with open(path, "w") as f:
+        for stack, weight in sorted(folded.items()):
+            # Semicolons separate frames, so they cannot appear inside one
+            stack = ";".join(frame.replace(";", ",") for frame in stack.split(";"))
+            f.write(f"{stack} {weight}\n")
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") or "root"
+
+
+def scenario_targets(token: Optional[str], scenario: str) -> List:
+    """Load targets for a comma-separated list of paths; unknown paths become plain GETs"""
+    paths = [path for path in scenario.split(",") if path]
+    targets = build_targets(token, paths)
+    known = {target[2] for target in targets} | {target[0] for target in targets}
+    auth_headers = {"Authorization": f"Bearer {token}"} if token else {}
+    for path in paths:
+        if path not in known:
+            targets.append((f"GET {path}", "GET", path, None, dict(auth_headers)))
+    return targets
+
+
+def capture(scenarios: List[str], rate: float, duration: float, interval_us: int,
+            profile_dir: str) -> Tuple[Optional[str], List[Dict]]:
+    """Profile the backend while each scenario runs; returns the .cpuprofile path and the phases"""
+    node_args = ["--cpu-prof", f"--cpu-prof-dir={profile_dir}", f"--cpu-prof-interval={interval_us}"]
+    process = start_backend(None, node_args=node_args)
+    phases = []
+    try:
+        token = login_for_load()
+        for scenario in scenarios:
+            print(f"\n▶️  {scenario} at {rate:g} req/s for {duration:g}s")
+            targets = scenario_targets(token, scenario)
+            start = time.monotonic()
+            result = asyncio.run(run_load(rate, duration, targets=targets))
+            phases.append({"name": scenario, "start": start, "end": time.monotonic(), "result": result})
+            time.sleep(SETTLE_SECONDS)
+    finally:
+        # The profile is only written when node exits normally; SIGINT goes through gracefulShutdown
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    profiles = sorted(glob.glob(os.path.join(profile_dir, "*.cpuprofile")), key=os.path.getmtime)
+    return (profiles[-1] if profiles else None), phases
+
+
+def print_hot_functions(name: str, stats: Dict, top: int, requests: int = None):
+    busy = stats["busy_ms"]
+    line = f"\n🔥 {name}: {busy:.0f}ms CPU over {stats['wall_ms']:.0f}ms ({stats['cpu_share'] * 100:.0f}% busy)"
+    if requests:
+        line += f", {busy / requests:.2f}ms CPU per request"
+    print(line)
+    if not busy:
+        return
+    origins = ", ".join(f"{origin} {ms / busy * 100:.0f}%" for origin, ms in list(stats["origins"].items())[:6])
+    print(f"    By package: {origins}")
+    print(f"    {'self ms':>9} {'self%':>6} {'total ms':>9} {'total%':>7}  function")
+    for frame, self_ms, total_ms in stats["hot"][:top]:
+        print(f"    {self_ms:9.1f} {self_ms / busy * 100:5.1f}% {total_ms:9.1f} {total_ms / busy * 100:6.1f}%  {frame}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Capture a V8 CPU profile per endpoint and report hot functions")
+    parser.add_argument("--endpoint", action="append", dest="scenarios",
+                        help="path to drive (repeatable); comma-separate paths to profile them as one scenario")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second per scenario")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per scenario")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL_US, help="sampling interval in microseconds")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="hot functions to list per route")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help="where the .cpuprofile and the .folded stacks are written")
+    parser.add_argument("--analyze", metavar="CPUPROFILE", help="only report on an existing .cpuprofile")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.analyze:
+        profile = CpuProfile.load(args.analyze)
+        stats = analyze(profile, profile.window())
+        print_hot_functions(os.path.basename(args.analyze), stats, args.top)
+        name = os.path.splitext(os.path.basename(args.analyze))[0]
+        folded_path = os.path.join(args.output_dir, f"{slug(name)}.folded")
+        write_folded(folded_path, stats["folded"])
+        print(f"\nCollapsed stacks written to {folded_path}")
+        return 0
+
+    print("🚀 Starting Au Pair CPU profile")
+    print(f"Testing against: {BASE_URL}")
+    profile_dir = tempfile.mkdtemp(prefix="cpuprof-")
+    try:
+        try:
+            profile_path, phases = capture(args.scenarios or DEFAULT_SCENARIOS, args.rate, args.duration,
+                                           args.interval, profile_dir)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        if not profile_path:
+            print("❌ node exited without writing a .cpuprofile")
+            return 1
+        saved_profile = os.path.join(args.output_dir, f"backend-{time.strftime('%Y%m%d-%H%M%S')}.cpuprofile")
+        shutil.copy(profile_path, saved_profile)
+    finally:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+    profile = CpuProfile.load(saved_profile)
+    metrics = RequestMetrics()
+    summary = {}
+    # One flame graph for every route, with the route as the outermost frame
+    combined = Counter()
+    print("\n" + "="*50)
+    print("CPU PROFILE BY ROUTE")
+    print("="*50)
+    for phase in phases:
+        stats = analyze(profile, profile.window(phase["start"], phase["end"]))
+        if not stats["samples"]:
+            print(f"\n⚠️  {phase['name']}: no samples in its window (profile clock not aligned?)")
+            continue
+        result = phase["result"]
+        metrics.merge(result.metrics)
+        requests = sum(route["completed"] for route in result.summary().values())
+        print_hot_functions(phase["name"], stats, args.top, requests)
+        write_folded(os.path.join(args.output_dir, f"{slug(phase['name'])}.folded"), stats["folded"])
+        combined.update({f"{phase['name']};{stack}": weight for stack, weight in stats["folded"].items()})
+        summary[phase["name"]] = {
+            "busy_ms": stats["busy_ms"], "wall_ms": stats["wall_ms"], "requests": requests,
+            "cpu_ms_per_request": stats["busy_ms"] / requests if requests else None,
+            "origins": stats["origins"], "hot": stats["hot"][:args.top],
+        }
+
+    write_folded(os.path.join(args.output_dir, "all_routes.folded"), combined)
+    print(f"\nProfile: {saved_profile} (open in Chrome DevTools > Performance)")
+    print(f"Collapsed stacks: {args.output_dir}/<route>.folded (flamegraph.pl or speedscope)")
+    metrics.print_summary()
+    if not args.no_save:
+        save_run("cpuprofile", metrics, dict(vars(args), base_url=BASE_URL), summary, args.label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Bulk Synthetic Data Generator for Au Pair Backend
+Streams millions of realistic rows that follow backend/prisma/schema.prisma
+(users, profiles, matches, messages, availability, bookings, documents) into the
+Prisma SQLite database with batched executemany inside large transactions.
+Rows come from generators and ids are derived from the seed and row index, so
+memory stays constant and the same seed always produces the same database.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "prisma", "dev.db")
+EMAIL_DOMAIN = "synthetic.demo"
+PASSWORD = "password123"
+DEFAULT_USERS = 100000
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_TRANSACTION_ROWS = 250000
+# Out of every 10 consecutive users this many are host families, the rest au pairs
+HOSTS_PER_TEN = 3
+DAY_MS = 24 * 60 * 60 * 1000
+HISTORY_DAYS = 730
+
+FIRST_NAMES = ["Marie", "Sofia", "Emma", "Lucia", "Anna", "Laura", "Julia", "Elena", "Hannah", "Chloe",
+               "Lena", "Mia", "Clara", "Nora", "Ines", "Eva", "Maja", "Olivia", "Lucas", "Mateo"]
+LAST_NAMES = ["Dubois", "Garcia", "Rossi", "Müller", "Silva", "Novak", "Jensen", "Kowalski", "Martin",
+              "Fischer", "Lopez", "Bianchi", "Santos", "Larsen", "Nowak", "Schmidt", "Moreau", "Costa"]
+FAMILY_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Miller", "Mueller", "Wilson", "Taylor",
+                "Anderson", "Thomas", "Moore", "Clark", "Walker", "Young", "King", "Wright"]
+LANGUAGES = ["English", "Spanish", "French", "German", "Italian", "Portuguese", "Dutch", "Swedish",
+             "Polish", "Mandarin", "Japanese"]
+SKILLS = ["Childcare", "Cooking", "Swimming", "First Aid", "Driving", "Tutoring", "Music", "Arts & Crafts",
+          "Sports", "Housekeeping"]
+LOCATIONS = {
+    "USA": ["New York", "Boston", "San Francisco", "Chicago", "Seattle"],
+    "Canada": ["Toronto", "Vancouver", "Montreal"],
+    "Australia": ["Sydney", "Melbourne", "Brisbane"],
+    "Germany": ["Munich", "Berlin", "Hamburg"],
+    "United Kingdom": ["London", "Manchester", "Edinburgh"],
+    "France": ["Paris", "Lyon"],
+    "Netherlands": ["Amsterdam", "Utrecht"]
+}
+COUNTRIES = list(LOCATIONS)
+MESSAGE_TEMPLATES = [
+    "Hi! I saw your profile and would love to chat.",
+    "Thanks for reaching out. When would you be available for a video call?",
+    "How old are the children and what are their routines like?",
+    "I have {years} years of childcare experience and speak {language}.",
+    "Could you start on {date}?",
+    "That works for us, looking forward to it!",
+    "Do you have a driving licence?",
+    "We live close to a great park and the school is a short walk away."
+]
+TIME_SLOTS = [("08:00", "12:00"), ("09:00", "13:00"), ("13:00", "17:00"), ("14:00", "18:00"), ("18:00", "22:00")]
+DOCUMENT_TYPES = ["ID", "PASSPORT", "VISA", "PROFILE_PHOTO"]
+
+
+def entity_id(seed: int, kind: str, index: int) -> str:
+    """Deterministic UUID for row #index of kind, recomputable without storing it"""
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+def random_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+class Layout:
+    """Maps role-local indices (k-th host, k-th au pair) to global user indices"""
+
+    def __init__(self, users: int):
+        full, remainder = divmod(users, 10)
+        self.users = users
+        self.hosts = full * HOSTS_PER_TEN + min(remainder, HOSTS_PER_TEN)
+        self.au_pairs = users - self.hosts
+
+    @staticmethod
+    def is_host(index: int) -> bool:
+        return index % 10 < HOSTS_PER_TEN
+
+    @staticmethod
+    def host_user(k: int) -> int:
+        return (k // HOSTS_PER_TEN) * 10 + k % HOSTS_PER_TEN
+
+    @staticmethod
+    def au_pair_user(k: int) -> int:
+        per_ten = 10 - HOSTS_PER_TEN
+        return (k // per_ten) * 10 + HOSTS_PER_TEN + k % per_ten
+
+
+class Generator:
+    """Row generators for every table; each table draws from its own seeded stream"""
+
+    def __init__(self, seed: int, users: int, matches_per_host: int, messages_per_match: int,
+                 availability_per_au_pair: int, bookings_per_match: float, documents_per_user: int,
+                 password_hash: str, now_ms: int = None):
+        self.seed = seed
+        self.layout = Layout(users)
+        self.matches_per_host = matches_per_host
+        self.messages_per_match = messages_per_match
+        self.availability_per_au_pair = availability_per_au_pair
+        self.bookings_per_match = bookings_per_match
+        self.documents_per_user = documents_per_user
+        self.password_hash = password_hash
+        # Pin "now" to a whole day so a seed reproduces the same rows within that day
+        self.now_ms = now_ms if now_ms is not None else int(time.time() * 1000) // DAY_MS * DAY_MS
+
+    def rng(self, table: str) -> random.Random:
+        return random.Random(f"{self.seed}:{table}")
+
+    def user_id(self, index: int) -> str:
+        return entity_id(self.seed, "user", index)
+
+    def email(self, index: int) -> str:
+        return f"gen{self.seed}_{index:08d}@{EMAIL_DOMAIN}"
+
+    def past(self, rng: random.Random, days: int = HISTORY_DAYS) -> int:
+        return self.now_ms - rng.randrange(days * DAY_MS)
+
+    def users(self) -> Iterator[Tuple]:
+        rng = self.rng("users")
+        for index in range(self.layout.users):
+            created = self.past(rng)
+            role = "HOST_FAMILY" if self.layout.is_host(index) else "AU_PAIR"
+            plan = rng.choices(["FREE", "STANDARD", "PREMIUM", "VERIFIED"], [70, 15, 10, 5])[0]
+            yield (self.user_id(index), self.email(index), self.password_hash, role,
+                   int(rng.random() < 0.97), int(rng.random() < 0.8),
+                   created + rng.randrange(max(1, self.now_ms - created)),
+                   rng.choice(LANGUAGES).lower()[:2], int(rng.random() < 0.85), plan,
+                   ("FAMILY" if role == "HOST_FAMILY" else "AU_PAIR") if plan != "FREE" else None,
+                   self.now_ms + rng.randrange(365) * DAY_MS if plan != "FREE" else None,
+                   created, created)
+
+    def au_pair_profiles(self) -> Iterator[Tuple]:
+        rng = self.rng("au_pair_profiles")
+        for k in range(self.layout.au_pairs):
+            index = self.layout.au_pair_user(k)
+            created = self.past(rng)
+            available_from = self.now_ms + rng.randint(-60, 240) * DAY_MS
+            years = rng.randint(0, 8)
+            yield (entity_id(self.seed, "au_pair_profile", k), self.user_id(index),
+                   rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                   self.now_ms - int(rng.uniform(18, 33) * 365.25 * DAY_MS),
+                   f"Au pair with {years} years of childcare experience who loves {rng.choice(SKILLS).lower()}.",
+                   json.dumps(rng.sample(LANGUAGES, rng.randint(1, 4))),
+                   json.dumps(rng.sample(SKILLS, rng.randint(2, 5))),
+                   f"{years} years of experience working with children aged {rng.randint(0, 4)}-{rng.randint(5, 14)}",
+                   rng.choice(["High school", "Bachelor in Education", "Childcare diploma", "Nursing student"]),
+                   json.dumps(rng.sample(COUNTRIES, rng.randint(1, 3))),
+                   float(rng.randint(10, 25)), "USD",
+                   available_from, available_from + rng.randint(90, 720) * DAY_MS,
+                   created, created)
+
+    def host_family_profiles(self) -> Iterator[Tuple]:
+        rng = self.rng("host_family_profiles")
+        for k in range(self.layout.hosts):
+            index = self.layout.host_user(k)
+            created = self.past(rng)
+            country = rng.choice(COUNTRIES)
+            children = rng.randint(1, 4)
+            family = rng.choice(FAMILY_NAMES)
+            yield (entity_id(self.seed, "host_family_profile", k), self.user_id(index),
+                   f"The {family} Family", f"{rng.choice(FIRST_NAMES)} {family}",
+                   f"Friendly family of {children + 2} looking for a caring au pair.",
+                   rng.choice(LOCATIONS[country]), country, children,
+                   json.dumps(sorted(rng.randint(0, 17) for _ in range(children))),
+                   rng.choice(["Non-smoker", "Driving licence required", "Comfortable with pets", None]),
+                   json.dumps(rng.sample(LANGUAGES, rng.randint(1, 2))),
+                   float(rng.randint(12, 30)), "USD", created, created)
+
+    def match_pairs(self) -> Iterator[Tuple[int, int, int, str]]:
+        """(host k, au pair k, createdAt, status) per match; replayed by dependent tables"""
+        rng = self.rng("matches")
+        for host in range(self.layout.hosts):
+            count = min(rng.randint(0, 2 * self.matches_per_host), self.layout.au_pairs)
+            for au_pair in rng.sample(range(self.layout.au_pairs), count):
+                status = rng.choices(["PENDING", "APPROVED", "REJECTED"], [40, 45, 15])[0]
+                yield host, au_pair, self.past(rng, 365), status
+
+    def matches(self) -> Iterator[Tuple]:
+        rng = self.rng("match_details")
+        for number, (host, au_pair, created, status) in enumerate(self.match_pairs()):
+            yield (entity_id(self.seed, "match", number), self.user_id(self.layout.host_user(host)),
+                   self.user_id(self.layout.au_pair_user(au_pair)), float(rng.randint(40, 100)), status,
+                   rng.choice(["HOST_FAMILY", "AU_PAIR"]), None, created, created + rng.randrange(7 * DAY_MS))
+
+    def messages(self) -> Iterator[Tuple]:
+        rng = self.rng("messages")
+        for host, au_pair, created, status in self.match_pairs():
+            if status == "REJECTED":
+                continue
+            people = (self.user_id(self.layout.host_user(host)), self.user_id(self.layout.au_pair_user(au_pair)))
+            sent = created
+            for turn in range(rng.randint(0, 2 * self.messages_per_match)):
+                sent += rng.randrange(10 * 60 * 1000, 2 * DAY_MS)
+                sender = people[(turn + rng.randint(0, 1)) % 2]
+                receiver = people[1] if sender == people[0] else people[0]
+                content = rng.choice(MESSAGE_TEMPLATES).format(
+                    years=rng.randint(1, 8), language=rng.choice(LANGUAGES),
+                    date=time.strftime("%B %d", time.gmtime((sent + 30 * DAY_MS) / 1000)))
+                yield (random_id(rng), sender, receiver, content, int(sent < self.now_ms - DAY_MS), sent, sent)
+
+    def availability(self) -> Iterator[Tuple]:
+        rng = self.rng("availability")
+        for k in range(self.layout.au_pairs):
+            user = self.user_id(self.layout.au_pair_user(k))
+            for day in sorted(rng.sample(range(60), min(60, rng.randint(0, 2 * self.availability_per_au_pair)))):
+                start, end = rng.choice(TIME_SLOTS)
+                created = self.now_ms - rng.randrange(30) * DAY_MS
+                yield (random_id(rng), user, self.now_ms + day * DAY_MS, start, end, "UTC", created, created)
+
+    def bookings(self) -> Iterator[Tuple]:
+        rng = self.rng("bookings")
+        for host, au_pair, created, status in self.match_pairs():
+            if status != "APPROVED":
+                continue
+            host_id = self.user_id(self.layout.host_user(host))
+            au_pair_id = self.user_id(self.layout.au_pair_user(au_pair))
+            count = int(self.bookings_per_match) + (rng.random() < self.bookings_per_match % 1)
+            for _ in range(count):
+                start = self.now_ms + rng.randint(-90, 90) * DAY_MS + rng.choice([8, 9, 13, 14]) * 3600 * 1000
+                hours = float(rng.randint(2, 8))
+                rate = float(rng.randint(10, 25))
+                booking_status = rng.choices(["PENDING", "APPROVED", "REJECTED", "CANCELLED", "COMPLETED"],
+                                             [25, 35, 10, 10, 20])[0]
+                requester, receiver = (host_id, au_pair_id) if rng.random() < 0.7 else (au_pair_id, host_id)
+                yield (random_id(rng), au_pair_id, host_id, receiver, requester, start,
+                       start + int(hours * 3600 * 1000), start, hours, rate, hours * rate, "USD",
+                       booking_status, None, created, created)
+
+    def documents(self) -> Iterator[Tuple]:
+        rng = self.rng("documents")
+        for index in range(self.layout.users):
+            user = self.user_id(index)
+            for doc_type in rng.sample(DOCUMENT_TYPES, min(len(DOCUMENT_TYPES), rng.randint(0, 2 * self.documents_per_user))):
+                uploaded = self.past(rng)
+                status = rng.choices(["PENDING", "VERIFIED", "REJECTED"], [30, 60, 10])[0]
+                extension = "jpg" if doc_type == "PROFILE_PHOTO" else "pdf"
+                filename = f"{random_id(rng)}.{extension}"
+                yield (random_id(rng), user, doc_type, status, filename, f"{doc_type.lower()}.{extension}",
+                       f"/uploads/documents/{filename}", uploaded,
+                       uploaded + DAY_MS if status == "VERIFIED" else None, None, None)
+
+
+# (table, columns, generator method) in foreign-key order
+TABLES: List[Tuple[str, Sequence[str], str]] = [
+    ("users", ("id", "email", "password", "role", "isActive", "isEmailVerified", "lastLogin",
+               "preferredlanguage", "profilecompleted", "planType", "planRole", "planExpiry",
+               "createdAt", "updatedAt"), "users"),
+    ("au_pair_profiles", ("id", "userId", "firstName", "lastName", "dateOfBirth", "bio", "languages", "skills",
+                          "experience", "education", "preferredCountries", "hourlyRate", "currency",
+                          "availableFrom", "availableTo", "createdAt", "updatedAt"), "au_pair_profiles"),
+    ("host_family_profiles", ("id", "userId", "familyName", "contactPersonName", "bio", "location", "country",
+                              "numberOfChildren", "childrenAges", "requirements", "preferredLanguages",
+                              "maxBudget", "currency", "createdAt", "updatedAt"), "host_family_profiles"),
+    ("matches", ("id", "hostId", "auPairId", "matchScore", "status", "initiatedBy", "notes", "createdAt",
+                 "updatedAt"), "matches"),
+    ("messages", ("id", "senderId", "receiverId", "content", "isRead", "createdAt", "updatedAt"), "messages"),
+    ("availability", ("id", "userId", "date", "startTime", "endTime", "timezone", "createdAt", "updatedAt"),
+     "availability"),
+    ("bookings", ("id", "auPairId", "hostId", "receiverId", "requesterId", "startDate", "endDate",
+                  "scheduledDate", "totalHours", "hourlyRate", "totalAmount", "currency", "status", "notes",
+                  "createdAt", "updatedAt"), "bookings"),
+    ("documents", ("id", "userId", "type", "status", "filename", "originalName", "url", "uploadedAt",
+                   "verifiedAt", "verifiedBy", "notes"), "documents")
+]
+
+
+def insert_rows(connection: sqlite3.Connection, table: str, columns: Sequence[str], rows: Iterable[Tuple],
+                batch_size: int = DEFAULT_BATCH_SIZE, transaction_rows: int = DEFAULT_TRANSACTION_ROWS) -> int:
+    """Stream rows into table with executemany, committing every transaction_rows rows"""
+    sql = (f'INSERT INTO "{table}" ({", ".join(f"{chr(34)}{column}{chr(34)}" for column in columns)}) '
+           f'VALUES ({", ".join("?" for _ in columns)})')
+    rows = iter(rows)
+    inserted = pending = 0
+    start = time.perf_counter()
+    connection.execute("BEGIN")
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        connection.executemany(sql, batch)
+        inserted += len(batch)
+        pending += len(batch)
+        if pending >= transaction_rows:
+            connection.execute("COMMIT")
+            connection.execute("BEGIN")
+            pending = 0
+            elapsed = time.perf_counter() - start
+            print(f"    {table}: {inserted:,} rows ({inserted / elapsed:,.0f} rows/s)")
+    connection.execute("COMMIT")
+    return inserted
+
+
+def password_hash() -> str:
+    """bcrypt hash of PASSWORD (cost 12 like prisma/seed.ts) so generated users can log in"""
+    try:
+        import bcrypt
+    except ImportError:
+        print("⚠️  bcrypt not installed; generated users get an unusable password hash")
+        return "!synthetic-no-login"
+    return bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(12)).decode()
+
+
+# Child tables and their user foreign keys, deleted before the users themselves
+USER_REFERENCES = [
+    ("au_pair_profiles", ("userId",)), ("host_family_profiles", ("userId",)),
+    ("matches", ("hostId", "auPairId")), ("messages", ("senderId", "receiverId")),
+    ("availability", ("userId",)), ("bookings", ("auPairId", "hostId")), ("documents", ("userId",))
+]
+
+
+def delete_generated(connection: sqlite3.Connection, seed: int) -> int:
+    """Remove users from a previous run with this seed, together with their rows.
+
+    The child foreign-key columns have no indexes, so ON DELETE CASCADE would scan
+    every child table once per user; one IN (subquery) delete per column is linear.
+    """
+    generated = "SELECT id FROM users WHERE email LIKE ? ESCAPE '\\'"
+    pattern = (f"gen{seed}\\_%@{EMAIL_DOMAIN}",)
+    connection.execute("BEGIN")
+    for table, columns in USER_REFERENCES:
+        for column in columns:
+            connection.execute(f'DELETE FROM "{table}" WHERE "{column}" IN ({generated})', pattern)
+    cursor = connection.execute(f"DELETE FROM users WHERE id IN ({generated})", pattern)
+    connection.execute("COMMIT")
+    return cursor.rowcount
+
+
+def generate(db_path: str, generator: Generator, tables: Sequence[str] = None,
+             batch_size: int = DEFAULT_BATCH_SIZE, transaction_rows: int = DEFAULT_TRANSACTION_ROWS,
+             reset: bool = False) -> Dict[str, int]:
+    """Fill db_path table by table and return rows inserted per table"""
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # Durability is not needed for throwaway benchmark data; ids are consistent by construction
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.execute("PRAGMA cache_size = -262144")
+        connection.execute("PRAGMA foreign_keys = OFF")
+
+        existing = connection.execute("SELECT COUNT(*) FROM users WHERE email = ?",
+                                      (generator.email(0),)).fetchone()[0]
+        if existing and not reset:
+            raise ValueError(f"Seed {generator.seed} was already generated into {db_path}; pass --reset")
+        if existing:
+            print(f"🧹 Removed {delete_generated(connection, generator.seed):,} previously generated users")
+
+        counts = {}
+        for table, columns, method in TABLES:
+            if tables and table not in tables:
+                continue
+            print(f"📥 {table}")
+            counts[table] = insert_rows(connection, table, columns, getattr(generator, method)(),
+                                        batch_size, transaction_rows)
+        connection.execute("ANALYZE")
+        return counts
+    finally:
+        connection.close()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream synthetic rows into the Prisma SQLite database")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database (default: backend/prisma/dev.db)")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="users to create (30%% host families)")
+    parser.add_argument("--matches-per-host", type=int, default=10, help="average matches per host family")
+    parser.add_argument("--messages-per-match", type=int, default=15, help="average messages per conversation")
+    parser.add_argument("--availability-per-au-pair", type=int, default=10, help="average availability slots")
+    parser.add_argument("--bookings-per-match", type=float, default=1.5,
+                        help="average bookings per approved match")
+    parser.add_argument("--documents-per-user", type=int, default=1, help="average documents per user")
+    parser.add_argument("--table", action="append", dest="tables", choices=[table for table, _, _ in TABLES],
+                        help="only fill this table (repeatable)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per executemany")
+    parser.add_argument("--transaction-rows", type=int, default=DEFAULT_TRANSACTION_ROWS,
+                        help="rows per committed transaction")
+    parser.add_argument("--reset", action="store_true", help="delete rows from a previous run with this seed")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ {args.db} not found; run the Prisma migrations first")
+        return 1
+
+    print(f"🌱 Generating synthetic data into {args.db} (seed {args.seed})")
+    generator = Generator(args.seed, args.users, args.matches_per_host, args.messages_per_match,
+                          args.availability_per_au_pair, args.bookings_per_match, args.documents_per_user,
+                          password_hash())
+    start = time.perf_counter()
+    try:
+        counts = generate(args.db, generator, args.tables, args.batch_size, args.transaction_rows, args.reset)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    print(f"\n✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, count in counts.items():
+        print(f"    {table}: {count:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+SQLite Query-plan and Index Advisor for Au Pair Backend
+Captures the distinct SQL Prisma emits while the API suite runs, explains each
+statement against a copy of backend/prisma/dev.db, flags full table scans and
+temp B-tree sorts, proposes indexes and measures the affected endpoints before
+and after applying them to a second copy. dev.db itself is never modified.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from backend_metrics import normalize_route
+from backend_queries import DB_PATH, DEFAULT_ENDPOINTS, statement_shape, start_backend
+from backend_test import BASE_URL, DEMO_CREDENTIALS, APITester
+
+SCHEMA_PATH = os.path.join(os.path.dirname(DB_PATH), "schema.prisma")
+DEFAULT_REQUESTS = 30
+WARMUP_REQUESTS = 3
+
+IDENT = r"[`\"]?(\w+)[`\"]?"
+SCAN = re.compile(rf"^SCAN (?:TABLE )?(?:{IDENT}\.)?{IDENT}(?: AS \w+)?$")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (.+)$")
+CLAUSE_END = re.compile(r"\s(?:ORDER BY|GROUP BY|LIMIT|OFFSET)\s", re.IGNORECASE)
+EQUALITY_OPS = ("=", "IN")
+
+
+def read_statements(log_path: str) -> Dict[str, Dict]:
+    """Distinct statements from a PRISMA_QUERY_LOG file with the requests that ran them"""
+    statements: Dict[str, Dict] = {}
+    current = None
+    with open(log_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("type") == "request":
+                current = (record["method"], record["url"]) if record["phase"] == "start" else None
+                continue
+            if record.get("type") != "query":
+                continue
+            shape = statement_shape(record["query"])
+            statement = statements.setdefault(shape, {"query": record["query"], "params": record.get("params", ""),
+                                                      "count": 0, "db_ms": 0, "endpoints": set()})
+            statement["count"] += 1
+            statement["db_ms"] += record.get("durationMs", 0)
+            if current:
+                statement["endpoints"].add(current)
+    return statements
+
+
+def explain(connection: sqlite3.Connection, query: str, params: str) -> Optional[List[str]]:
+    """EXPLAIN QUERY PLAN detail lines, or None for statements SQLite cannot plan here"""
+    try:
+        values = json.loads(params) if params else []
+        return [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", values)]
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def plan_issues(plan: List[str]) -> List[Tuple[str, str]]:
+    """(kind, detail) for full table scans and temp B-tree sorts in a plan"""
+    issues = []
+    for detail in plan:
+        scan = SCAN.match(detail)
+        if scan:
+            issues.append(("scan", scan.group(2)))
+        sort = TEMP_SORT.search(detail)
+        if sort:
+            issues.append(("sort", sort.group(1)))
+    return issues
+
+
+def _column_refs(clause: str, table: str) -> List[Tuple[str, str]]:
+    """(column, operator) pairs for predicates on table within a SQL fragment"""
+    pattern = re.compile(rf"(?:{IDENT}\.)?[`\"]?{re.escape(table)}[`\"]?\.{IDENT}\s*(=|IN\b|>=|<=|>|<|LIKE\b)",
+                         re.IGNORECASE)
+    return [(match.group(2), match.group(3).upper()) for match in pattern.finditer(clause)]
+
+
+def _order_columns(query: str, table: str) -> List[str]:
+    match = re.search(r"\sORDER BY\s(.+?)(?:\sLIMIT\s|\sOFFSET\s|$)", query, re.IGNORECASE | re.DOTALL)
+    if not match:
+        return []
+    pattern = re.compile(rf"(?:{IDENT}\.)?[`\"]?{re.escape(table)}[`\"]?\.{IDENT}")
+    return [m.group(2) for m in pattern.finditer(match.group(1))]
+
+
+def propose_indexes(query: str, table: str) -> List[Tuple[str, ...]]:
+    """Candidate index column lists for a statement that scans or sorts table.
+
+    Equality columns come first, then ORDER BY columns (or one range column), the
+    usual left-prefix layout. OR-ed predicates get one index per column instead.
+    """
+    where = re.search(r"\sWHERE\s(.+)", query, re.IGNORECASE | re.DOTALL)
+    clause = CLAUSE_END.split(where.group(1))[0] if where else ""
+    refs = [(column, op) for column, op in _column_refs(clause, table) if column != "id"]
+    equality = list(dict.fromkeys(column for column, op in refs if op in EQUALITY_OPS))
+    ranges = [column for column, op in refs if op not in EQUALITY_OPS and column not in equality]
+    order = [column for column in _order_columns(query, table) if column not in equality]
+
+    if re.search(r"\sOR\s", clause, re.IGNORECASE) and len(equality) > 1:
+        return [(column,) for column in equality]
+    columns = tuple(equality + (order or ranges[:1]))
+    return [columns] if columns else []
+
+
+def existing_indexes(connection: sqlite3.Connection, table: str) -> List[Tuple[str, ...]]:
+    indexes = []
+    for row in connection.execute(f'PRAGMA index_list("{table}")'):
+        indexes.append(tuple(info[2] for info in connection.execute(f'PRAGMA index_info("{row[1]}")')))
+    return indexes
+
+
+def is_covered(columns: Tuple[str, ...], indexes: List[Tuple[str, ...]]) -> bool:
+    """True if an existing index already starts with these columns"""
+    return any(index[:len(columns)] == columns for index in indexes)
+
+
+def prisma_models(schema_path: str = SCHEMA_PATH) -> Dict[str, str]:
+    """Table name -> Prisma model name from the @@map attributes"""
+    if not os.path.exists(schema_path):
+        return {}
+    with open(schema_path) as f:
+        schema = f.read()
+    models = {}
+    for match in re.finditer(r"model (\w+) \{(.*?)\n\}", schema, re.DOTALL):
+        mapped = re.search(r'@@map\("(\w+)"\)', match.group(2))
+        models[mapped.group(1) if mapped else match.group(1)] = match.group(1)
+    return models
+
+
+def advise(db_path: str, statements: Dict[str, Dict]) -> Tuple[List[Dict], Dict[Tuple[str, Tuple[str, ...]], set]]:
+    """Plan every statement and collect candidate indexes with the statements they serve"""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    findings = []
+    candidates: Dict[Tuple[str, Tuple[str, ...]], set] = defaultdict(set)
+    try:
+        for shape, statement in statements.items():
+            plan = explain(connection, statement["query"], statement["params"])
+            if plan is None:
+                continue
+            issues = plan_issues(plan)
+            if not issues:
+                continue
+            findings.append(dict(statement, shape=shape, plan=plan, issues=issues))
+            tables = {detail for kind, detail in issues if kind == "scan"}
+            source = re.search(rf"\sFROM\s+(?:{IDENT}\.)?{IDENT}", statement["query"])
+            if source and any(kind == "sort" for kind, _ in issues):
+                tables.add(source.group(2))
+            for table in tables:
+                indexes = existing_indexes(connection, table)
+                for columns in propose_indexes(statement["query"], table):
+                    if not is_covered(columns, indexes):
+                        candidates[(table, columns)].add(shape)
+    finally:
+        connection.close()
+    return findings, candidates
+
+
+def index_name(table: str, columns: Tuple[str, ...]) -> str:
+    return f"idx_{table}_{'_'.join(columns)}"
+
+
+def create_indexes(db_path: str, candidates) -> List[str]:
+    """Apply candidate indexes to db_path (a copy) and refresh planner statistics"""
+    statements = []
+    connection = sqlite3.connect(db_path)
+    try:
+        for table, columns in candidates:
+            sql = f'CREATE INDEX IF NOT EXISTS "{index_name(table, columns)}" ON "{table}" ' \
+                  f'({", ".join(f"{chr(34)}{c}{chr(34)}" for c in columns)})'
+            connection.execute(sql)
+            statements.append(sql)
+        connection.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+    return statements
+
+
+def capture(db_path: str, sink_path: str, role: str):
+    """Run the functional suite and the query-heavy GET endpoints with the query log on"""
+    process = start_backend(sink_path, db_path)
+    try:
+        tester = APITester()
+        tester.run_all_tests()
+        response = tester.make_request("POST", "/api/demo/login", DEMO_CREDENTIALS[role])
+        token = response.json().get("accessToken") if response and response.status_code == 200 else None
+        for endpoint in DEFAULT_ENDPOINTS:
+            tester.make_request("GET", endpoint, auth_token=token)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def measure(db_path: str, endpoints: List[str], role: str, count: int) -> Dict[str, Dict]:
+    """Latency percentiles (ms) per endpoint with the backend running on db_path"""
+    sink_path = os.path.join(os.path.dirname(db_path), "measure.jsonl")
+    process = start_backend(sink_path, db_path)
+    try:
+        tester = APITester()
+        response = tester.make_request("POST", "/api/demo/login", DEMO_CREDENTIALS[role])
+        token = response.json().get("accessToken") if response and response.status_code == 200 else None
+        for endpoint in endpoints:
+            for _ in range(WARMUP_REQUESTS):
+                tester.make_request("GET", endpoint, auth_token=token)
+        tester.metrics.routes.clear()
+        for endpoint in endpoints:
+            for _ in range(count):
+                tester.make_request("GET", endpoint, auth_token=token)
+        summary = tester.metrics.summary()
+        return {endpoint: summary.get(f"GET {normalize_route(endpoint)}", {}).get("phases", {}).get("total", {})
+                for endpoint in endpoints}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def print_findings(findings: List[Dict], candidates, models: Dict[str, str]):
+    """Print flagged plans and the proposed indexes"""
+    print("\n" + "="*50)
+    print("QUERY PLAN FINDINGS")
+    print("="*50)
+    if not findings:
+        print("✅ No full table scans or temp B-tree sorts in the captured SQL")
+    for finding in sorted(findings, key=lambda f: -f["db_ms"]):
+        kinds = ", ".join(f"{kind} {detail}" for kind, detail in finding["issues"])
+        print(f"\n⚠️  {kinds}  ({finding['count']}x, {finding['db_ms']:.1f}ms in DB)")
+        print(f"    {finding['shape'][:160]}")
+        for method, url in sorted(finding["endpoints"])[:3]:
+            print(f"    Details: {method} {url}")
+
+    if candidates:
+        print("\n" + "="*50)
+        print("CANDIDATE INDEXES")
+        print("="*50)
+        for (table, columns), shapes in sorted(candidates.items()):
+            model = models.get(table, table)
+            print(f"\n{index_name(table, columns)}  (serves {len(shapes)} statements)")
+            print(f"    prisma: model {model} {{ @@index([{', '.join(columns)}]) }}")
+
+
+def print_comparison(before: Dict[str, Dict], after: Dict[str, Dict]):
+    print("\n" + "="*50)
+    print("ENDPOINT LATENCY BEFORE/AFTER (ms)")
+    print("="*50)
+    for endpoint in before:
+        old, new = before[endpoint], after.get(endpoint, {})
+        if not old or not new:
+            print(f"\n⚠️  {endpoint}: no successful measurements")
+            continue
+        change = (new["p50"] - old["p50"]) / old["p50"] * 100 if old["p50"] else 0.0
+        status = "✅" if change <= 0 else "❌"
+        print(f"\n{status} GET {endpoint}")
+        print(f"    p50 {old['p50']:8.2f} -> {new['p50']:8.2f}  ({change:+.1f}%)")
+        print(f"    p99 {old['p99']:8.2f} -> {new['p99']:8.2f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Explain captured Prisma SQL and measure proposed SQLite indexes")
+    parser.add_argument("--db", default=DB_PATH, help="database to copy and analyze (never modified)")
+    parser.add_argument("--log", help="existing PRISMA_QUERY_LOG file instead of running the suite")
+    parser.add_argument("--role", choices=sorted(DEMO_CREDENTIALS), default="au_pair", help="demo user to log in as")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="timed requests per endpoint and run")
+    parser.add_argument("--no-measure", action="store_true", help="only report plans and candidate indexes")
+    parser.add_argument("--keep", action="store_true", help="keep the working directory with both database copies")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 2
+    workdir = tempfile.mkdtemp(prefix="aupair-indexes-")
+    before_db = os.path.join(workdir, "before.db")
+    after_db = os.path.join(workdir, "after.db")
+    shutil.copyfile(args.db, before_db)
+    print("🔎 Starting Au Pair query-plan analysis")
+    print(f"Testing against: {BASE_URL}, database copy: {before_db}")
+
+    try:
+        log_path = args.log
+        if not log_path:
+            log_path = os.path.join(workdir, "suite.jsonl")
+            capture(before_db, log_path, args.role)
+        statements = read_statements(log_path)
+        print(f"\nCaptured {len(statements)} distinct statements "
+              f"({sum(s['count'] for s in statements.values())} executions)")
+
+        findings, candidates = advise(before_db, statements)
+        print_findings(findings, candidates, prisma_models())
+        if not candidates:
+            return 0
+
+        shutil.copyfile(before_db, after_db)
+        for sql in create_indexes(after_db, candidates):
+            print(f"    {sql}")
+        connection = sqlite3.connect(f"file:{after_db}?mode=ro", uri=True)
+        resolved = sum(1 for finding in findings
+                       if len(plan_issues(explain(connection, finding["query"], finding["params"]) or [])) <
+                       len(finding["issues"]))
+        connection.close()
+        print(f"\nPlans improved with indexes applied: {resolved}/{len(findings)}")
+
+        shapes = set().union(*candidates.values())
+        endpoints = sorted({url for finding in findings if finding["shape"] in shapes
+                            for method, url in finding["endpoints"] if method == "GET"})
+        if args.no_measure or not endpoints:
+            return 0
+        before = measure(before_db, endpoints, args.role, args.requests)
+        after = measure(after_db, endpoints, args.role, args.requests)
+        print_comparison(before, after)
+        return 0
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 2
+    finally:
+        if args.keep:
+            print(f"\nWorking directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+HTTP Transport and Keep-alive Comparison for Au Pair Backend
+Sends the same request sequence through each transport in backend_transport
+(fresh connection per request, pooled requests.Session, raw sockets) and reports
+latency, connections opened vs reused and the client's own CPU per request.
+--pause holds each connection idle between requests to probe the backend's
+keep-alive timeout (Node closes idle sockets after 5s by default).
+"""
+
+import argparse
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import requests
+
+from backend_load import login_for_load
+from backend_metrics import LatencyHistogram, RequestMetrics
+from backend_results import save_run
+from backend_test import BASE_URL, PROTECTED_ENDPOINTS
+from backend_transport import DEFAULT_POOL_SIZE, TRANSPORTS, Transport, make_transport
+
+DEFAULT_REQUESTS = 500
+DEFAULT_CONCURRENCY = 1
+DEFAULT_ENDPOINTS = ["/health", "/api/dashboard/stats"]
+REQUEST_TIMEOUT = 10
+
+
+def drive(transport: Transport, metrics: RequestMetrics, endpoints: List[str], token: str,
+          requests_total: int, concurrency: int, pause: float) -> Dict:
+    """Send requests_total GETs across concurrency threads; returns wall and client CPU time"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    counter = iter(range(requests_total))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            path = endpoints[index % len(endpoints)]
+            try:
+                transport.request(metrics, "GET", f"{BASE_URL}{path}", route=path,
+                                  headers=dict(headers), timeout=REQUEST_TIMEOUT)
+            except requests.exceptions.RequestException:
+                pass
+            if pause:
+                time.sleep(pause)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    # Pauses are idle time, not transport work
+    busy = wall - pause * requests_total / concurrency
+    return {"wall": wall, "cpu": cpu, "busy": busy}
+
+
+def transport_summary(transport: Transport, metrics: RequestMetrics, timing: Dict) -> Dict:
+    """Latency and connection stats from the metrics this transport alone recorded into"""
+    phases = {phase: LatencyHistogram() for phase in ("total", "connect")}
+    errors = 0
+    for route in metrics.routes.values():
+        errors += sum(route["errors"].values())
+        for phase, histogram in phases.items():
+            if phase in route["phases"]:
+                histogram.merge(route["phases"][phase])
+    connections = transport.connection_summary()
+    done = connections["requests"] or 1
+    return dict(
+        connections,
+        errors=errors,
+        throughput=connections["requests"] / timing["busy"] if timing["busy"] > 0 else 0.0,
+        client_cpu_us=timing["cpu"] / done * 1e6,
+        total_ms=phases["total"].percentiles_ms(),
+        connect_ms_per_request=phases["connect"].mean() / 1000 if phases["connect"].total_count else 0.0,
+    )
+
+
+def print_comparison(summary: Dict[str, Dict], pause: float):
+    print("\n" + "="*50)
+    print("TRANSPORT COMPARISON")
+    print("="*50)
+    for name, stats in summary.items():
+        total = stats["total_ms"]
+        print(f"\n{name}: {stats['requests']} requests, {stats['errors']} errors, {stats['throughput']:.1f} req/s")
+        print(f"    Latency (ms): p50 {total['p50']:.2f}  p90 {total['p90']:.2f}  p99 {total['p99']:.2f}")
+        stale = f", {stats['stale']} found closed by the backend after idling" if stats.get("stale") else ""
+        print(f"    Connections: {stats['opened']} opened, {stats['reused']} reused "
+              f"({stats['reuse_rate'] * 100:.0f}%){stale}")
+        print(f"    Connect time: {stats['connect_ms_per_request']:.3f}ms per request; "
+              f"client CPU: {stats['client_cpu_us']:.0f}us per request")
+
+    if "fresh" in summary:
+        fresh = summary["fresh"]["total_ms"]["p50"]
+        for name, stats in summary.items():
+            if name != "fresh":
+                saved = fresh - stats["total_ms"]["p50"]
+                print(f"\n{'✅' if saved >= 0 else '⚠️ '} Keep-alive ({name}) changes p50 by {-saved:+.2f}ms "
+                      "versus a new connection per request")
+    for name, stats in summary.items():
+        if name != "fresh" and stats["opened"] > stats["requests"] / 2:
+            print(f"⚠️  {name} opened a connection for most requests; "
+                  f"the backend closes idle connections sooner than the {pause:g}s pause")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare HTTP transports and backend keep-alive behaviour")
+    parser.add_argument("--transport", default=",".join(TRANSPORTS),
+                        help=f"comma-separated transports to compare ({', '.join(TRANSPORTS)})")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="requests per transport")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="client threads")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="keep-alive connections per host")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds each thread idles between requests")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", help="GET path to request (repeatable)")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    protected = {path for method, path in PROTECTED_ENDPOINTS}
+    print("🚀 Starting Au Pair transport comparison")
+    print(f"Testing against: {BASE_URL}")
+    token = login_for_load() if any(path in protected for path in endpoints) else None
+
+    metrics = RequestMetrics()
+    summary = {}
+    for name in (value for value in args.transport.split(",") if value):
+        transport = make_transport(name, args.pool_size)
+        # Separate metrics per transport: route keys pass through normalize_route, so a suffix would not survive
+        own = RequestMetrics()
+        print(f"\n▶️  {args.requests} requests via {name} with {args.concurrency} threads")
+        try:
+            timing = drive(transport, own, endpoints, token, args.requests, args.concurrency, args.pause)
+        finally:
+            transport.close()
+        summary[name] = transport_summary(transport, own, timing)
+        metrics.merge(RequestMetrics.from_dict({f"{key} [{name}]": route for key, route in own.to_dict().items()}))
+
+    print_comparison(summary, args.pause)
+    metrics.print_summary()
+    if not args.no_save:
+        save_run("transport", metrics, dict(vars(args), base_url=BASE_URL), summary, args.label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
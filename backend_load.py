@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Open-loop Load Generator for Au Pair Backend API
+Fires the APITester endpoint lists at a fixed arrival rate on an asyncio event loop.
+Latency is measured from each request's intended start time, so the numbers are
+corrected for coordinated omission when the backend (or the client) falls behind.
+"""
+
+import argparse
+import asyncio
+import json
+import ssl
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from backend_metrics import LatencyHistogram, RequestMetrics
+from backend_results import save_run
+from backend_test import BASE_URL, DEMO_CREDENTIALS, DEMO_ENDPOINTS, PROTECTED_ENDPOINTS, APITester
+
+# Load defaults
+DEFAULT_RATE = 100.0
+DEFAULT_DURATION = 30.0
+DEFAULT_CONNECTIONS = 256
+DEFAULT_MAX_IN_FLIGHT = 10000
+REQUEST_TIMEOUT = 10.0
+
+# (name, method, path, body, headers)
+Target = Tuple[str, str, str, Optional[bytes], Dict[str, str]]
+
+
+class AsyncResponse:
+    """Response returned by AsyncHTTPClient, shaped like requests.Response"""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes,
+                 timings: Dict[str, float] = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.timings = timings or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncHTTPClient:
+    """Minimal keep-alive HTTP/1.1 client built on asyncio streams"""
+
+    def __init__(self, base_url: str = BASE_URL, max_connections: int = DEFAULT_CONNECTIONS,
+                 timeout: float = REQUEST_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.use_ssl = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.use_ssl else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.connections_opened = 0
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a new connection to the backend"""
+        context = ssl.create_default_context() if self.use_ssl else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        self.connections_opened += 1
+        return reader, writer
+
+    async def _exchange(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        method: str, path: str, body: Optional[bytes],
+                        headers: Dict[str, str]) -> Tuple[AsyncResponse, bool]:
+        """Send one request and read the full response, timing first byte and body"""
+        start = time.perf_counter()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}", "Connection: keep-alive"]
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        first_byte = time.perf_counter()
+        status_code = int(status_line.split(None, 2)[1])
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+            content = b""
+        elif "content-length" in response_headers:
+            content = await reader.readexactly(int(response_headers["content-length"]))
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            content = b"".join(chunks)
+        else:
+            content = await reader.read()
+            keep_alive = False
+
+        done = time.perf_counter()
+        timings = {"ttfb": first_byte - start, "download": done - first_byte}
+        return AsyncResponse(status_code, response_headers, content, timings), keep_alive
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None,
+                      headers: Dict[str, str] = None) -> AsyncResponse:
+        """Send a request over a pooled connection, retrying once on a stale keep-alive socket"""
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                start = time.perf_counter()
+                reader, writer = self._idle.pop() if reused else await self._connect()
+                connect = time.perf_counter() - start
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._exchange(reader, writer, method.upper(), path, body, headers or {}),
+                        self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                response.timings["connect"] = connect
+                response.timings["ttfb"] += connect
+                return response
+
+    async def close(self):
+        """Close all idle connections"""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+class LoadResult:
+    """Per-endpoint latency histograms and outcome counters for one load run
+
+    The "corrected" phase is measured from each request's intended start time;
+    "total" is the time the exchange itself took, as a closed-loop client sees it.
+    """
+
+    def __init__(self, rate: float, duration: float):
+        self.rate = rate
+        self.duration = duration
+        self.elapsed = 0.0
+        self.metrics = RequestMetrics()
+
+    def record(self, method: str, path: str, response: AsyncResponse, corrected: float, uncorrected: float):
+        """Record a completed request (latencies in seconds)"""
+        timings = dict(response.timings, corrected=corrected, total=uncorrected)
+        self.metrics.record(method, path, response.status_code, timings)
+
+    def record_error(self, method: str, path: str, error: str, corrected: float):
+        """Record a request that never produced a response"""
+        self.metrics.record_error(method, path, error, {"corrected": corrected})
+
+    def record_drop(self, method: str, path: str):
+        """Record an arrival skipped because the in-flight limit was reached"""
+        self.metrics.record_error(method, path, "dropped")
+
+    def summary(self) -> Dict[str, Dict]:
+        """Summarize throughput, error rate and latency percentiles (ms) per endpoint"""
+        elapsed = self.elapsed or self.duration
+        summary = {}
+        for name, route in self.metrics.routes.items():
+            corrected = route["phases"].get("corrected", LatencyHistogram())
+            uncorrected = route["phases"].get("total", LatencyHistogram())
+            completed = sum(route["statuses"].values())
+            ok = sum(count for code, count in route["statuses"].items() if code < 400)
+            attempted = completed + sum(route["errors"].values())
+            summary[name] = dict(
+                corrected.percentiles_ms(),
+                attempted=attempted,
+                completed=completed,
+                throughput=ok / elapsed if elapsed else 0.0,
+                error_rate=(attempted - ok) / attempted if attempted else 0.0,
+                statuses=dict(route["statuses"]),
+                errors=dict(route["errors"]),
+                dropped=route["errors"].get("dropped", 0),
+                max=corrected.max_value() / 1000.0,
+                uncorrected_p99=uncorrected.value_at_percentile(99) / 1000.0
+            )
+        return summary
+
+    def print_summary(self):
+        """Print the per-endpoint load summary followed by the phase breakdown"""
+        print("\n" + "="*50)
+        print("LOAD SUMMARY")
+        print("="*50)
+        print(f"Target rate: {self.rate:.1f} req/s for {self.duration:.0f}s (elapsed {self.elapsed:.1f}s)")
+        for name, stats in sorted(self.summary().items()):
+            print(f"\n{name}")
+            print(f"    Requests: {stats['attempted']} attempted, {stats['completed']} completed, "
+                  f"{stats['dropped']} dropped")
+            print(f"    Throughput: {stats['throughput']:.1f} ok/s, error rate {stats['error_rate']*100:.2f}%")
+            print(f"    Latency (ms): p50 {stats['p50']:.1f}  p90 {stats['p90']:.1f}  "
+                  f"p99 {stats['p99']:.1f}  p99.9 {stats['p99.9']:.1f}  max {stats['max']:.1f}  "
+                  f"(uncorrected p99 {stats['uncorrected_p99']:.1f})")
+            if stats["statuses"]:
+                print(f"    Statuses: {stats['statuses']}")
+            if stats["errors"]:
+                print(f"    Errors: {stats['errors']}")
+        self.metrics.print_summary()
+
+
+async def _fire(client: AsyncHTTPClient, target: Target, intended: float, result: LoadResult):
+    """Issue one scheduled request and record its latency against the intended start"""
+    name, method, path, body, headers = target
+    sent = time.perf_counter()
+    try:
+        response = await client.request(method, path, body, headers)
+    except asyncio.TimeoutError:
+        result.record_error(method, path, "timeout", time.perf_counter() - intended)
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        result.record_error(method, path, type(e).__name__, time.perf_counter() - intended)
+    else:
+        done = time.perf_counter()
+        result.record(method, path, response, done - intended, done - sent)
+
+
+async def run_open_loop(client: AsyncHTTPClient, targets: List[Target], rate: float,
+                        duration: float, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                        result: Optional[LoadResult] = None) -> LoadResult:
+    """Dispatch targets round-robin at a fixed arrival rate, independent of response times"""
+    result = result or LoadResult(rate, duration)
+    total = int(rate * duration)
+    in_flight = set()
+    start = time.perf_counter()
+    sent = 0
+
+    while sent < total:
+        due = min(total, int((time.perf_counter() - start) * rate) + 1)
+        while sent < due:
+            target = targets[sent % len(targets)]
+            intended = start + sent / rate
+            sent += 1
+            if len(in_flight) >= max_in_flight:
+                result.record_drop(target[1], target[2])
+                continue
+            task = asyncio.ensure_future(_fire(client, target, intended, result))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if sent < total:
+            await asyncio.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def build_targets(token: Optional[str], endpoints: List[str] = None) -> List[Target]:
+    """Build load targets from the shared endpoint lists, optionally filtered by path"""
+    targets = []
+    auth_headers = {"Authorization": f"Bearer {token}"} if token else {}
+    json_headers = {"Content-Type": "application/json"}
+
+    for method, path in PROTECTED_ENDPOINTS:
+        targets.append((f"{method} {path}", method, path, None, dict(auth_headers)))
+
+    for method, path in DEMO_ENDPOINTS:
+        body = None
+        headers = {}
+        if method == "POST" and "login" in path:
+            body = json.dumps(DEMO_CREDENTIALS["au_pair"]).encode()
+            headers = dict(json_headers)
+        elif method == "POST":
+            # Registering the same user repeatedly only measures the duplicate path
+            continue
+        targets.append((f"{method} {path}", method, path, body, headers))
+
+    if endpoints:
+        targets = [t for t in targets if t[2] in endpoints or t[0] in endpoints]
+    return targets
+
+
+def build_user_targets(tokens: List[str], endpoints: List[str] = None) -> List[Target]:
+    """Build targets for many users so successive requests rotate across distinct tokens"""
+    return [target for token in tokens for target in build_targets(token, endpoints)]
+
+
+def login_for_load() -> Optional[str]:
+    """Obtain an access token for the protected endpoints through the demo login"""
+    tester = APITester()
+    response = tester.make_request("POST", "/api/demo/login", DEMO_CREDENTIALS["au_pair"])
+    if response and response.status_code == 200:
+        return response.json().get("accessToken")
+    print("⚠️  Demo login failed, protected endpoints will be hit without a token")
+    return None
+
+
+async def run_load(rate: float, duration: float, endpoints: List[str] = None,
+                   connections: int = DEFAULT_CONNECTIONS,
+                   max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                   targets: List[Target] = None) -> LoadResult:
+    """Log in, then drive the selected endpoints open-loop at the target rate"""
+    if targets is None:
+        targets = build_targets(login_for_load(), endpoints)
+    if not targets:
+        raise ValueError(f"No endpoints match {endpoints}")
+
+    client = AsyncHTTPClient(BASE_URL, max_connections=connections)
+    try:
+        return await run_open_loop(client, targets, rate, duration, max_in_flight)
+    finally:
+        await client.close()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the Au Pair backend")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="target arrivals per second")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="run length in seconds")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="maximum concurrent connections")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="outstanding requests before arrivals are dropped")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="restrict to a path such as /api/dashboard/stats (repeatable)")
+    parser.add_argument("--users", type=int, default=0,
+                        help="rotate across this many pre-authenticated pool users")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    print("🚀 Starting Au Pair Backend Load Test")
+    print(f"Testing against: {BASE_URL}")
+
+    targets = None
+    if args.users:
+        # Imported here because backend_tokens builds on this module's client
+        from backend_tokens import pool_tokens
+        targets = build_user_targets(pool_tokens(args.users), args.endpoints)
+
+    result = asyncio.run(run_load(args.rate, args.duration, args.endpoints,
+                                  args.connections, args.max_in_flight, targets))
+    result.print_summary()
+    if not args.no_save:
+        save_run("load", result.metrics, dict(vars(args), base_url=BASE_URL), result.summary(), args.label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
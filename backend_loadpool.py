@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Multi-core Load Driver for Au Pair Backend API
+Spreads the open-loop load generator across a process pool, one event loop per core.
+Workers record histograms and counters straight into a shared-memory block, so the
+parent aggregates live results without pickling per-request data between processes.
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+from multiprocessing import shared_memory
+from typing import Dict, List
+
+from backend_load import (DEFAULT_CONNECTIONS, DEFAULT_DURATION, DEFAULT_MAX_IN_FLIGHT, DEFAULT_RATE,
+                          AsyncHTTPClient, LoadResult, Target, build_targets, build_user_targets,
+                          login_for_load, run_open_loop)
+from backend_metrics import LatencyHistogram, RequestMetrics, normalize_route
+from backend_results import save_run
+from backend_test import BASE_URL
+from backend_tokens import pool_tokens
+
+# Phases the load generator records for each request
+SHARED_PHASES = ("corrected", "total", "connect", "ttfb", "download")
+# One counter per HTTP status code; anything above lands in the last slot
+STATUS_SLOTS = 600
+ERROR_KINDS = ("timeout", "dropped", "ConnectionRefusedError", "ConnectionResetError",
+               "IncompleteReadError", "other")
+# Per-worker header: finished flag, elapsed microseconds, connections opened
+HEADER_SLOTS = 3
+PROGRESS_INTERVAL = 1.0
+
+
+def route_key(method: str, path: str) -> str:
+    return f"{method.upper()} {normalize_route(path)}"
+
+
+class SharedLayout:
+    """Offsets of each worker's histograms and counters inside one int64 shared block"""
+
+    def __init__(self, workers: int, routes: List[str]):
+        self.workers = workers
+        self.routes = routes
+        self.counts_len = LatencyHistogram().counts_len
+        self.route_size = len(SHARED_PHASES) * self.counts_len + STATUS_SLOTS + len(ERROR_KINDS)
+        self.worker_size = HEADER_SLOTS + len(routes) * self.route_size
+
+    @property
+    def size_bytes(self) -> int:
+        return 8 * self.workers * self.worker_size
+
+    def worker_offset(self, worker: int) -> int:
+        return worker * self.worker_size
+
+    def route_offset(self, worker: int, route: int) -> int:
+        return self.worker_offset(worker) + HEADER_SLOTS + route * self.route_size
+
+    def phase_slice(self, worker: int, route: int, phase: int) -> slice:
+        start = self.route_offset(worker, route) + phase * self.counts_len
+        return slice(start, start + self.counts_len)
+
+    def status_slice(self, worker: int, route: int) -> slice:
+        start = self.route_offset(worker, route) + len(SHARED_PHASES) * self.counts_len
+        return slice(start, start + STATUS_SLOTS)
+
+    def error_slice(self, worker: int, route: int) -> slice:
+        start = self.route_offset(worker, route) + len(SHARED_PHASES) * self.counts_len + STATUS_SLOTS
+        return slice(start, start + len(ERROR_KINDS))
+
+
+class SharedRequestMetrics(RequestMetrics):
+    """RequestMetrics that records into one worker's region of shared memory
+
+    Each worker owns its region outright and runs a single event loop, so no
+    locking is needed; the parent only ever reads.
+    """
+
+    def __init__(self, view: memoryview, layout: SharedLayout, worker: int):
+        super().__init__()
+        self._slots = {}
+        for index, key in enumerate(layout.routes):
+            self._slots[key] = {
+                "phases": {phase: LatencyHistogram(counts=view[layout.phase_slice(worker, index, p)])
+                           for p, phase in enumerate(SHARED_PHASES)},
+                "statuses": view[layout.status_slice(worker, index)],
+                "errors": view[layout.error_slice(worker, index)]
+            }
+
+    def record(self, method: str, endpoint: str, status_code: int, timings: Dict[str, float]):
+        slot = self._slots[route_key(method, endpoint)]
+        slot["statuses"][min(status_code, STATUS_SLOTS - 1)] += 1
+        for phase, seconds in timings.items():
+            slot["phases"][phase].record_seconds(seconds)
+
+    def record_error(self, method: str, endpoint: str, error: str, timings: Dict[str, float] = None):
+        slot = self._slots[route_key(method, endpoint)]
+        kind = error if error in ERROR_KINDS else "other"
+        slot["errors"][ERROR_KINDS.index(kind)] += 1
+        for phase, seconds in (timings or {}).items():
+            slot["phases"][phase].record_seconds(seconds)
+
+
+def _drive(buf: memoryview, layout: SharedLayout, worker: int, targets: List[Target], rate: float,
+           duration: float, connections: int, max_in_flight: int, start_at: float):
+    """Run one worker's share of the open-loop schedule, recording into shared memory"""
+    view = buf.cast("q")
+    result = LoadResult(rate, duration)
+    result.metrics = SharedRequestMetrics(view, layout, worker)
+
+    async def drive():
+        # Offset each worker by one global inter-arrival gap so arrivals interleave evenly
+        await asyncio.sleep(max(0.0, start_at + worker / (rate * layout.workers) - time.time()))
+        client = AsyncHTTPClient(BASE_URL, max_connections=connections)
+        try:
+            await run_open_loop(client, targets, rate, duration, max_in_flight, result)
+        finally:
+            await client.close()
+        return client.connections_opened
+
+    try:
+        opened = asyncio.run(drive())
+        header = layout.worker_offset(worker)
+        view[header + 1] = int(result.elapsed * 1_000_000)
+        view[header + 2] = opened
+        view[header] = 1
+    finally:
+        # Drop every slice of the shared block before the caller closes it
+        result = None
+        gc.collect()
+        view.release()
+
+
+def _worker(shm_name: str, layout: SharedLayout, worker: int, targets: List[Target], rate: float,
+            duration: float, connections: int, max_in_flight: int, start_at: float):
+    """Process-pool entry point: attach to the shared block and drive load"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        _drive(shm.buf, layout, worker, targets, rate, duration, connections, max_in_flight, start_at)
+    finally:
+        shm.close()
+
+
+def _copy_counts(view: memoryview) -> array:
+    counts = array("q")
+    counts.frombytes(view.tobytes())
+    return counts
+
+
+def collect(buf: memoryview, layout: SharedLayout, rate: float, duration: float) -> LoadResult:
+    """Merge every worker's shared histograms and counters into one LoadResult"""
+    view = buf.cast("q")
+    try:
+        result = LoadResult(rate, duration)
+        for worker in range(layout.workers):
+            header = layout.worker_offset(worker)
+            result.elapsed = max(result.elapsed, view[header + 1] / 1_000_000)
+            for index, key in enumerate(layout.routes):
+                route = result.metrics._route(key)
+                for code, count in enumerate(view[layout.status_slice(worker, index)]):
+                    if count:
+                        route["statuses"][code] += count
+                for kind, count in zip(ERROR_KINDS, view[layout.error_slice(worker, index)]):
+                    if count:
+                        route["errors"][kind] += count
+                for p, phase in enumerate(SHARED_PHASES):
+                    histogram = LatencyHistogram(counts=_copy_counts(view[layout.phase_slice(worker, index, p)]))
+                    if phase not in route["phases"]:
+                        route["phases"][phase] = LatencyHistogram()
+                    route["phases"][phase].merge(histogram)
+        return result
+    finally:
+        view.release()
+
+
+def _progress(buf: memoryview, layout: SharedLayout) -> Dict[str, int]:
+    """Cheap live totals read from shared memory while workers run"""
+    view = buf.cast("q")
+    try:
+        completed = errors = finished = 0
+        for worker in range(layout.workers):
+            finished += view[layout.worker_offset(worker)]
+            for index in range(len(layout.routes)):
+                completed += sum(view[layout.status_slice(worker, index)])
+                errors += sum(view[layout.error_slice(worker, index)])
+        return {"completed": completed, "errors": errors, "finished": finished}
+    finally:
+        view.release()
+
+
+def run_pool(rate: float, duration: float, workers: int = None, endpoints: List[str] = None,
+             connections: int = DEFAULT_CONNECTIONS,
+             max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, targets: List[Target] = None) -> LoadResult:
+    """Split the target rate across worker processes and aggregate their shared results"""
+    workers = workers or os.cpu_count() or 1
+    if targets is None:
+        targets = build_targets(login_for_load(), endpoints)
+    if not targets:
+        raise ValueError(f"No endpoints match {endpoints}")
+
+    routes = list(dict.fromkeys(route_key(method, path) for _, method, path, _, _ in targets))
+    layout = SharedLayout(workers, routes)
+    shm = shared_memory.SharedMemory(create=True, size=layout.size_bytes)
+    try:
+        shm.buf[:layout.size_bytes] = bytes(layout.size_bytes)
+        start_at = time.time() + 1.0
+        per_worker_connections = max(1, connections // workers)
+        print(f"Spawning {workers} workers at {rate / workers:.1f} req/s each "
+              f"({layout.size_bytes / 1e6:.1f} MB shared)")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_worker, shm.name, layout, worker, targets, rate / workers, duration,
+                                   per_worker_connections, max_in_flight // workers or 1, start_at)
+                       for worker in range(workers)]
+            while True:
+                done, pending = wait(futures, timeout=PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION)
+                progress = _progress(shm.buf, layout)
+                elapsed = max(0.0, time.time() - start_at)
+                print(f"⏱  {elapsed:5.1f}s  completed {progress['completed']}  errors {progress['errors']}  "
+                      f"workers done {progress['finished']}/{workers}")
+                if not pending or any(f.exception() for f in done):
+                    break
+            for future in futures:
+                future.result()
+
+        return collect(shm.buf, layout, rate, duration)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-process load driver for the Au Pair backend")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: cores)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="total target arrivals per second")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="run length in seconds")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="total concurrent connections across workers")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="total outstanding requests before arrivals are dropped")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="restrict to a path such as /api/dashboard/stats (repeatable)")
+    parser.add_argument("--users", type=int, default=0,
+                        help="rotate across this many pre-authenticated pool users")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    print("🚀 Starting Au Pair Backend Multi-core Load Test")
+    print(f"Testing against: {BASE_URL}")
+
+    targets = None
+    if args.users:
+        targets = build_user_targets(pool_tokens(args.users), args.endpoints)
+
+    result = run_pool(args.rate, args.duration, args.workers, args.endpoints,
+                      args.connections, args.max_in_flight, targets)
+    result.print_summary()
+    if not args.no_save:
+        save_run("pool", result.metrics, dict(vars(args), base_url=BASE_URL), result.summary(), args.label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Vectorized Match Scoring Reference for Au Pair Backend
+Reproduces calculateMatchScore from backend/src/utils/matching.ts as NumPy array
+operations over whole profile tables (language bitsets, country, age,
+availability, budget). Computes N x M score matrices and top-k matches in row
+blocks, serves as an oracle for /api/matches, and benchmarks bulk throughput.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from backend_test import BASE_URL, DEMO_CREDENTIALS, APITester
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "prisma", "dev.db")
+DAY_MS = 24 * 60 * 60 * 1000
+YEAR_MS = 365.25 * DAY_MS
+# Rows scored per block; keeps the float64 working set around block_rows * M * 8 bytes
+DEFAULT_BLOCK_ROWS = 128
+DEFAULT_TOP_K = 20
+
+LANGUAGES = ["english", "spanish", "french", "german", "italian", "portuguese", "dutch", "swedish",
+             "norwegian", "danish", "polish", "mandarin", "japanese", "korean", "arabic", "russian"]
+COUNTRIES = ["US", "GB", "DE", "FR", "ES", "IT", "NL", "SE", "NO", "DK", "AU", "CA", "NZ", "IE", "CH", "AT"]
+
+
+def parse_list(value) -> List:
+    """Profile list columns are JSON arrays in SQLite; accept lists and comma strings too"""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    try:
+        parsed = json.loads(value)
+        return parsed if isinstance(parsed, list) else [parsed]
+    except (TypeError, ValueError):
+        return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def to_epoch_ms(value) -> float:
+    """Prisma stores SQLite DateTime as epoch milliseconds or ISO text; NaN when unset"""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp() * 1000.0
+
+
+class Vocabulary:
+    """Maps terms to bit positions; bitsets are (rows, words) uint64 arrays"""
+
+    def __init__(self, terms: Sequence[str] = (), fold_case: bool = True):
+        self.fold_case = fold_case
+        self.index: Dict[str, int] = {}
+        for term in terms:
+            self.add(term)
+
+    def key(self, term) -> str:
+        return str(term).lower() if self.fold_case else str(term)
+
+    def add(self, term) -> int:
+        return self.index.setdefault(self.key(term), len(self.index))
+
+    @property
+    def words(self) -> int:
+        return max(1, (len(self.index) + 63) // 64)
+
+    def bitsets(self, rows: Sequence[Sequence]) -> np.ndarray:
+        for terms in rows:
+            for term in terms:
+                self.add(term)
+        bits = np.zeros((len(rows), self.words), dtype=np.uint64)
+        for row, terms in enumerate(rows):
+            for term in terms:
+                position = self.index[self.key(term)]
+                bits[row, position // 64] |= np.uint64(1 << (position % 64))
+        return bits
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    # NumPy < 2.0: count bits byte by byte through a lookup table
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = values.view(np.uint8).reshape(values.shape + (8,))
+    return table[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+# Every score component takes a handful of discrete values, so a pair is scored by
+# packing component codes into one integer and looking the total up in a table
+AVAILABILITY_VALUES = (50.0, 100.0, 80.0, 60.0, 30.0, 10.0)
+BUDGET_VALUES = (50.0, 100.0, 70.0, 40.0, 10.0)
+AGE_CLASSES = 6       # unknown, <18, 18-19, 20-30, 31-35, >35
+CHILDREN_CLASSES = 4  # none, young only, teens only, both
+BUDGET_STRIDE = 1
+AVAILABILITY_STRIDE = BUDGET_STRIDE * len(BUDGET_VALUES)
+AGE_STRIDE = AVAILABILITY_STRIDE * len(AVAILABILITY_VALUES)
+COUNTRY_STRIDE = AGE_STRIDE * AGE_CLASSES * CHILDREN_CLASSES
+LANGUAGE_STRIDE = COUNTRY_STRIDE * 2
+# Budget codes come from a unique-rate x unique-budget table while it stays this small
+MAX_BUDGET_TABLE = 1 << 22
+
+
+def _triangle(count):
+    """Offset of the language codes for hosts listing `count` preferred languages"""
+    return count * (count + 1) // 2
+
+
+class ProfileTables:
+    """Column arrays for au pair and host family profiles, ready for broadcasting"""
+
+    def __init__(self, au_pairs: List[Dict], hosts: List[Dict]):
+        languages = Vocabulary(LANGUAGES)
+        countries = Vocabulary(COUNTRIES, fold_case=False)
+        self.au_pair_ids = [profile.get("userId") for profile in au_pairs]
+        self.host_ids = [profile.get("userId") for profile in hosts]
+
+        # Language overlap is case-insensitive; host country membership is exact (Array.includes)
+        host_languages = [parse_list(p.get("preferredLanguages")) for p in hosts]
+        au_pair_languages = [parse_list(p.get("languages")) for p in au_pairs]
+        languages.bitsets(host_languages + au_pair_languages)
+        self.host_language_bits = languages.bitsets(host_languages)
+        self.au_pair_language_bits = languages.bitsets(au_pair_languages)
+        self.host_language_count = np.array([len(langs) for langs in host_languages], dtype=np.int64)
+
+        self.host_country = np.array([countries.add(p.get("country") or "") for p in hosts], dtype=np.intp)
+        self.au_pair_country_hits = np.zeros((len(au_pairs), max(1, len(countries.index))), dtype=np.uint8)
+        for row, preferred in enumerate(parse_list(p.get("preferredCountries")) for p in au_pairs):
+            for country in preferred:
+                if str(country) in countries.index:
+                    self.au_pair_country_hits[row, countries.index[str(country)]] = 1
+
+        children = [[float(age) for age in parse_list(p.get("childrenAges"))] for p in hosts]
+        self.host_children_class = np.array(
+            [any(age <= 10 for age in ages) + 2 * any(age >= 11 for age in ages) for ages in children],
+            dtype=np.int64)
+        self.au_pair_birth = np.array([to_epoch_ms(p.get("dateOfBirth")) for p in au_pairs], dtype=np.float64)
+        self.au_pair_from = np.array([to_epoch_ms(p.get("availableFrom")) for p in au_pairs], dtype=np.float64)
+        self.au_pair_to = np.array([to_epoch_ms(p.get("availableTo")) for p in au_pairs], dtype=np.float64)
+        self.au_pair_rate = np.array([p.get("hourlyRate") or 0.0 for p in au_pairs], dtype=np.float64)
+        self.host_budget = np.array([p.get("maxBudget") or 0.0 for p in hosts], dtype=np.float64)
+
+    @property
+    def shape(self):
+        return len(self.au_pair_ids), len(self.host_ids)
+
+
+def _age_value(age_class: int, children_class: int) -> float:
+    if age_class == 0 or children_class == 0:
+        return 50.0
+    young, teens = children_class & 1, children_class & 2
+    if young and age_class in (2, 3):
+        return 100.0
+    if teens and age_class in (3, 4):
+        return 100.0
+    return 70.0 if age_class in (2, 3, 4) else 30.0
+
+
+def score_table(max_languages: int) -> np.ndarray:
+    """Rounded total for every combination of component codes.
+
+    Components are added in the same order and with the same float64 arithmetic as
+    calculateMatchScore, so the table reproduces its rounding exactly.
+    """
+    table = np.empty(_triangle(max_languages + 1) * LANGUAGE_STRIDE, dtype=np.uint8)
+    for count in range(max_languages + 1):
+        for common in range(count + 1):
+            language = 100.0 if count == 0 else common / count * 100
+            for country in (0, 1):
+                for age_class in range(AGE_CLASSES):
+                    for children_class in range(CHILDREN_CLASSES):
+                        for availability_code, availability in enumerate(AVAILABILITY_VALUES):
+                            for budget_code, budget in enumerate(BUDGET_VALUES):
+                                score = language * 0.3
+                                if country:
+                                    score += 25
+                                score += _age_value(age_class, children_class) * 0.2
+                                score += availability * 0.15
+                                score += budget * 0.1
+                                code = ((_triangle(count) + common) * LANGUAGE_STRIDE + country * COUNTRY_STRIDE
+                                        + (age_class * CHILDREN_CLASSES + children_class) * AGE_STRIDE
+                                        + availability_code * AVAILABILITY_STRIDE + budget_code * BUDGET_STRIDE)
+                                # Math.round rounds halves up, not to even
+                                table[code] = int(np.floor(score + 0.5))
+    return table
+
+
+def availability_codes(tables: ProfileTables, now_ms: float) -> np.ndarray:
+    """Per au pair: the host's preferred start is always "now", so this is a vector"""
+    start, end = tables.au_pair_from, tables.au_pair_to
+    with np.errstate(invalid="ignore"):
+        days = np.abs(now_ms - start) / DAY_MS
+        codes = np.select([(now_ms >= start) & (now_ms <= end), days <= 30, days <= 90, days <= 180],
+                          [1, 2, 3, 4], 5)
+    return np.where(np.isnan(start) | np.isnan(end), 0, codes)
+
+
+def age_classes(tables: ProfileTables, now_ms: float) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        age = np.floor((now_ms - tables.au_pair_birth) / YEAR_MS)
+    classes = np.select([age < 18, age < 20, age <= 30, age <= 35], [1, 2, 3, 4], 5)
+    return np.where(np.isnan(age), 0, classes)
+
+
+def budget_codes(rate: np.ndarray, budget: np.ndarray) -> np.ndarray:
+    """Budget code per (rate, budget) pair, broadcasting like the inputs"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = rate / budget
+    codes = np.select([rate <= budget, ratio <= 1.2, ratio <= 1.5], [1, 2, 3], 4)
+    return np.where((rate == 0) | (budget == 0), 0, codes)
+
+
+class Scorer:
+    """Per-run state for scoring blocks of au pairs against every host"""
+
+    def __init__(self, tables: ProfileTables, now_ms: float = None):
+        self.tables = tables
+        self.now_ms = time.time() * 1000.0 if now_ms is None else now_ms
+        self.table = score_table(int(tables.host_language_count.max(initial=0)))
+        self.row_codes = (availability_codes(tables, self.now_ms) * AVAILABILITY_STRIDE
+                          + age_classes(tables, self.now_ms) * CHILDREN_CLASSES * AGE_STRIDE).astype(np.int32)
+        self.col_codes = (_triangle(tables.host_language_count) * LANGUAGE_STRIDE
+                          + tables.host_children_class * AGE_STRIDE).astype(np.int32)
+
+        rates, self.rate_index = np.unique(tables.au_pair_rate, return_inverse=True)
+        budgets, self.budget_index = np.unique(tables.host_budget, return_inverse=True)
+        self.budget_table = None
+        if rates.size * budgets.size <= MAX_BUDGET_TABLE:
+            self.budget_table = (budget_codes(rates[:, None], budgets[None, :]) * BUDGET_STRIDE).astype(np.int32)
+            self.host_keys = tables.host_country * budgets.size + self.budget_index
+        self.single_word = tables.au_pair_language_bits.shape[1] == 1
+
+    def block(self, rows: slice) -> np.ndarray:
+        """Integer scores (uint8) for au pairs[rows] x all hosts"""
+        tables = self.tables
+        codes = self.row_codes[rows, None] + self.col_codes[None, :]
+
+        # Language: |au pair langs ∩ host preferred|, counted with popcount on the bitsets
+        if self.single_word:
+            common = _popcount(tables.au_pair_language_bits[rows, 0, None] & tables.host_language_bits[None, :, 0])
+        else:
+            common = _popcount(tables.au_pair_language_bits[rows, None, :]
+                               & tables.host_language_bits[None, :, :]).sum(axis=-1)
+        codes += common.astype(np.int32) * LANGUAGE_STRIDE
+        if self.budget_table is not None:
+            # Country hit and budget code depend only on (au pair, host country, host budget):
+            # build that small per-row table and gather it with one index per host
+            partial = ((tables.au_pair_country_hits[rows].astype(np.int32) * COUNTRY_STRIDE)[:, :, None]
+                       + self.budget_table[self.rate_index[rows]][:, None, :])
+            codes += np.take(partial.reshape(len(partial), -1), self.host_keys, axis=1)
+        else:
+            codes += tables.au_pair_country_hits[rows][:, tables.host_country] * np.int32(COUNTRY_STRIDE)
+            codes += budget_codes(tables.au_pair_rate[rows, None], tables.host_budget[None, :]).astype(np.int32)
+        return np.take(self.table, codes)
+
+
+def score_matrix(tables: ProfileTables, now_ms: float = None, block_rows: int = DEFAULT_BLOCK_ROWS) -> np.ndarray:
+    """Full au pairs x hosts score matrix (uint8)"""
+    scorer = Scorer(tables, now_ms)
+    rows, cols = tables.shape
+    matrix = np.empty((rows, cols), dtype=np.uint8)
+    for start in range(0, rows, block_rows):
+        block = slice(start, min(start + block_rows, rows))
+        matrix[block] = scorer.block(block)
+    return matrix
+
+
+def _key_dtype(count: int):
+    """Smallest integer type holding score * (count + 1) + index sort keys"""
+    return np.int32 if 101 * (count + 1) < 2 ** 31 else np.int64
+
+
+def _top_keys(keys: np.ndarray, k: int, axis: int) -> np.ndarray:
+    """Indices of the k largest keys along axis, largest first"""
+    k = min(k, keys.shape[axis])
+    part = np.argpartition(-keys, k - 1, axis=axis).take(np.arange(k), axis=axis)
+    order = np.argsort(-np.take_along_axis(keys, part, axis=axis), axis=axis)
+    return np.take_along_axis(part, order, axis=axis)
+
+
+def top_matches(tables: ProfileTables, k: int = DEFAULT_TOP_K, for_role: str = "AU_PAIR",
+                now_ms: float = None, block_rows: int = DEFAULT_BLOCK_ROWS) -> Dict[str, np.ndarray]:
+    """Top-k partners per user, ordered like findMatches (score desc, then table order).
+
+    for_role="AU_PAIR" ranks hosts for every au pair; "HOST_FAMILY" ranks au pairs for
+    every host, keeping a running top-k while streaming au pair blocks.
+    """
+    scorer = Scorer(tables, now_ms)
+    rows, cols = tables.shape
+
+    if for_role == "AU_PAIR":
+        k = min(k, cols)
+        indices = np.empty((rows, k), dtype=np.int64)
+        scores = np.empty((rows, k), dtype=np.uint8)
+        # Ties resolve to the lower index, matching the stable JS sort over query order
+        dtype = _key_dtype(cols)
+        tiebreak = (cols - np.arange(cols, dtype=dtype))[None, :]
+        for start in range(0, rows, block_rows):
+            block = slice(start, min(start + block_rows, rows))
+            block_scores = scorer.block(block)
+            best = _top_keys(block_scores.astype(dtype) * dtype(cols + 1) + tiebreak, k, axis=1)
+            indices[block] = best
+            scores[block] = np.take_along_axis(block_scores, best, axis=1)
+        return {"indices": indices, "scores": scores}
+
+    k = min(k, rows)
+    dtype = _key_dtype(rows)
+    best_keys = None
+    for start in range(0, rows, block_rows):
+        block = slice(start, min(start + block_rows, rows))
+        row_index = np.arange(block.start, block.stop, dtype=dtype)[:, None]
+        keys = scorer.block(block).astype(dtype) * dtype(rows + 1) + (dtype(rows) - row_index)
+        if best_keys is None or len(best_keys) < k:
+            candidates = keys if best_keys is None else np.concatenate([best_keys, keys])
+            best_keys = np.take_along_axis(candidates, _top_keys(candidates, k, axis=0), axis=0)
+            continue
+        # Only hosts where some au pair in this block beats the current k-th best need a merge
+        entering = keys > best_keys[-1]
+        hit = np.flatnonzero(entering.any(axis=0))
+        if hit.size:
+            candidates = np.concatenate([best_keys[:, hit], np.where(entering[:, hit], keys[:, hit], -1)])
+            best_keys[:, hit] = np.take_along_axis(candidates, _top_keys(candidates, k, axis=0), axis=0)
+    return {"indices": (rows - best_keys % (rows + 1)).T.astype(np.int64),
+            "scores": (best_keys // (rows + 1)).T.astype(np.uint8)}
+
+
+def load_profiles(db_path: str = DB_PATH) -> ProfileTables:
+    """Read au pair and host family profiles (active users only) from the Prisma SQLite db"""
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    try:
+        au_pairs = [dict(row) for row in connection.execute(
+            "SELECT p.* FROM au_pair_profiles p JOIN users u ON u.id = p.userId "
+            "WHERE u.isActive = 1 ORDER BY u.rowid")]
+        hosts = [dict(row) for row in connection.execute(
+            "SELECT p.* FROM host_family_profiles p JOIN users u ON u.id = p.userId "
+            "WHERE u.isActive = 1 ORDER BY u.rowid")]
+    finally:
+        connection.close()
+    return ProfileTables(au_pairs, hosts)
+
+
+def synthetic_profiles(au_pairs: int, hosts: int, seed: int = 1) -> ProfileTables:
+    """Random but realistic profile tables for throughput runs"""
+    rng = np.random.default_rng(seed)
+    now_ms = time.time() * 1000.0
+
+    def pick(vocabulary, low, high):
+        return list(rng.choice(vocabulary, size=rng.integers(low, high + 1), replace=False))
+
+    au_pair_rows = []
+    for i in range(au_pairs):
+        available_from = now_ms + rng.normal(0, 120) * DAY_MS
+        au_pair_rows.append({
+            "userId": f"au_pair_{i}",
+            "languages": pick(LANGUAGES, 1, 4),
+            "preferredCountries": pick(COUNTRIES, 0, 3),
+            "dateOfBirth": now_ms - rng.uniform(17, 40) * YEAR_MS,
+            "availableFrom": available_from if rng.random() > 0.1 else None,
+            "availableTo": available_from + rng.uniform(90, 720) * DAY_MS,
+            "hourlyRate": float(rng.integers(8, 30)) if rng.random() > 0.1 else None
+        })
+    host_rows = [{
+        "userId": f"host_{j}",
+        "country": str(rng.choice(COUNTRIES)),
+        "preferredLanguages": pick(LANGUAGES, 0, 3),
+        "childrenAges": [int(age) for age in rng.integers(0, 18, size=rng.integers(0, 4))],
+        "maxBudget": float(rng.integers(8, 25)) if rng.random() > 0.1 else None
+    } for j in range(hosts)]
+    return ProfileTables(au_pair_rows, host_rows)
+
+
+def verify_api_matches(tables: ProfileTables, role: str = "au_pair", now_ms: float = None) -> Dict:
+    """Compare matchScore values returned by /api/matches with the oracle.
+
+    Stored scores depend on the date they were computed (age and availability use
+    "now"), so pass now_ms as the creation time when checking older rows.
+    """
+    tester = APITester()
+    response = tester.make_request("POST", "/api/demo/login", DEMO_CREDENTIALS[role])
+    if not response or response.status_code != 200:
+        return {"checked": 0, "mismatches": [], "error": "demo login failed"}
+    login = response.json()
+    user_id = login.get("user", {}).get("id")
+    response = tester.make_request("GET", "/api/matches", auth_token=login.get("accessToken"))
+    if not response or response.status_code != 200:
+        return {"checked": 0, "mismatches": [], "error": f"GET /api/matches: {getattr(response, 'status_code', 'no response')}"}
+    au_pair_index = {user: i for i, user in enumerate(tables.au_pair_ids)}
+    host_index = {user: j for j, user in enumerate(tables.host_ids)}
+    scorer = Scorer(tables, now_ms)
+
+    data = response.json()
+    matches = data.get("matches", data) if isinstance(data, dict) else data
+    checked, mismatches = 0, []
+    for match in matches or []:
+        au_pair_id = match.get("auPairId", user_id)
+        host_id = match.get("hostId", user_id)
+        if au_pair_id not in au_pair_index or host_id not in host_index:
+            continue
+        row = au_pair_index[au_pair_id]
+        expected = int(scorer.block(slice(row, row + 1))[0, host_index[host_id]])
+        checked += 1
+        if expected != match.get("matchScore"):
+            mismatches.append({"id": match.get("id"), "api": match.get("matchScore"), "oracle": expected})
+    return {"checked": checked, "mismatches": mismatches}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk match scoring reference and throughput baseline")
+    parser.add_argument("--au-pairs", type=int, default=100000, help="synthetic au pair profiles")
+    parser.add_argument("--hosts", type=int, default=10000, help="synthetic host family profiles")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--block-rows", type=int, default=DEFAULT_BLOCK_ROWS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="score profiles from this Prisma SQLite db instead of synthetic data")
+    parser.add_argument("--verify", action="store_true",
+                        help="log in via the demo API and check /api/matches scores against the oracle")
+    args = parser.parse_args(argv)
+
+    print("🧮 Au Pair Bulk Match Scoring")
+    start = time.perf_counter()
+    if args.db or args.verify:
+        tables = load_profiles(args.db or DB_PATH)
+    else:
+        tables = synthetic_profiles(args.au_pairs, args.hosts, args.seed)
+    rows, cols = tables.shape
+    print(f"Loaded {rows} au pairs x {cols} hosts in {time.perf_counter() - start:.1f}s")
+    if not rows or not cols:
+        print("⚠️  No profiles to score")
+        return 0 if not args.verify else 1
+
+    now_ms = time.time() * 1000.0
+    for role in ("AU_PAIR", "HOST_FAMILY"):
+        start = time.perf_counter()
+        top = top_matches(tables, args.top_k, role, now_ms, args.block_rows)
+        elapsed = time.perf_counter() - start
+        print(f"Top-{args.top_k} for every {role}: {elapsed:.2f}s "
+              f"({rows * cols / elapsed / 1e6:.1f}M pair scores/s), best score {int(top['scores'].max())}")
+
+    if args.verify:
+        print(f"\nVerifying /api/matches against {BASE_URL}")
+        report = verify_api_matches(tables, now_ms=now_ms)
+        if report.get("error"):
+            print(f"❌ {report['error']}")
+        print(f"Checked {report['checked']} matches, {len(report['mismatches'])} mismatches")
+        for mismatch in report["mismatches"][:20]:
+            print(f"    Details: match {mismatch['id']}: api {mismatch['api']} != oracle {mismatch['oracle']}")
+        return 1 if report["mismatches"] or report.get("error") else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
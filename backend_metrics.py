@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Request Latency Metrics for the Au Pair Backend Test Harness
+HDR-style log-linear histograms per method+route, with connect / time-to-first-byte /
+body-download splits captured from requests sessions and the asyncio load client
+"""
+
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Histogram defaults: 1us resolution up to 60s at 2 significant figures (~1% error)
+HIGHEST_TRACKABLE_US = 60_000_000
+SIGNIFICANT_FIGURES = 2
+
+# Phases reported for every request; load runs add "corrected"
+PHASES = ("total", "connect", "ttfb", "download")
+REPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+# Path segments that identify a record rather than a route
+ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|c[a-z0-9]{24}|[0-9a-f]{24,})$",
+    re.IGNORECASE)
+
+
+class LatencyHistogram:
+    """Mergeable HDR-style histogram of integer microsecond values
+
+    Counts live in a flat int64 buffer (an array, or a shared memoryview) so
+    histograms from different runs, threads or processes merge by addition.
+    """
+
+    def __init__(self, highest_us: int = HIGHEST_TRACKABLE_US,
+                 significant_figures: int = SIGNIFICANT_FIGURES, counts=None):
+        self.highest_us = highest_us
+        self.significant_figures = significant_figures
+        largest_single_unit = 2 * 10 ** significant_figures
+        self.sub_bucket_count_magnitude = (largest_single_unit - 1).bit_length()
+        self.sub_bucket_half_count_magnitude = self.sub_bucket_count_magnitude - 1
+        self.sub_bucket_count = 1 << self.sub_bucket_count_magnitude
+        self.sub_bucket_half_count = self.sub_bucket_count >> 1
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+
+        bucket_count = 1
+        smallest_untrackable = self.sub_bucket_count
+        while smallest_untrackable <= highest_us:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts_len = (bucket_count + 1) * self.sub_bucket_half_count
+
+        if counts is None:
+            counts = array("q", bytes(8 * self.counts_len))
+        elif len(counts) != self.counts_len:
+            raise ValueError(f"Expected {self.counts_len} counts, got {len(counts)}")
+        self.counts = counts
+
+    def _index(self, value: int) -> int:
+        bucket_index = (value | self.sub_bucket_mask).bit_length() - self.sub_bucket_count_magnitude
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self.sub_bucket_half_count_magnitude) + \
+            sub_bucket_index - self.sub_bucket_half_count
+
+    def _bucket_range(self, index: int):
+        """Lowest value and width of the bucket at a counts index"""
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return sub_bucket_index << bucket_index, 1 << bucket_index
+
+    def record(self, value_us: int, count: int = 1):
+        """Record a value in microseconds, clamped to the trackable range"""
+        value = min(max(int(value_us), 0), self.highest_us)
+        self.counts[self._index(value)] += count
+
+    def record_seconds(self, seconds: float, count: int = 1):
+        """Record a duration given in seconds"""
+        self.record(int(seconds * 1_000_000), count)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add another histogram's counts into this one"""
+        if other.counts_len != self.counts_len:
+            raise ValueError("Cannot merge histograms with different layouts")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+
+    def reset(self):
+        """Clear all counts in place"""
+        for index in range(self.counts_len):
+            self.counts[index] = 0
+
+    @property
+    def total_count(self) -> int:
+        return sum(self.counts)
+
+    def value_at_percentile(self, pct: float) -> int:
+        """Highest equivalent value (us) at or below which pct percent of samples fall"""
+        total = self.total_count
+        if total == 0:
+            return 0
+        target = max(1, math.ceil(pct / 100.0 * total))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                low, width = self._bucket_range(index)
+                return min(low + width - 1, self.highest_us)
+        return self.highest_us
+
+    def max_value(self) -> int:
+        for index in range(self.counts_len - 1, -1, -1):
+            if self.counts[index]:
+                low, width = self._bucket_range(index)
+                return min(low + width - 1, self.highest_us)
+        return 0
+
+    def mean(self) -> float:
+        total = 0
+        weighted = 0.0
+        for index, count in enumerate(self.counts):
+            if count:
+                low, width = self._bucket_range(index)
+                total += count
+                weighted += count * (low + (width - 1) / 2.0)
+        return weighted / total if total else 0.0
+
+    def iter_buckets(self):
+        """Yield (lowest value us, bucket width us, count) for every non-empty bucket"""
+        for index, count in enumerate(self.counts):
+            if count:
+                low, width = self._bucket_range(index)
+                yield low, width, count
+
+    def percentiles_ms(self, percentiles=REPORT_PERCENTILES) -> Dict[str, float]:
+        """Percentiles in milliseconds keyed like 'p99.9'"""
+        return {f"p{pct:g}": self.value_at_percentile(pct) / 1000.0 for pct in percentiles}
+
+    def to_dict(self) -> Dict:
+        """Sparse, JSON-serializable form of the histogram"""
+        return {
+            "highest_us": self.highest_us,
+            "significant_figures": self.significant_figures,
+            "counts": {str(index): count for index, count in enumerate(self.counts) if count}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls(data["highest_us"], data["significant_figures"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        return histogram
+
+
+# Callbacks invoked as (key, status_code or None, timings) for every recorded request,
+# used to place individual latencies on a wall-clock timeline
+_observers: List[Callable[[str, Optional[int], Dict[str, float]], None]] = []
+
+
+def add_observer(callback: Callable[[str, Optional[int], Dict[str, float]], None]):
+    _observers.append(callback)
+
+
+def remove_observer(callback: Callable[[str, Optional[int], Dict[str, float]], None]):
+    if callback in _observers:
+        _observers.remove(callback)
+
+
+def normalize_route(endpoint: str) -> str:
+    """Reduce a URL or path to its route: no host or query, record ids replaced by :id"""
+    path = urlsplit(endpoint).path or "/"
+    segments = [":id" if ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+class RequestMetrics:
+    """Per method+route latency histograms, status counts and error counts"""
+
+    def __init__(self):
+        self.routes: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, key: str) -> Dict:
+        if key not in self.routes:
+            self.routes[key] = {"phases": {}, "statuses": Counter(), "errors": Counter()}
+        return self.routes[key]
+
+    def record(self, method: str, endpoint: str, status_code: int, timings: Dict[str, float]):
+        """Record a completed request; timings are in seconds keyed by phase"""
+        self.record_as(f"{method.upper()} {normalize_route(endpoint)}", status_code, timings)
+
+    def record_as(self, key: str, status_code: int, timings: Dict[str, float]):
+        """Record a completed request under an explicit key such as a scenario step"""
+        with self._lock:
+            route = self._route(key)
+            route["statuses"][status_code] += 1
+            for phase, seconds in timings.items():
+                if phase not in route["phases"]:
+                    route["phases"][phase] = LatencyHistogram()
+                route["phases"][phase].record_seconds(seconds)
+        for callback in _observers:
+            callback(key, status_code, timings)
+
+    def record_error(self, method: str, endpoint: str, error: str, timings: Dict[str, float] = None):
+        """Record a request that failed without a response"""
+        self.record_error_as(f"{method.upper()} {normalize_route(endpoint)}", error, timings)
+
+    def record_error_as(self, key: str, error: str, timings: Dict[str, float] = None):
+        """Record a failed request under an explicit key"""
+        with self._lock:
+            route = self._route(key)
+            route["errors"][error] += 1
+            for phase, seconds in (timings or {}).items():
+                if phase not in route["phases"]:
+                    route["phases"][phase] = LatencyHistogram()
+                route["phases"][phase].record_seconds(seconds)
+        for callback in _observers:
+            callback(key, None, timings or {})
+
+    def merge(self, other: "RequestMetrics"):
+        """Fold another RequestMetrics into this one"""
+        with self._lock:
+            for key, other_route in other.routes.items():
+                route = self._route(key)
+                route["statuses"].update(other_route["statuses"])
+                route["errors"].update(other_route["errors"])
+                for phase, histogram in other_route["phases"].items():
+                    if phase not in route["phases"]:
+                        route["phases"][phase] = LatencyHistogram()
+                    route["phases"][phase].merge(histogram)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Counts and percentile breakdown (ms) per route and phase"""
+        summary = {}
+        for key, route in sorted(self.routes.items()):
+            summary[key] = {
+                "count": sum(route["statuses"].values()),
+                "statuses": dict(route["statuses"]),
+                "errors": dict(route["errors"]),
+                "phases": {phase: dict(histogram.percentiles_ms(), max=histogram.max_value() / 1000.0)
+                           for phase, histogram in route["phases"].items()}
+            }
+        return summary
+
+    def print_summary(self):
+        """Print per-route latency percentiles with phase splits"""
+        print("\n" + "="*50)
+        print("LATENCY SUMMARY (ms)")
+        print("="*50)
+        for key, stats in self.summary().items():
+            errors = sum(stats["errors"].values())
+            print(f"\n{key}  ({stats['count']} responses, {errors} errors)")
+            phases = [p for p in PHASES if p in stats["phases"]] + \
+                [p for p in stats["phases"] if p not in PHASES]
+            for phase in phases:
+                values = stats["phases"][phase]
+                print(f"    {phase:<10} p50 {values['p50']:8.2f}  p90 {values['p90']:8.2f}  "
+                      f"p99 {values['p99']:8.2f}  p99.9 {values['p99.9']:8.2f}")
+
+    def to_dict(self) -> Dict:
+        return {
+            key: {
+                "statuses": {str(code): count for code, count in route["statuses"].items()},
+                "errors": dict(route["errors"]),
+                "phases": {phase: histogram.to_dict() for phase, histogram in route["phases"].items()}
+            }
+            for key, route in self.routes.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RequestMetrics":
+        metrics = cls()
+        for key, route_data in data.items():
+            route = metrics._route(key)
+            route["statuses"].update({int(code): count for code, count in route_data["statuses"].items()})
+            route["errors"].update(route_data["errors"])
+            for phase, histogram in route_data["phases"].items():
+                route["phases"][phase] = LatencyHistogram.from_dict(histogram)
+        return metrics
+
+
+# Connect time and count are accumulated per thread by the connection classes below
+# and read back by timed_request, since urllib3 gives no per-request timing hooks.
+_connect_timer = threading.local()
+
+
+def _add_connect_time(seconds: float):
+    _connect_timer.elapsed = getattr(_connect_timer, "elapsed", 0.0) + seconds
+    _connect_timer.opened = getattr(_connect_timer, "opened", 0) + 1
+
+
+def connections_opened() -> int:
+    """Connections the last timed_request on this thread had to open (0 = reused a pooled one)"""
+    return getattr(_connect_timer, "opened", 0)
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report how long connect (and TLS) took"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool
+        }
+
+
+def timed_session(pool_size: int = DEFAULT_POOLSIZE) -> requests.Session:
+    """requests.Session with connect timing enabled for http and https
+
+    pool_size is the number of keep-alive connections kept per host.
+    """
+    session = requests.Session()
+    session.mount("http://", TimingHTTPAdapter(pool_maxsize=pool_size))
+    session.mount("https://", TimingHTTPAdapter(pool_maxsize=pool_size))
+    return session
+
+
+def timed_request(metrics: RequestMetrics, method: str, url: str,
+                  session: Optional[requests.Session] = None, route: str = None,
+                  **kwargs) -> requests.Response:
+    """Issue a request, recording connect / TTFB / download / total into metrics
+
+    Without a session a throwaway one is used, matching requests.get() semantics
+    of a fresh connection per call. Exceptions are recorded and re-raised.
+    """
+    own_session = session is None
+    if own_session:
+        session = timed_session()
+    route = route or url
+    _connect_timer.elapsed = 0.0
+    _connect_timer.opened = 0
+    start = time.perf_counter()
+    try:
+        response = session.request(method, url, stream=True, **kwargs)
+        first_byte = time.perf_counter()
+        response.content
+        done = time.perf_counter()
+    except requests.exceptions.RequestException as e:
+        metrics.record_error(method, route, type(e).__name__,
+                             {"total": time.perf_counter() - start})
+        raise
+    finally:
+        if own_session:
+            session.close()
+
+    metrics.record(method, route, response.status_code, {
+        "total": done - start,
+        "connect": _connect_timer.elapsed,
+        "ttfb": first_byte - start,
+        "download": done - first_byte
+    })
+    return response
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Response Payload Size and Compression Profiler for Au Pair Backend
+Fetches each endpoint several times and records raw, gzip and (if the brotli
+package is installed) brotli sizes, a per-field byte breakdown of the JSON,
+duplicated sub-objects within a response and how much repeats between calls.
+Bandwidth cost is projected per route at a given request rate.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from backend_test import BASE_URL, DEMO_CREDENTIALS, DEMO_ENDPOINTS, PROTECTED_ENDPOINTS, APITester
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# requests can only decode br when brotli is importable, so only advertise it then
+ACCEPT_ENCODING = "gzip, br" if brotli else "gzip"
+
+DEFAULT_REPEAT = 3
+DEFAULT_RATE = 10.0
+DEFAULT_TOP_FIELDS = 5
+FIELD_DEPTH = 3
+# express' compression middleware defaults to zlib level 6
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+# Sub-objects smaller than this are not worth reporting as duplicates
+MIN_DUPLICATE_BYTES = 64
+GB = 1024 ** 3
+USER_ID = "{userId}"
+DEFAULT_ENDPOINTS = ["/api/admin/users", "/api/users/search", f"/api/messages/with/{USER_ID}"] + \
+    [endpoint for method, endpoint in PROTECTED_ENDPOINTS + DEMO_ENDPOINTS if method == "GET"]
+
+
+def compact(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def field_bytes(value, path: str = "$", depth: int = 0, sizes: Dict[str, int] = None) -> Dict[str, int]:
+    """Serialized bytes per JSON path (list items folded into []), down to FIELD_DEPTH levels"""
+    sizes = sizes if sizes is not None else defaultdict(int)
+    if depth >= FIELD_DEPTH:
+        return sizes
+    if isinstance(value, dict):
+        for key, item in value.items():
+            child = f"{path}.{key}"
+            # Key, quotes, colon and separator count towards the field
+            sizes[child] += len(compact(item)) + len(key.encode()) + 4
+            field_bytes(item, child, depth + 1, sizes)
+    elif isinstance(value, list):
+        for item in value:
+            field_bytes(item, f"{path}[]", depth, sizes)
+    return sizes
+
+
+def duplicate_bytes(value) -> int:
+    """Bytes spent on repeated copies of identical sub-objects (e.g. the same user per message)"""
+    seen = Counter()
+    sizes = {}
+
+    def walk(node):
+        if isinstance(node, dict):
+            encoded = compact(node)
+            if len(encoded) >= MIN_DUPLICATE_BYTES:
+                digest = hashlib.blake2b(encoded, digest_size=16).digest()
+                seen[digest] += 1
+                sizes[digest] = len(encoded)
+                if seen[digest] > 1:
+                    # Children of a repeated object are already counted with it
+                    return
+            for item in node.values():
+                walk(item)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(value)
+    return sum((count - 1) * sizes[digest] for digest, count in seen.items() if count > 1)
+
+
+def leaf_values(value, path: str = "$") -> Dict[str, str]:
+    """Flattened path -> canonical value, used to compare repeated calls"""
+    if isinstance(value, dict):
+        leaves = {}
+        for key, item in value.items():
+            leaves.update(leaf_values(item, f"{path}.{key}"))
+        return leaves
+    if isinstance(value, list):
+        leaves = {}
+        for index, item in enumerate(value):
+            leaves.update(leaf_values(item, f"{path}[{index}]"))
+        return leaves
+    return {path: compact(value).decode()}
+
+
+def profile_endpoint(tester: APITester, endpoint: str, token: Optional[str], repeat: int) -> Dict:
+    """Fetch endpoint `repeat` times and measure size, compressibility and redundancy"""
+    bodies: List[bytes] = []
+    statuses = Counter()
+    served = Counter()
+    headers = {}
+    for _ in range(repeat):
+        response = tester.make_request("GET", endpoint, headers={"Accept-Encoding": ACCEPT_ENCODING}, auth_token=token)
+        if response is None:
+            statuses["no response"] += 1
+            continue
+        statuses[response.status_code] += 1
+        served[response.headers.get("Content-Encoding", "identity")] += 1
+        headers = response.headers
+        bodies.append(response.content)
+    if not bodies:
+        return {"statuses": dict(statuses)}
+
+    body = bodies[-1]
+    profile = {
+        "statuses": dict(statuses),
+        "served_encoding": served.most_common(1)[0][0],
+        "cache_headers": {name: headers[name] for name in ("ETag", "Cache-Control") if name in headers},
+        "raw": len(body),
+        "gzip": len(gzip.compress(body, GZIP_LEVEL)),
+        "brotli": len(brotli.compress(body, quality=BROTLI_QUALITY)) if brotli else None,
+        "identical_repeats": sum(1 for other in bodies[:-1] if other == body),
+    }
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return profile
+
+    fields = field_bytes(data)
+    profile["fields"] = sorted(fields.items(), key=lambda item: -item[1])
+    profile["duplicate"] = duplicate_bytes(data)
+    if len(bodies) > 1:
+        try:
+            previous = leaf_values(json.loads(bodies[-2]))
+            current = leaf_values(data)
+            unchanged = sum(len(value) for path, value in current.items() if previous.get(path) == value)
+            profile["unchanged_share"] = unchanged / max(sum(len(value) for value in current.values()), 1)
+        except ValueError:
+            pass
+    return profile
+
+
+def bandwidth(size: int, rate: float) -> Tuple[float, float]:
+    """(GB per day, GB per 30 days) at rate requests per second"""
+    per_day = size * rate * 86400 / GB
+    return per_day, per_day * 30
+
+
+def print_payload_report(profiles: Dict[str, Dict], rate: float, top_fields: int):
+    print("\n" + "="*50)
+    print("PAYLOAD PROFILE")
+    print("="*50)
+    print(f"Bandwidth projected at {rate:g} req/s per route")
+    ranked = sorted(profiles.items(), key=lambda item: -item[1].get("raw", 0))
+    for endpoint, profile in ranked:
+        if "raw" not in profile:
+            print(f"\n⚠️  GET {endpoint}: no response ({profile['statuses']})")
+            continue
+        raw, gz = profile["raw"], profile["gzip"]
+        day, month = bandwidth(raw, rate)
+        gz_day, gz_month = bandwidth(gz, rate)
+        status = "✅" if profile["served_encoding"] != "identity" or raw < 1024 else "⚠️ "
+        print(f"\n{status} GET {endpoint}  {profile['statuses']}")
+        sizes = f"raw {raw / 1024:.1f}KB, gzip {gz / 1024:.1f}KB ({gz / raw * 100 if raw else 0:.0f}%)"
+        if profile["brotli"] is not None:
+            sizes += f", brotli {profile['brotli'] / 1024:.1f}KB ({profile['brotli'] / raw * 100 if raw else 0:.0f}%)"
+        print(f"    {sizes}, served as {profile['served_encoding']}")
+        print(f"    Bandwidth: {day:.2f} GB/day ({month:.1f} GB/month) raw, "
+              f"{gz_day:.2f} GB/day ({gz_month:.1f} GB/month) gzipped")
+        if profile.get("duplicate"):
+            print(f"    Duplicated sub-objects: {profile['duplicate'] / 1024:.1f}KB "
+                  f"({profile['duplicate'] / raw * 100:.0f}% of the body)")
+        if "unchanged_share" in profile:
+            cache = ", ".join(f"{k}: {v}" for k, v in profile["cache_headers"].items()) or "no ETag/Cache-Control"
+            print(f"    Repeat calls: {profile['identical_repeats']} byte-identical, "
+                  f"{profile['unchanged_share'] * 100:.0f}% of values unchanged ({cache})")
+        for path, size in profile.get("fields", [])[:top_fields]:
+            print(f"      {size / 1024:8.1f}KB {size / raw * 100:5.1f}%  {path}")
+    if not brotli:
+        print("\n⚠️  brotli not installed; only gzip sizes were measured")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile response sizes, compression and redundancy per endpoint")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help=f"GET path to profile (repeatable); {USER_ID} is replaced by the partner's id")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="calls per endpoint")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="requests per second for bandwidth cost")
+    parser.add_argument("--role", choices=sorted(DEMO_CREDENTIALS), default="au_pair", help="demo user to log in as")
+    parser.add_argument("--top-fields", type=int, default=DEFAULT_TOP_FIELDS, help="largest JSON fields to list")
+    parser.add_argument("--output", help="write the full profiles to this JSON file")
+    args = parser.parse_args(argv)
+
+    print("📦 Starting Au Pair payload profile")
+    print(f"Testing against: {BASE_URL}")
+    tester = APITester()
+    users = {}
+    for role, creds in DEMO_CREDENTIALS.items():
+        response = tester.make_request("POST", "/api/demo/login", creds)
+        if response and response.status_code == 200:
+            users[role] = response.json()
+    token = users.get(args.role, {}).get("accessToken")
+    if not token:
+        print("⚠️  Demo login failed, endpoints will be called without a token")
+    partner = next((data.get("user", {}).get("id") for role, data in users.items() if role != args.role), None)
+
+    profiles = {}
+    for endpoint in args.endpoints or DEFAULT_ENDPOINTS:
+        if USER_ID in endpoint:
+            if not partner:
+                print(f"⚠️  Skipping {endpoint}: no partner user id")
+                continue
+            endpoint = endpoint.replace(USER_ID, partner)
+        profiles[endpoint] = profile_endpoint(tester, endpoint, token, args.repeat)
+
+    print_payload_report(profiles, args.rate, args.top_fields)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(profiles, f, indent=2)
+        print(f"\nProfiles written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Per-request SQL Profiler and N+1 Detector for Au Pair Backend
+Starts the backend with PRISMA_QUERY_LOG pointing at a local JSONL sink, tags
+every request with an X-Request-Id header and attributes the Prisma queries, DB
+time and (replayed) rows to each API call. Endpoints are called with growing
+?limit= values so routes whose query count grows with result size are flagged.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from backend_test import BASE_URL, DEMO_CREDENTIALS, PROTECTED_ENDPOINTS, APITester
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+DB_PATH = os.path.join(BACKEND_DIR, "prisma", "dev.db")
+# dict.fromkeys drops the PROTECTED_ENDPOINTS entries already listed while keeping order
+DEFAULT_ENDPOINTS = list(dict.fromkeys(
+    ["/api/admin/dashboard", "/api/messages/conversations", "/api/matches/recent"] +
+    [endpoint for method, endpoint in PROTECTED_ENDPOINTS if method == "GET"]))
+DEFAULT_LIMITS = (1, 5, 10, 25, 50)
+STARTUP_TIMEOUT = 30.0
+SINK_WAIT = 2.0
+# Query count growth per returned item above which an endpoint is flagged as N+1
+N_PLUS_ONE_SLOPE = 0.5
+# The same statement shape this many times in one request also counts as N+1
+REPEATED_STATEMENT = 3
+
+IN_LIST = re.compile(r"IN \((\?,\s*)+\?\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(query: str) -> str:
+    """Normalize SQL so executions of the same statement compare equal"""
+    return IN_LIST.sub("IN (?...)", WHITESPACE.sub(" ", query.strip()))
+
+
+def result_size(body) -> int:
+    """Length of the largest list in a JSON body (top level or one level down)"""
+    if isinstance(body, list):
+        return len(body)
+    if isinstance(body, dict):
+        sizes = [len(value) for value in body.values() if isinstance(value, list)]
+        sizes += [result_size(value) for value in body.values() if isinstance(value, dict)]
+        return max(sizes, default=0)
+    return 0
+
+
+class QuerySink:
+    """Reads the backend's JSONL query log incrementally"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = os.path.getsize(path) if os.path.exists(path) else 0
+        self.pending: List[Dict] = []
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        # Keep a partially written last line for the next read
+        complete = data.rfind(b"\n") + 1
+        self.offset += complete
+        for line in data[:complete].splitlines():
+            try:
+                self.pending.append(json.loads(line))
+            except ValueError:
+                continue
+
+    def window(self, request_id: str, timeout: float = SINK_WAIT) -> Optional[List[Dict]]:
+        """Query records logged between the start and end markers of request_id"""
+        deadline = time.monotonic() + timeout
+        while True:
+            self._read()
+            ids = [(i, record) for i, record in enumerate(self.pending)
+                   if record.get("type") == "request" and record.get("id") == request_id]
+            start = next((i for i, record in ids if record["phase"] == "start"), None)
+            end = next((i for i, record in ids if record["phase"] == "end"), None)
+            if start is not None and end is not None:
+                queries = [record for record in self.pending[start:end] if record.get("type") == "query"]
+                self.pending = self.pending[end + 1:]
+                return queries
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(0.01)
+
+
+class SqlReplayer:
+    """Re-runs captured SELECTs against a read-only database copy to count rows"""
+
+    def __init__(self, db_path: str):
+        self.connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.table_rows: Dict[str, int] = {}
+        self.cache: Dict[Tuple[str, str], Optional[Tuple[int, int]]] = {}
+
+    def _table_rows(self, table: str) -> int:
+        if table not in self.table_rows:
+            try:
+                self.table_rows[table] = self.connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            except sqlite3.Error:
+                self.table_rows[table] = 0
+        return self.table_rows[table]
+
+    def measure(self, query: str, params: str) -> Optional[Tuple[int, int]]:
+        """(rows returned, estimated rows scanned) or None if the statement cannot be replayed.
+
+        Full scans are charged the table's row count; index searches the rows returned.
+        """
+        key = (query, params)
+        if key in self.cache:
+            return self.cache[key]
+        result = None
+        if query.lstrip().upper().startswith("SELECT"):
+            try:
+                values = json.loads(params) if params else []
+                plan = self.connection.execute(f"EXPLAIN QUERY PLAN {query}", values).fetchall()
+                returned = len(self.connection.execute(query, values).fetchall())
+                scanned = 0
+                for _, _, _, detail in plan:
+                    match = re.match(r"SCAN (?:main\.)?[`\"]?(\w+)", detail)
+                    if match:
+                        scanned += self._table_rows(match.group(1))
+                result = (returned, max(scanned, returned))
+            except (sqlite3.Error, ValueError):
+                result = None
+        self.cache[key] = result
+        return result
+
+    def close(self):
+        self.connection.close()
+
+
+def start_backend(sink_path: Optional[str], db_path: str = None, node_args: List[str] = ()) -> subprocess.Popen:
+    """Run backend/dist/index.js with the query log enabled and wait for /health.
+
+    db_path points Prisma at a different SQLite file (e.g. a copy with extra indexes);
+    node_args are passed to node itself (e.g. --cpu-prof). Without sink_path the
+    query log stays off.
+    """
+    parts = urlsplit(BASE_URL)
+    env = dict(os.environ, PORT=str(parts.port or 80))
+    if sink_path:
+        env["PRISMA_QUERY_LOG"] = sink_path
+    if db_path:
+        env["PRISMA_DATASOURCE_URL"] = f"file:{os.path.abspath(db_path)}"
+    process = subprocess.Popen(["node", *node_args, "dist/index.js"], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {process.returncode}")
+        try:
+            if requests.get(f"{BASE_URL}/health", timeout=1).status_code == 200:
+                return process
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Backend did not become healthy in time")
+
+
+def with_limit(endpoint: str, limit: int) -> str:
+    return f"{endpoint}{'&' if '?' in endpoint else '?'}limit={limit}"
+
+
+def profile_endpoint(tester: APITester, sink: QuerySink, replayer: Optional[SqlReplayer], token: str,
+                     endpoint: str, limits, repeat: int) -> List[Dict]:
+    """Call endpoint serially at each limit and attribute the logged queries to each call"""
+    samples = []
+    for limit in limits:
+        for _ in range(repeat):
+            request_id = uuid.uuid4().hex
+            start = time.perf_counter()
+            response = tester.make_request("GET", with_limit(endpoint, limit),
+                                           headers={"X-Request-Id": request_id}, auth_token=token)
+            latency_ms = (time.perf_counter() - start) * 1000
+            if response is None:
+                continue
+            queries = sink.window(request_id)
+            if queries is None:
+                print(f"⚠️  No query-log markers for {endpoint}; is the backend running with PRISMA_QUERY_LOG?")
+                return samples
+            try:
+                items = result_size(response.json())
+            except ValueError:
+                items = 0
+
+            sample = {"limit": limit, "status": response.status_code, "items": items, "latency_ms": latency_ms,
+                      "queries": len(queries), "db_ms": sum(q.get("durationMs", 0) for q in queries),
+                      "statements": Counter(statement_shape(q["query"]) for q in queries),
+                      "rows_returned": None, "rows_scanned": None}
+            if replayer:
+                measured = [replayer.measure(q["query"], q.get("params", "")) for q in queries]
+                measured = [m for m in measured if m]
+                sample["rows_returned"] = sum(m[0] for m in measured)
+                sample["rows_scanned"] = sum(m[1] for m in measured)
+            samples.append(sample)
+    return samples
+
+
+def _slope(xs: List[float], ys: List[float]) -> float:
+    """Least-squares slope of ys over xs (0 when xs do not vary)"""
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def analyze(samples: List[Dict]) -> Dict:
+    """Per-endpoint totals plus an N+1 verdict"""
+    ok = [sample for sample in samples if sample["status"] < 400]
+    report = {"requests": len(samples), "ok": len(ok), "statuses": dict(Counter(s["status"] for s in samples)),
+              "n_plus_one": [], "repeated": []}
+    if not ok:
+        return report
+
+    report.update(
+        items=(min(s["items"] for s in ok), max(s["items"] for s in ok)),
+        queries=(min(s["queries"] for s in ok), statistics.fmean(s["queries"] for s in ok),
+                 max(s["queries"] for s in ok)),
+        db_ms=statistics.fmean(s["db_ms"] for s in ok),
+        latency_ms=statistics.median(s["latency_ms"] for s in ok),
+        slope=_slope([s["items"] for s in ok], [s["queries"] for s in ok]))
+    if ok[0]["rows_scanned"] is not None:
+        report["rows_returned"] = statistics.fmean(s["rows_returned"] for s in ok)
+        report["rows_scanned"] = statistics.fmean(s["rows_scanned"] for s in ok)
+
+    if report["items"][1] - report["items"][0] >= 3 and report["slope"] >= N_PLUS_ONE_SLOPE:
+        report["n_plus_one"].append(f"{report['slope']:.2f} extra queries per returned item")
+    largest = max(ok, key=lambda s: s["items"])
+    for shape, count in largest["statements"].most_common():
+        if count < REPEATED_STATEMENT:
+            break
+        report["repeated"].append((count, shape))
+        report["n_plus_one"].append(f"same statement {count}x in one request ({largest['items']} items)")
+    return report
+
+
+def print_report(reports: Dict[str, Dict]):
+    """Print query counts, DB time, rows and N+1 flags next to latency"""
+    print("\n" + "="*50)
+    print("SQL PER REQUEST")
+    print("="*50)
+    for endpoint, report in reports.items():
+        if not report["ok"]:
+            print(f"\n⚠️  {endpoint}: no successful responses ({report['statuses']})")
+            continue
+        status = "❌ N+1" if report["n_plus_one"] else "✅ OK"
+        low, mean, high = report["queries"]
+        print(f"\n{status}: GET {endpoint}  ({report['ok']} requests, items {report['items'][0]}-{report['items'][1]})")
+        print(f"    queries/request {low}-{high} (mean {mean:.1f}), DB {report['db_ms']:.1f}ms, "
+              f"latency p50 {report['latency_ms']:.1f}ms")
+        if "rows_scanned" in report:
+            print(f"    rows returned {report['rows_returned']:.0f}, est. rows scanned {report['rows_scanned']:.0f}")
+        for reason in report["n_plus_one"]:
+            print(f"    Details: {reason}")
+        for count, shape in report["repeated"][:3]:
+            print(f"      {count}x {shape[:140]}")
+        if high == 0:
+            print("    Note: no Prisma queries logged (route may read through Supabase)")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Attribute Prisma SQL to API calls and flag N+1 endpoints")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", help="GET path to profile (repeatable)")
+    parser.add_argument("--limits", default=",".join(map(str, DEFAULT_LIMITS)),
+                        help="comma-separated ?limit= values used to grow result size")
+    parser.add_argument("--repeat", type=int, default=3, help="requests per endpoint and limit")
+    parser.add_argument("--role", choices=sorted(DEMO_CREDENTIALS), default="au_pair", help="demo user to log in as")
+    parser.add_argument("--sink", help="query log path (default: a temporary file)")
+    parser.add_argument("--no-start", action="store_true",
+                        help="use a backend already running with PRISMA_QUERY_LOG=<--sink>")
+    parser.add_argument("--db", default=DB_PATH, help="database used to replay SELECTs for row counts")
+    parser.add_argument("--no-replay", action="store_true", help="skip replaying SELECTs")
+    args = parser.parse_args(argv)
+
+    if args.no_start and not args.sink:
+        parser.error("--no-start needs --sink")
+    sink_path = args.sink or os.path.join(tempfile.mkdtemp(prefix="aupair-sql-"), "queries.jsonl")
+    print("🔎 Starting Au Pair SQL-per-request profile")
+    print(f"Testing against: {BASE_URL}, query log: {sink_path}")
+
+    process = None
+    replayer = None
+    try:
+        if not args.no_start:
+            process = start_backend(sink_path)
+        sink = QuerySink(sink_path)
+        tester = APITester()
+        response = tester.make_request("POST", "/api/demo/login", DEMO_CREDENTIALS[args.role])
+        token = response.json().get("accessToken") if response and response.status_code == 200 else None
+        if not token:
+            print("⚠️  Demo login failed, endpoints will be called without a token")
+        if not args.no_replay and os.path.exists(args.db):
+            replayer = SqlReplayer(args.db)
+
+        limits = [int(limit) for limit in args.limits.split(",") if limit]
+        reports = {}
+        for endpoint in args.endpoints or DEFAULT_ENDPOINTS:
+            samples = profile_endpoint(tester, sink, replayer, token, endpoint, limits, args.repeat)
+            reports[endpoint] = analyze(samples)
+        print_report(reports)
+        tester.metrics.print_summary()
+        return 1 if any(report["n_plus_one"] for report in reports.values()) else 0
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 2
+    finally:
+        if replayer:
+            replayer.close()
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
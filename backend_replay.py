@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Access-log Trace Replay for Au Pair Backend
+Parses morgan "combined" access logs (as printed by the backend and captured in
+the Render logs under attached_assets/) and replays every request against a local
+backend with the original inter-arrival times, optionally sped up (2x, 10x...).
+Each client (address + user agent) in the log is bound to a demo user.
+"""
+
+import argparse
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from backend_metrics import LatencyHistogram, RequestMetrics, normalize_route
+from backend_results import save_run
+from backend_test import BASE_URL, DEMO_CREDENTIALS, APITester
+
+DEFAULT_SPEEDS = "1"
+DEFAULT_WORKERS = 64
+CORS_ORIGIN = "https://au-pair.netlify.app"
+# Methods APITester.make_request can send; CORS preflights and HEAD probes are counted but skipped
+REPLAYABLE_METHODS = ("GET", "POST", "PUT", "DELETE")
+
+# morgan "combined", optionally behind Render's RFC 3339 log timestamp
+LOG_LINE = re.compile(
+    r'^(?:(?P<iso>\d{4}-\d{2}-\d{2}T[\d:.]+Z)\s+)?'
+    r'(?P<addr>\S+) \S+ \S+ \[(?P<clf>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) [^"]*" (?P<status>\d{3}) \S+'
+    r'(?: "(?P<referer>[^"]*)" "(?P<agent>[^"]*)")?'
+)
+
+
+class LogEntry:
+    """One request line from an access log"""
+
+    def __init__(self, at: float, client: str, method: str, path: str, status: int):
+        self.at = at
+        self.client = client
+        self.method = method
+        self.path = path
+        self.status = status
+
+
+def _timestamp(match) -> float:
+    if match.group("iso"):
+        # Render prints nanoseconds; datetime only takes microseconds
+        iso = re.sub(r"(\.\d{6})\d*", r"\1", match.group("iso").replace("Z", "+00:00"))
+        return datetime.fromisoformat(iso).timestamp()
+    return datetime.strptime(match.group("clf"), "%d/%b/%Y:%H:%M:%S %z").timestamp()
+
+
+def parse_log(paths: List[str], rewrites: List[Tuple[str, str]] = ()) -> List[LogEntry]:
+    """Request lines from the given logs in time order; other lines are ignored"""
+    entries = []
+    for path in paths:
+        with open(path, errors="replace") as f:
+            for line in f:
+                match = LOG_LINE.match(line.strip())
+                if not match:
+                    continue
+                request_path = match.group("path")
+                for old, new in rewrites:
+                    if request_path.startswith(old):
+                        request_path = new + request_path[len(old):]
+                        break
+                client = f"{match.group('addr')} {match.group('agent') or ''}"
+                entries.append(LogEntry(_timestamp(match), client, match.group("method"), request_path,
+                                        int(match.group("status"))))
+    # Stable sort keeps log order for requests logged within the same second
+    entries.sort(key=lambda entry: entry.at)
+    return entries
+
+
+class UserMap:
+    """Binds each log client to a demo user, logging in once per demo account"""
+
+    def __init__(self, roles: List[str]):
+        self.roles = roles
+        self.clients: Dict[str, str] = {}
+        self.tokens: Dict[str, Optional[str]] = {}
+
+    def role(self, client: str) -> str:
+        if client not in self.clients:
+            self.clients[client] = self.roles[len(self.clients) % len(self.roles)]
+        return self.clients[client]
+
+    def login(self, tester: APITester):
+        for role in set(self.clients.values()):
+            response = tester.make_request("POST", "/api/demo/login", DEMO_CREDENTIALS[role])
+            ok = response is not None and response.status_code == 200
+            self.tokens[role] = response.json().get("accessToken") if ok else None
+            if not self.tokens[role]:
+                print(f"⚠️  Demo login failed for {role}, its requests will be sent without a token")
+
+
+def request_body(entry: LogEntry, role: str) -> Optional[Dict]:
+    """Access logs carry no bodies; send ones the auth routes accept and {} elsewhere"""
+    if entry.method not in ("POST", "PUT"):
+        return None
+    route = entry.path.split("?")[0]
+    if route.endswith("/login"):
+        return dict(DEMO_CREDENTIALS[role])
+    if route.endswith("/register"):
+        return {"email": f"replay_{uuid.uuid4().hex[:12]}@test.com", "password": "replay_password",
+                "role": role.upper()}
+    return {}
+
+
+class ReplayRun:
+    """Outcome of one replay pass at a given speed-up"""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.metrics = RequestMetrics()
+        self.dispatch_lag = LatencyHistogram()
+        self.skipped = Counter()
+        self.status_pairs = defaultdict(Counter)
+        self.sent = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, entry: LogEntry, status: str):
+        with self._lock:
+            self.status_pairs[f"{entry.method} {normalize_route(entry.path)}"][(str(entry.status), status)] += 1
+
+    def summary(self, span: float) -> Dict:
+        mismatches = {route: sum(count for (logged, replayed), count in pairs.items() if logged != replayed)
+                      for route, pairs in self.status_pairs.items()}
+        return {
+            "speed": self.speed,
+            "sent": self.sent,
+            "skipped": dict(self.skipped),
+            "elapsed": self.elapsed,
+            "target_seconds": span / self.speed,
+            "rate": self.sent / self.elapsed if self.elapsed else 0.0,
+            "dispatch_lag_ms": self.dispatch_lag.percentiles_ms(),
+            "status_mismatches": {route: count for route, count in mismatches.items() if count},
+        }
+
+
+def replay(entries: List[LogEntry], users: UserMap, speed: float, workers: int) -> ReplayRun:
+    """Send every entry at its original offset divided by speed, open-loop"""
+    run = ReplayRun(speed)
+    local = threading.local()
+
+    def send(entry: LogEntry, due: float):
+        # Measured when a worker picks the entry up, so a saturated pool shows as lag
+        # instead of silently delaying requests (coordinated omission)
+        lag = max(time.perf_counter() - due, 0.0)
+        with run._lock:
+            run.dispatch_lag.record_seconds(lag)
+        if not hasattr(local, "tester"):
+            local.tester = APITester()
+            local.tester.metrics = run.metrics
+        role = users.role(entry.client)
+        # The browser clients in the logs always send their Origin, which the CORS middleware checks
+        response = local.tester.make_request(entry.method, entry.path, request_body(entry, role),
+                                             {"Origin": CORS_ORIGIN}, users.tokens.get(role))
+        run.record(entry, str(response.status_code) if response is not None else "no response")
+
+    origin = entries[0].at if entries else 0.0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for entry in entries:
+            if entry.method not in REPLAYABLE_METHODS:
+                run.skipped[entry.method] += 1
+                continue
+            due = start + (entry.at - origin) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, entry, due)
+            run.sent += 1
+    run.elapsed = time.perf_counter() - start
+    return run
+
+
+def peak_rate(entries: List[LogEntry], speed: float = 1.0) -> int:
+    """Most replayable requests logged within one (scaled) second"""
+    buckets = Counter(int((entry.at - entries[0].at) / speed) for entry in entries
+                      if entry.method in REPLAYABLE_METHODS)
+    return max(buckets.values(), default=0)
+
+
+def print_replay_summary(entries: List[LogEntry], users: UserMap, runs: List[ReplayRun]):
+    span = entries[-1].at - entries[0].at if entries else 0.0
+    print("\n" + "="*50)
+    print("TRACE REPLAY")
+    print("="*50)
+    print(f"Log: {len(entries)} requests over {span:.0f}s from {len(users.clients)} clients, "
+          f"peak {peak_rate(entries)} req/s")
+    for role in sorted(set(users.clients.values())):
+        print(f"    {role}: {sum(1 for r in users.clients.values() if r == role)} clients")
+    for run in runs:
+        stats = run.summary(span)
+        behind = stats["elapsed"] - stats["target_seconds"]
+        status = "✅" if not stats["status_mismatches"] and behind < 1.0 else "⚠️ "
+        print(f"\n{status} {run.speed:g}x: {stats['sent']} requests in {stats['elapsed']:.1f}s "
+              f"(target {stats['target_seconds']:.1f}s), {stats['rate']:.1f} req/s, "
+              f"peak {peak_rate(entries, run.speed)} req/s")
+        lag = stats["dispatch_lag_ms"]
+        print(f"    Dispatch lag (ms): p50 {lag['p50']:.1f}  p99 {lag['p99']:.1f}")
+        if stats["skipped"]:
+            print(f"    Skipped (not replayable): {stats['skipped']}")
+        for route, count in sorted(stats["status_mismatches"].items(), key=lambda item: -item[1]):
+            pairs = ", ".join(f"{logged}->{replayed} x{n}" for (logged, replayed), n
+                              in run.status_pairs[route].most_common() if logged != replayed)
+            print(f"    Status differs from log: {route}: {pairs}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay an access log against the backend with time scaling")
+    parser.add_argument("logs", nargs="+", help="access log files (morgan combined format)")
+    parser.add_argument("--speed", default=DEFAULT_SPEEDS,
+                        help="comma-separated speed-up factors, one pass each (e.g. 1,2,10)")
+    parser.add_argument("--rewrite", action="append", default=[], metavar="OLD=NEW",
+                        help="replace a path prefix, e.g. /auth=/api/auth for logs from older route layouts")
+    parser.add_argument("--role", action="append", choices=sorted(DEMO_CREDENTIALS),
+                        help="demo users to bind clients to (default: all, round-robin)")
+    parser.add_argument("--limit", type=int, help="replay only the first N log entries")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="maximum requests in flight")
+    parser.add_argument("--label", help="label the saved runs, e.g. baseline (suffixed -<speed>x for several speeds)")
+    parser.add_argument("--no-save", action="store_true", help="do not record the runs in the results store")
+    args = parser.parse_args(argv)
+
+    rewrites = [tuple(rule.split("=", 1)) for rule in args.rewrite]
+    entries = parse_log(args.logs, rewrites)[:args.limit]
+    if not entries:
+        print("❌ No access-log lines found")
+        return 1
+    users = UserMap(args.role or list(DEMO_CREDENTIALS))
+    for entry in entries:
+        users.role(entry.client)
+
+    print("🚀 Starting Au Pair trace replay")
+    print(f"Testing against: {BASE_URL}")
+    users.login(APITester())
+    runs = []
+    for speed in (float(value) for value in args.speed.split(",") if value):
+        print(f"\n▶️  Replaying {len(entries)} requests at {speed:g}x")
+        runs.append(replay(entries, users, speed, args.workers))
+
+    print_replay_summary(entries, users, runs)
+    span = entries[-1].at - entries[0].at
+    for run in runs:
+        run.metrics.print_summary()
+        if not args.no_save:
+            # A label names one run per kind, so each speed gets its own
+            label = f"{args.label}-{run.speed:g}x" if args.label and len(runs) > 1 else args.label
+            save_run("replay", run.metrics, dict(vars(args), speed=run.speed, base_url=BASE_URL),
+                     run.summary(span), label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
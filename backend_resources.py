@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Backend Resource Sampler for Au Pair Backend Load Runs
+Samples the Node backend's CPU, RSS, open file descriptors and threads from /proc,
+plus heap, event-loop delay and GC pauses from /health/runtime (RUNTIME_STATS=1),
+on the same wall-clock timeline as every request latency recorded during the run.
+Latency spikes are then attributed to GC, event-loop blocking, CPU saturation or
+waiting outside the loop (SQLite locks, disk I/O).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from backend_load import run_load
+from backend_metrics import add_observer, remove_observer
+from backend_test import BASE_URL, APITester
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_RATES = "20,50,100"
+DEFAULT_PHASE_DURATION = 20.0
+DEFAULT_TOP = 10
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+# A spike cause must account for at least this share of the excess latency
+CAUSE_SHARE = 0.5
+CPU_SATURATED = 90.0
+TCP_LISTEN = "0A"
+
+
+def find_listener_pid(port: int) -> Optional[int]:
+    """PID of the local process listening on port, found through /proc socket inodes"""
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == TCP_LISTEN and int(fields[1].rsplit(":", 1)[1], 16) == port:
+                        inodes.add(f"socket:[{fields[9]}]")
+        except OSError:
+            continue
+    if not inodes:
+        return None
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            for fd in os.listdir(f"/proc/{pid}/fd"):
+                if os.readlink(f"/proc/{pid}/fd/{fd}") in inodes:
+                    return int(pid)
+        except OSError:
+            continue
+    return None
+
+
+class ProcReader:
+    """CPU, RSS, fd and thread counts for one process from /proc"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.last_cpu = None
+
+    def read(self, now: float) -> Dict:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Fields after the parenthesised command name; utime/stime are 14/15
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = int(fields[11]) + int(fields[12])
+        sample = {"threads": int(fields[17]), "fds": len(os.listdir(f"/proc/{self.pid}/fd"))}
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    sample["rss_mb"] = int(line.split()[1]) / 1024
+        if self.last_cpu:
+            last_ticks, last_time = self.last_cpu
+            sample["cpu"] = (ticks - last_ticks) / CLOCK_TICKS / max(now - last_time, 1e-6) * 100
+        self.last_cpu = (ticks, now)
+        return sample
+
+
+class RuntimeReader:
+    """Heap, event-loop delay and GC pauses from the backend's /health/runtime"""
+
+    def __init__(self, base_url: str = BASE_URL):
+        self.url = f"{base_url}/health/runtime"
+        self.session = requests.Session()
+        self.enabled = True
+        self.last_cpu = None
+
+    def read(self, now: float) -> Dict:
+        if not self.enabled:
+            return {}
+        try:
+            response = self.session.get(self.url, timeout=2)
+        except requests.exceptions.RequestException:
+            return {}
+        try:
+            stats = response.json() if response.status_code == 200 else {}
+        except ValueError:
+            stats = {}
+        if "eventLoop" not in stats:
+            self.enabled = False
+            print("⚠️  /health/runtime unavailable (start the backend with RUNTIME_STATS=1); "
+                  "heap, event-loop and GC samples are off")
+            return {}
+        resolution = stats["eventLoop"]["resolutionMs"]
+        sample = {
+            "heap_mb": stats["memory"]["heapUsed"] / 2**20,
+            "node_rss_mb": stats["memory"]["rss"] / 2**20,
+            # The delay histogram includes the sampling timer's own period
+            "loop_p99_ms": max(stats["eventLoop"]["p99Ms"] - resolution, 0.0),
+            "loop_max_ms": max(stats["eventLoop"]["maxMs"] - resolution, 0.0),
+            "gc_count": stats["gc"]["count"],
+            "gc_pause_ms": stats["gc"]["pauseMs"],
+            "gc_max_ms": stats["gc"]["maxPauseMs"],
+        }
+        cpu_us = stats["cpu"]["user"] + stats["cpu"]["system"]
+        if self.last_cpu:
+            last_us, last_time = self.last_cpu
+            sample["node_cpu"] = (cpu_us - last_us) / 1e6 / max(now - last_time, 1e-6) * 100
+        self.last_cpu = (cpu_us, now)
+        return sample
+
+
+class ResourceSampler:
+    """Background thread sampling the backend at a fixed interval"""
+
+    def __init__(self, pid: Optional[int], interval: float = DEFAULT_INTERVAL, base_url: str = BASE_URL):
+        self.proc = ProcReader(pid) if pid else None
+        self.runtime = RuntimeReader(base_url)
+        self.interval = interval
+        self.phase = None
+        self.samples: List[Dict] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        now = time.time()
+        sample = {"ts": now, "phase": self.phase}
+        if self.proc:
+            try:
+                sample.update(self.proc.read(now))
+            except OSError:
+                print(f"⚠️  Backend process {self.proc.pid} is gone, /proc sampling stopped")
+                self.proc = None
+        sample.update(self.runtime.read(now))
+        # Without /proc access fall back to the process's own CPU accounting
+        if "cpu" not in sample and "node_cpu" in sample:
+            sample["cpu"] = sample["node_cpu"]
+        self.samples.append(sample)
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self._sample()
+            next_tick += self.interval
+            self._stop.wait(max(next_tick - time.monotonic(), 0))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class RequestTimeline:
+    """Metrics observer keeping every request's completion time and latency"""
+
+    def __init__(self, sampler: ResourceSampler):
+        self.sampler = sampler
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, key: str, status_code: Optional[int], timings: Dict[str, float]):
+        if "total" not in timings:
+            return
+        with self._lock:
+            self.requests.append({"ts": time.time(), "route": key, "status": status_code,
+                                  "ms": timings["total"] * 1000, "phase": self.sampler.phase})
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)] if ordered else 0.0
+
+
+def _peak(samples: List[Dict], field: str, reduce=max) -> Optional[float]:
+    values = [sample[field] for sample in samples if sample.get(field) is not None]
+    return reduce(values) if values else None
+
+
+def phase_report(timeline: RequestTimeline, sampler: ResourceSampler) -> Dict[str, Dict]:
+    """Latency and resource peaks per load phase"""
+    report = {}
+    for phase in dict.fromkeys(sample["phase"] for sample in sampler.samples if sample["phase"]):
+        latencies = [r["ms"] for r in timeline.requests if r["phase"] == phase]
+        samples = [s for s in sampler.samples if s["phase"] == phase]
+        report[phase] = {
+            "requests": len(latencies), "p50": _percentile(latencies, 50), "p99": _percentile(latencies, 99),
+            "cpu_mean": _peak(samples, "cpu", statistics.fmean), "cpu_max": _peak(samples, "cpu"),
+            "rss_mb": _peak(samples, "rss_mb") or _peak(samples, "node_rss_mb"), "heap_mb": _peak(samples, "heap_mb"),
+            "fds": _peak(samples, "fds"), "threads": _peak(samples, "threads"),
+            "loop_max_ms": _peak(samples, "loop_max_ms"), "gc_pause_ms": _peak(samples, "gc_pause_ms", sum),
+            "gc_max_ms": _peak(samples, "gc_max_ms")}
+    return report
+
+
+def attribute(excess_ms: float, sample: Dict) -> str:
+    """Most likely cause of excess_ms extra latency given the covering sample"""
+    if sample.get("gc_max_ms") is not None and \
+            max(sample["gc_max_ms"], sample["gc_pause_ms"]) >= CAUSE_SHARE * excess_ms:
+        return "GC pause"
+    if sample.get("loop_max_ms") is not None and sample["loop_max_ms"] >= CAUSE_SHARE * excess_ms:
+        return "event-loop blocking"
+    if (sample.get("cpu") or 0) >= CPU_SATURATED:
+        return "CPU saturation"
+    if sample.get("loop_max_ms") is None:
+        return "unknown (no runtime stats)"
+    return "waiting outside the event loop (SQLite lock / I/O)"
+
+
+def find_spikes(timeline: RequestTimeline, sampler: ResourceSampler, route: str = None) -> List[Dict]:
+    """Requests at or above their route's p99, paired with the sample covering them.
+
+    Runtime samples describe the interval since the previous sample, so a request
+    is matched to the first sample taken after it completed.
+    """
+    by_route = defaultdict(list)
+    for request in timeline.requests:
+        if route is None or request["route"] == route:
+            by_route[request["route"]].append(request)
+    stamps = [sample["ts"] for sample in sampler.samples]
+    spikes = []
+    for key, requests_ in by_route.items():
+        latencies = [r["ms"] for r in requests_]
+        p50, p99 = _percentile(latencies, 50), _percentile(latencies, 99)
+        for request in requests_:
+            if request["ms"] < p99 or request["ms"] <= p50:
+                continue
+            index = next((i for i, ts in enumerate(stamps) if ts >= request["ts"]), len(stamps) - 1)
+            sample = sampler.samples[index] if sampler.samples else {}
+            excess = request["ms"] - p50
+            spikes.append(dict(request, p50=p50, cause=attribute(excess, sample), sample=sample))
+    return sorted(spikes, key=lambda spike: -spike["ms"])
+
+
+def _fmt(value: Optional[float], unit: str = "", digits: int = 1) -> str:
+    return "n/a" if value is None else f"{value:.{digits}f}{unit}"
+
+
+def print_resource_report(phases: Dict[str, Dict], spikes: List[Dict], top: int):
+    """Print per-phase resource peaks and the attributed latency spikes"""
+    print("\n" + "="*50)
+    print("BACKEND RESOURCES BY PHASE")
+    print("="*50)
+    for phase, stats in phases.items():
+        print(f"\n{phase}  ({stats['requests']} requests, p50 {stats['p50']:.1f}ms, p99 {stats['p99']:.1f}ms)")
+        print(f"    CPU mean {_fmt(stats['cpu_mean'], '%')} max {_fmt(stats['cpu_max'], '%')}, "
+              f"RSS {_fmt(stats['rss_mb'], 'MB')}, heap {_fmt(stats['heap_mb'], 'MB')}, "
+              f"fds {_fmt(stats['fds'], digits=0)}, threads {_fmt(stats['threads'], digits=0)}")
+        print(f"    event-loop delay max {_fmt(stats['loop_max_ms'], 'ms')}, "
+              f"GC pause total {_fmt(stats['gc_pause_ms'], 'ms')} (max {_fmt(stats['gc_max_ms'], 'ms')})")
+
+    print("\n" + "="*50)
+    print("LATENCY SPIKES")
+    print("="*50)
+    if not spikes:
+        print("✅ No spikes above p99")
+        return
+    causes = Counter((spike["route"], spike["cause"]) for spike in spikes)
+    for (route, cause), count in causes.most_common():
+        print(f"{route}: {count}x {cause}")
+    for spike in spikes[:top]:
+        sample = spike["sample"]
+        print(f"\n⚠️  {spike['route']} {spike['ms']:.1f}ms (p50 {spike['p50']:.1f}ms) in {spike['phase']}")
+        print(f"    Details: {spike['cause']}; CPU {_fmt(sample.get('cpu'), '%')}, "
+              f"loop max {_fmt(sample.get('loop_max_ms'), 'ms')}, GC max {_fmt(sample.get('gc_max_ms'), 'ms')}")
+
+
+def run_phases(sampler: ResourceSampler, rates: List[float], duration: float, endpoints: List[str], suite: bool):
+    """Run each load phase (or the functional suite) with the phase name set on the sampler"""
+    if suite:
+        sampler.phase = "functional suite"
+        APITester().run_all_tests()
+        return
+    for index, rate in enumerate(rates, 1):
+        sampler.phase = f"phase {index} @ {rate:g} req/s"
+        print(f"\n▶️  {sampler.phase} for {duration:.0f}s")
+        result = asyncio.run(run_load(rate, duration, endpoints))
+        result.print_summary()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sample backend CPU, memory, fds, event-loop lag and GC during load")
+    parser.add_argument("--pid", type=int, help="backend process id (default: the local listener on the BASE_URL port)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between samples")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help="comma-separated arrival rates, one load phase each")
+    parser.add_argument("--duration", type=float, default=DEFAULT_PHASE_DURATION, help="seconds per load phase")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="restrict load to a path such as /api/bookings (repeatable)")
+    parser.add_argument("--suite", action="store_true", help="sample during the functional suite instead of load")
+    parser.add_argument("--route", help="only report spikes for this route, e.g. 'GET /api/bookings'")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="spikes to print")
+    parser.add_argument("--output", help="write the samples and request timeline to this JSON file")
+    args = parser.parse_args(argv)
+
+    pid = args.pid or find_listener_pid(urlsplit(BASE_URL).port or 80)
+    print("🚀 Starting Au Pair backend resource sampling")
+    print(f"Testing against: {BASE_URL}, backend pid: {pid or 'not found (runtime stats only)'}")
+
+    sampler = ResourceSampler(pid, args.interval)
+    timeline = RequestTimeline(sampler)
+    add_observer(timeline)
+    sampler.start()
+    try:
+        run_phases(sampler, [float(rate) for rate in args.rates.split(",") if rate],
+                   args.duration, args.endpoints, args.suite)
+    finally:
+        sampler.stop()
+        remove_observer(timeline)
+
+    print_resource_report(phase_report(timeline, sampler), find_spikes(timeline, sampler, args.route), args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"samples": sampler.samples, "requests": timeline.requests}, f)
+        print(f"\nTimeline written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
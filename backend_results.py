@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmark Result Store for Au Pair Backend
+Saves every benchmark run (git commit, config, per-route summary and raw
+histograms) to a local SQLite store, and compares a run against a baseline per
+endpoint with a histogram Mann-Whitney test and bootstrap p99 confidence
+intervals. compare exits non-zero when p99 or throughput regresses.
+"""
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backend_metrics import LatencyHistogram, RequestMetrics
+
+RESULTS_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench_results.db")
+DEFAULT_P99_THRESHOLD = 0.10
+DEFAULT_THROUGHPUT_THRESHOLD = 0.10
+DEFAULT_ALPHA = 0.05
+DEFAULT_BOOTSTRAP = 1000
+# Routes with fewer samples on either side are reported but never gate
+MIN_SAMPLES = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT,
+    git_commit TEXT,
+    git_dirty INTEGER,
+    config TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    metrics TEXT NOT NULL
+)
+"""
+
+
+def git_state() -> Dict:
+    """Current commit and whether the working tree has local changes"""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=cwd, capture_output=True,
+                                text=True, timeout=30).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                               capture_output=True, text=True, timeout=30).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit or None, "dirty": bool(dirty)}
+
+
+class ResultStore:
+    """SQLite-backed history of benchmark runs"""
+
+    def __init__(self, path: str = RESULTS_DB_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def save(self, kind: str, metrics: RequestMetrics, config: Dict = None,
+             summary: Dict = None, label: str = None) -> int:
+        """Store one run; summary defaults to the metrics summary"""
+        git = git_state()
+        with self.connection:
+            if label:
+                # A label names one run of each kind, as with set_label
+                self.connection.execute("UPDATE runs SET label = NULL WHERE label = ? AND kind = ?", (label, kind))
+            cursor = self.connection.execute(
+                "INSERT INTO runs (created_at, kind, label, git_commit, git_dirty, config, summary, metrics) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), kind, label, git["commit"], git["dirty"], json.dumps(config or {}),
+                 json.dumps(summary if summary is not None else metrics.summary()),
+                 json.dumps(metrics.to_dict())))
+        return cursor.lastrowid
+
+    def set_label(self, run_id: int, label: str):
+        kind = self.load(run_id)["kind"]
+        with self.connection:
+            self.connection.execute("UPDATE runs SET label = NULL WHERE label = ? AND kind = ?", (label, kind))
+            self.connection.execute("UPDATE runs SET label = ? WHERE id = ?", (label, run_id))
+
+    def list(self, kind: str = None, limit: int = 20) -> List[sqlite3.Row]:
+        query = "SELECT id, created_at, kind, label, git_commit, git_dirty, config FROM runs"
+        params = ()
+        if kind:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        return self.connection.execute(query + " ORDER BY id DESC LIMIT ?", params + (limit,)).fetchall()
+
+    def resolve(self, ref: str, kind: str = None) -> Optional[int]:
+        """Run id for an integer id, 'latest' or a label"""
+        if ref.isdigit():
+            row = self.connection.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+        elif ref == "latest":
+            query, params = "SELECT id FROM runs", ()
+            if kind:
+                query, params = query + " WHERE kind = ?", (kind,)
+            row = self.connection.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        else:
+            # Labels are unique per kind; without a kind the newest labelled run wins
+            query, params = "SELECT id FROM runs WHERE label = ?", (ref,)
+            if kind:
+                query, params = query + " AND kind = ?", params + (kind,)
+            row = self.connection.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return row["id"] if row else None
+
+    def default_baseline(self, run_id: int) -> Optional[int]:
+        """The run labelled 'baseline' for this kind, else the previous run of the same kind"""
+        kind = self.load(run_id)["kind"]
+        row = self.connection.execute("SELECT id FROM runs WHERE label = 'baseline' AND kind = ? AND id != ? "
+                                      "ORDER BY id DESC LIMIT 1", (kind, run_id)).fetchone()
+        if not row:
+            row = self.connection.execute("SELECT id FROM runs WHERE kind = ? AND id < ? ORDER BY id DESC LIMIT 1",
+                                          (kind, run_id)).fetchone()
+        return row["id"] if row else None
+
+    def load(self, run_id: int) -> Dict:
+        row = self.connection.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        run = dict(row)
+        run["config"] = json.loads(run["config"])
+        run["summary"] = json.loads(run["summary"])
+        run["metrics"] = RequestMetrics.from_dict(json.loads(run["metrics"]))
+        return run
+
+
+def save_run(kind: str, metrics: RequestMetrics, config: Dict = None, summary: Dict = None,
+             label: str = None, path: str = RESULTS_DB_PATH) -> Optional[int]:
+    """Store a run without letting a store failure break the benchmark that produced it"""
+    try:
+        store = ResultStore(path)
+        try:
+            run_id = store.save(kind, metrics, config, summary, label)
+        finally:
+            store.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not save results to {path}: {e}")
+        return None
+    print(f"💾 Saved {kind} run #{run_id} to {path}")
+    return run_id
+
+
+def _upper_values(histogram: LatencyHistogram) -> np.ndarray:
+    """Highest equivalent value (us) of every counts index"""
+    return np.array([min(low + width - 1, histogram.highest_us)
+                     for low, width in (histogram._bucket_range(i) for i in range(histogram.counts_len))],
+                    dtype=np.float64)
+
+
+def mann_whitney(base: np.ndarray, new: np.ndarray) -> Dict:
+    """One-sided Mann-Whitney U on binned counts: is new stochastically slower than base?
+
+    Samples in the same bucket count as ties. Returns P(new > base) as the effect
+    size and the normal-approximation p-value with tie correction.
+    """
+    n1, n2 = new.sum(), base.sum()
+    below = np.cumsum(base) - base
+    u = float(np.sum(new * (below + 0.5 * base)))
+    total = n1 + n2
+    ties = np.sum((base + new) ** 3 - (base + new))
+    variance = n1 * n2 / 12.0 * ((total + 1) - ties / (total * (total - 1)))
+    if variance <= 0:
+        return {"p_slower": 0.5, "p_value": 1.0}
+    z = (u - n1 * n2 / 2.0) / math.sqrt(variance)
+    return {"p_slower": u / (n1 * n2), "p_value": 0.5 * math.erfc(z / math.sqrt(2))}
+
+
+def bootstrap_percentile_ratio(base: np.ndarray, new: np.ndarray, upper: np.ndarray, percentile: float = 99.0,
+                               replicates: int = DEFAULT_BOOTSTRAP, alpha: float = DEFAULT_ALPHA,
+                               seed: int = 1) -> Dict:
+    """Confidence interval of new/base at a percentile by resampling both histograms"""
+    rng = np.random.default_rng(seed)
+
+    def resampled(counts: np.ndarray) -> np.ndarray:
+        total = int(counts.sum())
+        samples = rng.multinomial(total, counts / total, size=replicates)
+        target = max(1, math.ceil(percentile / 100.0 * total))
+        return upper[np.argmax(np.cumsum(samples, axis=1) >= target, axis=1)]
+
+    ratios = resampled(new) / np.maximum(resampled(base), 1.0)
+    low, high = np.percentile(ratios, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return {"ci_low": float(low), "ci_high": float(high)}
+
+
+def _latency_phase(route: Dict) -> Optional[str]:
+    """Coordinated-omission corrected latency when the run has it, else total"""
+    for phase in ("corrected", "total"):
+        if phase in route["phases"]:
+            return phase
+    return None
+
+
+def compare_runs(base: Dict, new: Dict, p99_threshold: float = DEFAULT_P99_THRESHOLD,
+                 throughput_threshold: float = DEFAULT_THROUGHPUT_THRESHOLD, alpha: float = DEFAULT_ALPHA,
+                 replicates: int = DEFAULT_BOOTSTRAP) -> Dict[str, Dict]:
+    """Per-route comparison of new against base with regression verdicts"""
+    results = {}
+    for key in sorted(set(base["metrics"].routes) | set(new["metrics"].routes)):
+        base_route, new_route = base["metrics"].routes.get(key), new["metrics"].routes.get(key)
+        if not base_route or not new_route:
+            results[key] = {"note": "only in baseline" if base_route else "new route", "regressions": []}
+            continue
+        phase = _latency_phase(new_route)
+        if phase is None or phase not in base_route["phases"]:
+            results[key] = {"note": "no latency data", "regressions": []}
+            continue
+
+        base_hist, new_hist = base_route["phases"][phase], new_route["phases"][phase]
+        base_counts = np.array(base_hist.counts, dtype=np.float64)
+        new_counts = np.array(new_hist.counts, dtype=np.float64)
+        result = {
+            "phase": phase,
+            "samples": (int(base_counts.sum()), int(new_counts.sum())),
+            "p99": (base_hist.value_at_percentile(99) / 1000.0, new_hist.value_at_percentile(99) / 1000.0),
+            "regressions": []
+        }
+
+        if min(result["samples"]) >= MIN_SAMPLES:
+            result.update(mann_whitney(base_counts, new_counts))
+            result.update(bootstrap_percentile_ratio(base_counts, new_counts, _upper_values(new_hist),
+                                                     replicates=replicates, alpha=alpha))
+            base_p99, new_p99 = result["p99"]
+            # Gate only on a change that is both large and statistically clear
+            if (new_p99 > base_p99 * (1 + p99_threshold) and result["ci_low"] > 1.0
+                    and result["p_value"] < alpha):
+                result["regressions"].append(
+                    f"p99 {base_p99:.1f}ms -> {new_p99:.1f}ms "
+                    f"(x{result['ci_low']:.2f}-{result['ci_high']:.2f}, p={result['p_value']:.3g})")
+        else:
+            result["note"] = f"fewer than {MIN_SAMPLES} samples"
+
+        base_throughput = base["summary"].get(key, {}).get("throughput")
+        new_throughput = new["summary"].get(key, {}).get("throughput")
+        if base_throughput and new_throughput is not None:
+            result["throughput"] = (base_throughput, new_throughput)
+            if new_throughput < base_throughput * (1 - throughput_threshold):
+                result["regressions"].append(f"throughput {base_throughput:.1f} -> {new_throughput:.1f} req/s")
+        results[key] = result
+    return results
+
+
+def print_comparison(base: Dict, new: Dict, results: Dict[str, Dict]):
+    """Print the per-route comparison table and regression details"""
+    print("\n" + "="*50)
+    print("BENCHMARK COMPARISON")
+    print("="*50)
+    for label, run in (("Baseline", base), ("Candidate", new)):
+        commit = (run["git_commit"] or "unknown")[:10] + ("+dirty" if run["git_dirty"] else "")
+        print(f"{label}: run #{run['id']} ({run['kind']}) at {commit}, "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(run['created_at']))}")
+
+    for key, result in results.items():
+        status = "❌ FAIL" if result["regressions"] else "✅ PASS"
+        if "p99" not in result:
+            print(f"\n{key}: {result['note']}")
+            continue
+        print(f"\n{status}: {key} ({result['phase']}, n={result['samples'][0]}/{result['samples'][1]})")
+        base_p99, new_p99 = result["p99"]
+        line = f"    p99 {base_p99:.2f} -> {new_p99:.2f} ms"
+        if "ci_low" in result:
+            line += (f"  ratio CI [{result['ci_low']:.2f}, {result['ci_high']:.2f}]"
+                     f"  P(slower) {result['p_slower']:.2f}  p={result['p_value']:.3g}")
+        print(line)
+        if "throughput" in result:
+            print(f"    throughput {result['throughput'][0]:.1f} -> {result['throughput'][1]:.1f} req/s")
+        if result.get("note"):
+            print(f"    Note: {result['note']}")
+        for regression in result["regressions"]:
+            print(f"    Details: {regression}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stored benchmark runs and baseline comparison")
+    parser.add_argument("--store", default=RESULTS_DB_PATH, help="results database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="show recent runs")
+    list_parser.add_argument("--kind", help="only runs of this kind (functional, load, pool)")
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    label_parser = commands.add_parser("label", help="name a run, e.g. 'baseline'")
+    label_parser.add_argument("run")
+    label_parser.add_argument("label")
+
+    compare_parser = commands.add_parser("compare", help="compare a run with a baseline")
+    compare_parser.add_argument("run", nargs="?", default="latest", help="run id, label or 'latest'")
+    compare_parser.add_argument("--baseline", help="run id or label (default: 'baseline' or the previous run)")
+    compare_parser.add_argument("--p99-threshold", type=float, default=DEFAULT_P99_THRESHOLD,
+                                help="tolerated relative p99 increase")
+    compare_parser.add_argument("--throughput-threshold", type=float, default=DEFAULT_THROUGHPUT_THRESHOLD,
+                                help="tolerated relative throughput drop")
+    compare_parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level")
+    compare_parser.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP, help="bootstrap replicates")
+    args = parser.parse_args(argv)
+
+    store = ResultStore(args.store)
+    try:
+        if args.command == "list":
+            for row in store.list(args.kind, args.limit):
+                commit = (row["git_commit"] or "unknown")[:10] + ("+dirty" if row["git_dirty"] else "")
+                print(f"#{row['id']:<5} {time.strftime('%Y-%m-%d %H:%M', time.localtime(row['created_at']))}  "
+                      f"{row['kind']:<11} {commit:<16} {row['label'] or '':<12} {row['config']}")
+            return 0
+
+        run_id = store.resolve(args.run)
+        if run_id is None:
+            print(f"❌ No run matches {args.run}")
+            return 2
+        if args.command == "label":
+            store.set_label(run_id, args.label)
+            print(f"🏷️  Run #{run_id} labelled {args.label}")
+            return 0
+
+        baseline_id = store.resolve(args.baseline) if args.baseline else store.default_baseline(run_id)
+        if baseline_id is None:
+            print("❌ No baseline run to compare against")
+            return 2
+        base, new = store.load(baseline_id), store.load(run_id)
+        results = compare_runs(base, new, args.p99_threshold, args.throughput_threshold, args.alpha,
+                               args.bootstrap)
+        print_comparison(base, new, results)
+        regressions = sum(len(result["regressions"]) for result in results.values())
+        print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s) against run #{baseline_id}")
+        return 1 if regressions else 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Weighted Workload-mix Scenario Engine for Au Pair Backend API
+Runs many virtual users through weighted journeys (login, dashboard, matches,
+messaging, bookings) with per-step think time and values carried between steps,
+and reports throughput and latency per journey step.
+
+Scenarios are plain Python data, or JSON/YAML files with the same shape:
+
+    journeys:
+      - name: browse
+        weight: 2
+        steps:
+          - {name: login, method: POST, path: /api/demo/login,
+             json: {email: "{email}", password: "{password}"},
+             extract: {token: accessToken, user_id: user.id}, auth: false}
+          - {name: matches, method: GET, path: /api/matches/recent,
+             extract: {partner_id: [0.hostId, 0.auPairId]}, think: [1, 3]}
+
+Placeholders like {partner_id} are filled from the virtual user's variables;
+a step whose placeholders cannot be filled yet is skipped, not failed. An
+extract may list several paths; the first one present in the response wins.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from backend_load import AsyncHTTPClient
+from backend_metrics import RequestMetrics
+from backend_test import BASE_URL
+from backend_tokens import POOL_PASSWORD, TokenPool
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+DEFAULT_USERS = 50
+DEFAULT_DURATION = 60.0
+DEFAULT_RAMP = 10.0
+
+DEFAULT_SCENARIO = {
+    "journeys": [
+        {
+            "name": "browse_and_book",
+            "weight": 1,
+            "steps": [
+                {"name": "login", "method": "POST", "path": "/api/demo/login", "auth": False,
+                 "json": {"email": "{email}", "password": "{password}"},
+                 "extract": {"token": "accessToken", "user_id": "user.id"}, "think": [1, 2]},
+                {"name": "dashboard_stats", "method": "GET", "path": "/api/dashboard/stats", "think": [2, 5]},
+                {"name": "recent_matches", "method": "GET", "path": "/api/matches/recent",
+                 # The counterpart's user id: hostId for au pairs, auPairId for host families
+                 "extract": {"match_id": "0.id", "partner_id": ["0.hostId", "0.auPairId"]}, "think": [2, 6]},
+                {"name": "conversations", "method": "GET", "path": "/api/conversations",
+                 "extract": {"partner_id": "0.partnerId"}, "think": [1, 3]},
+                {"name": "send_message", "method": "POST", "path": "/api/messages", "repeat": 2,
+                 "json": {"receiverId": "{partner_id}", "content": "Hi! Are you free for a call this week?"},
+                 "think": [3, 8]},
+                {"name": "create_booking", "method": "POST", "path": "/api/bookings",
+                 "json": {"targetUserId": "{partner_id}", "startDate": "{start_date}",
+                          "endDate": "{end_date}", "totalHours": 4, "hourlyRate": 15},
+                 "extract": {"booking_id": "booking.id"}, "think": [1, 3]},
+                {"name": "booking_detail", "method": "GET", "path": "/api/bookings/{booking_id}"}
+            ]
+        },
+        {
+            "name": "check_messages",
+            "weight": 3,
+            "steps": [
+                {"name": "login", "method": "POST", "path": "/api/demo/login", "auth": False,
+                 "json": {"email": "{email}", "password": "{password}"},
+                 "extract": {"token": "accessToken", "user_id": "user.id"}, "think": [1, 2]},
+                {"name": "conversations", "method": "GET", "path": "/api/conversations",
+                 "extract": {"partner_id": "0.partnerId"}, "think": [2, 4]},
+                {"name": "message_history", "method": "GET", "path": "/api/messages/with/{partner_id}",
+                 "think": [5, 15]},
+                {"name": "send_message", "method": "POST", "path": "/api/messages",
+                 "json": {"receiverId": "{partner_id}", "content": "Sounds good, talk soon!"}}
+            ]
+        },
+        {
+            "name": "browse",
+            "weight": 2,
+            "steps": [
+                {"name": "login", "method": "POST", "path": "/api/demo/login", "auth": False,
+                 "json": {"email": "{email}", "password": "{password}"},
+                 "extract": {"token": "accessToken", "user_id": "user.id"}, "think": [1, 2]},
+                {"name": "dashboard_stats", "method": "GET", "path": "/api/dashboard/stats", "think": [2, 5]},
+                {"name": "search", "method": "GET", "path": "/api/demo/users/search?role=AU_PAIR",
+                 "think": [3, 10]},
+                {"name": "matches", "method": "GET", "path": "/api/matches", "think": [2, 6]},
+                {"name": "profile_completion", "method": "GET", "path": "/api/profiles/completion"}
+            ]
+        }
+    ]
+}
+
+
+class MissingVariable(KeyError):
+    """A step references a variable no earlier step has produced"""
+
+
+def load_scenario(path: str) -> Dict:
+    """Load a scenario from a .json, .yaml or .yml file"""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("PyYAML is required for YAML scenarios (pip install pyyaml)")
+            scenario = yaml.safe_load(f)
+        else:
+            scenario = json.load(f)
+    validate_scenario(scenario)
+    return scenario
+
+
+def validate_scenario(scenario: Dict):
+    """Fail early on scenarios the engine cannot run"""
+    journeys = scenario.get("journeys") or []
+    if not journeys:
+        raise ValueError("Scenario has no journeys")
+    for journey in journeys:
+        if not journey.get("name") or not journey.get("steps"):
+            raise ValueError(f"Journey needs a name and steps: {journey}")
+        if journey.get("weight", 1) <= 0:
+            raise ValueError(f"Journey {journey['name']} needs a positive weight")
+        for step in journey["steps"]:
+            if not step.get("name") or not step.get("path"):
+                raise ValueError(f"Step in {journey['name']} needs a name and path: {step}")
+
+
+def render(template: Any, variables: Dict[str, Any]) -> Any:
+    """Fill {placeholders} in strings, lists and dicts; a lone placeholder keeps its type"""
+    if isinstance(template, str):
+        whole = PLACEHOLDER.fullmatch(template)
+        if whole:
+            if variables.get(whole.group(1)) is None:
+                raise MissingVariable(whole.group(1))
+            return variables[whole.group(1)]
+
+        def substitute(match):
+            if variables.get(match.group(1)) is None:
+                raise MissingVariable(match.group(1))
+            return str(variables[match.group(1)])
+        return PLACEHOLDER.sub(substitute, template)
+    if isinstance(template, list):
+        return [render(item, variables) for item in template]
+    if isinstance(template, dict):
+        return {key: render(value, variables) for key, value in template.items()}
+    return template
+
+
+def extract(data: Any, path: str) -> Any:
+    """Follow a dotted path like 'booking.id' or '0.profile.id' through decoded JSON"""
+    for part in path.split("."):
+        if isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        elif isinstance(data, dict) and part in data:
+            data = data[part]
+        else:
+            return None
+    return data
+
+
+def think_time(spec: Any, rng: random.Random) -> float:
+    """Think time in seconds from a number or a [min, max] range"""
+    if not spec:
+        return 0.0
+    if isinstance(spec, (list, tuple)):
+        return rng.uniform(spec[0], spec[1])
+    return float(spec)
+
+
+class ScenarioResult:
+    """Per journey-step latency histograms plus journey and step outcome counts"""
+
+    def __init__(self):
+        self.metrics = RequestMetrics()
+        self.journeys: Dict[str, Dict[str, int]] = {}
+        self.skipped: Dict[str, int] = {}
+        self.failed: Dict[str, int] = {}
+        self.elapsed = 0.0
+
+    def journey(self, name: str, outcome: str):
+        counts = self.journeys.setdefault(name, {"started": 0, "completed": 0})
+        counts[outcome] += 1
+
+    def print_summary(self, scenario: Dict):
+        """Print per-journey and per-step throughput and latency"""
+        print("\n" + "="*50)
+        print("SCENARIO SUMMARY")
+        print("="*50)
+        elapsed = self.elapsed or 1.0
+        summary = self.metrics.summary()
+        for journey in scenario["journeys"]:
+            name = journey["name"]
+            counts = self.journeys.get(name, {"started": 0, "completed": 0})
+            print(f"\n{name} (weight {journey.get('weight', 1)}): {counts['started']} started, "
+                  f"{counts['completed']} completed, {counts['completed'] / elapsed:.2f} journeys/s")
+            for step in journey["steps"]:
+                key = f"{name}/{step['name']}"
+                stats = summary.get(key)
+                skipped = self.skipped.get(key, 0)
+                if not stats:
+                    print(f"    {step['name']:<20} no requests ({skipped} skipped)")
+                    continue
+                total = stats["phases"].get("total", {})
+                print(f"    {step['name']:<20} {stats['count'] / elapsed:7.2f} req/s  "
+                      f"p50 {total.get('p50', 0):7.1f}  p90 {total.get('p90', 0):7.1f}  "
+                      f"p99 {total.get('p99', 0):7.1f} ms  failed {self.failed.get(key, 0)}  "
+                      f"skipped {skipped}")
+
+
+class VirtualUser:
+    """One simulated user looping through weighted journeys until the deadline"""
+
+    def __init__(self, index: int, account: Dict, scenario: Dict, client: AsyncHTTPClient,
+                 result: ScenarioResult, seed: int):
+        self.index = index
+        self.account = account
+        self.scenario = scenario
+        self.client = client
+        self.result = result
+        self.rng = random.Random(seed * 100003 + index)
+        self.weights = [journey.get("weight", 1) for journey in scenario["journeys"]]
+
+    def _fresh_variables(self, iteration: int) -> Dict[str, Any]:
+        start = datetime.now(timezone.utc) + timedelta(days=self.rng.randint(1, 60),
+                                                       hours=self.rng.randint(0, 23))
+        return {
+            "vu": self.index,
+            "iteration": iteration,
+            "email": self.account["email"],
+            "password": POOL_PASSWORD,
+            "token": self.account.get("accessToken"),
+            "user_id": self.account.get("id"),
+            "role": self.account.get("role"),
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(hours=4)).isoformat()
+        }
+
+    async def _step(self, journey: Dict, step: Dict, variables: Dict[str, Any]) -> bool:
+        """Run one step; returns False if the journey should stop"""
+        key = f"{journey['name']}/{step['name']}"
+        try:
+            path = render(step["path"], variables)
+            body = render(step["json"], variables) if "json" in step else None
+        except MissingVariable:
+            self.result.skipped[key] = self.result.skipped.get(key, 0) + 1
+            return True
+
+        headers = {}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        if step.get("auth", True) and variables.get("token"):
+            headers["Authorization"] = f"Bearer {variables['token']}"
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(step.get("method", "GET"), path,
+                                                 json.dumps(body).encode() if body is not None else None,
+                                                 headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            self.result.metrics.record_error_as(key, type(e).__name__, {"total": time.perf_counter() - start})
+            self.result.failed[key] = self.result.failed.get(key, 0) + 1
+            return not step.get("required", False)
+
+        self.result.metrics.record_as(key, response.status_code,
+                                      dict(response.timings, total=time.perf_counter() - start))
+        expected = step.get("expect")
+        ok = response.status_code in expected if expected else response.status_code < 400
+        if not ok:
+            self.result.failed[key] = self.result.failed.get(key, 0) + 1
+            return not step.get("required", False)
+
+        if step.get("extract"):
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            for name, json_paths in step["extract"].items():
+                for json_path in json_paths if isinstance(json_paths, list) else [json_paths]:
+                    value = extract(data, json_path)
+                    if value is not None:
+                        variables[name] = value
+                        break
+        return True
+
+    async def run(self, deadline: float):
+        iteration = 0
+        while time.monotonic() < deadline:
+            journey = self.rng.choices(self.scenario["journeys"], self.weights)[0]
+            variables = self._fresh_variables(iteration)
+            self.result.journey(journey["name"], "started")
+            completed = True
+            for step in journey["steps"]:
+                if time.monotonic() >= deadline:
+                    completed = False
+                    break
+                for _ in range(step.get("repeat", 1)):
+                    if not await self._step(journey, step, variables):
+                        completed = False
+                        break
+                    pause = think_time(step.get("think"), self.rng)
+                    if pause:
+                        await asyncio.sleep(min(pause, max(0.0, deadline - time.monotonic())))
+                if not completed:
+                    break
+            if completed:
+                self.result.journey(journey["name"], "completed")
+            iteration += 1
+
+
+async def run_scenario(scenario: Dict, users: int = DEFAULT_USERS, duration: float = DEFAULT_DURATION,
+                       ramp: float = DEFAULT_RAMP, seed: int = 1, connections: int = None) -> ScenarioResult:
+    """Run virtual users through the scenario for duration seconds, starting them over ramp seconds"""
+    validate_scenario(scenario)
+    pool = TokenPool(BASE_URL)
+    accounts = await pool.ensure(users)
+    if not accounts:
+        raise RuntimeError("No pool users could be registered or logged in")
+
+    result = ScenarioResult()
+    client = AsyncHTTPClient(BASE_URL, max_connections=connections or min(users, 1024))
+    start = time.monotonic()
+    deadline = start + ramp + duration
+
+    async def start_user(index: int):
+        await asyncio.sleep(ramp * index / users if users else 0.0)
+        user = VirtualUser(index, accounts[index % len(accounts)], scenario, client, result, seed)
+        await user.run(deadline)
+
+    try:
+        await asyncio.gather(*(start_user(index) for index in range(users)))
+    finally:
+        await client.close()
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run weighted user journeys against the Au Pair backend")
+    parser.add_argument("--scenario", help="JSON or YAML scenario file (default: built-in journeys)")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="seconds to run after ramp-up")
+    parser.add_argument("--ramp", type=float, default=DEFAULT_RAMP, help="seconds over which users start")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for journey choice and think time")
+    parser.add_argument("--connections", type=int, help="maximum concurrent connections")
+    args = parser.parse_args(argv)
+
+    scenario = load_scenario(args.scenario) if args.scenario else DEFAULT_SCENARIO
+
+    print("🚀 Starting Au Pair Backend Scenario Run")
+    print(f"Testing against: {BASE_URL}")
+    print(f"{args.users} virtual users, {len(scenario['journeys'])} journeys, "
+          f"{args.ramp:.0f}s ramp + {args.duration:.0f}s")
+
+    result = asyncio.run(run_scenario(scenario, args.users, args.duration, args.ramp,
+                                      args.seed, args.connections))
+    result.print_summary(scenario)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Constant-memory Soak Test for Au Pair Backend
+Drives steady open-loop load for hours in fixed windows. Every request is streamed
+to a size-rotated, gzip-archived JSONL sink instead of being kept in memory; only
+the current window's histograms, a cumulative RequestMetrics and one compact row
+per window stay resident. Between windows the backend's RSS, heap, event-loop
+delay and GC are read, optional Socket.IO connect/online/disconnect churn exercises
+online-user tracking, and slow drifts in latency and memory are flagged.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from backend_load import build_user_targets, run_load
+from backend_metrics import LatencyHistogram, RequestMetrics, add_observer, remove_observer
+from backend_resources import ProcReader, RuntimeReader, find_listener_pid
+from backend_results import save_run
+from backend_sockets import SocketClient, SocketRun
+from backend_test import BASE_URL
+from backend_tokens import TokenPool
+
+DEFAULT_HOURS = 4.0
+DEFAULT_WINDOW = 60.0
+DEFAULT_RATE = 50.0
+DEFAULT_USERS = 4
+DEFAULT_SINK = "soak_results.jsonl"
+DEFAULT_MAX_MB = 64
+DEFAULT_KEEP = 10
+DEFAULT_WARMUP_WINDOWS = 5
+# Compact per-window rows kept for drift analysis (a week of one-minute windows)
+MAX_WINDOWS = 10080
+MIN_DRIFT_WINDOWS = 10
+# Drift thresholds between the first and last third of the (post-warmup) run
+RSS_DRIFT_MB = 32.0
+RSS_DRIFT_SHARE = 0.10
+P99_DRIFT_SHARE = 0.25
+P99_DRIFT_MS = 5.0
+
+
+class JsonlSink:
+    """Append-only JSONL file rotated by size; rotated files are gzipped, the newest `keep` kept"""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_MB * 2**20, keep: int = DEFAULT_KEEP):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.keep - 1, 0, -1):
+            older = f"{self.path}.{index}.gz"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}.gz")
+        with open(self.path, "rb") as source, gzip.open(f"{self.path}.1.gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        stale = f"{self.path}.{self.keep + 1}.gz"
+        if os.path.exists(stale):
+            os.remove(stale)
+        self._file = open(self.path, "w")
+
+    def write(self, record: Dict):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.records += 1
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RequestStream:
+    """Metrics observer that forwards every request to the sink"""
+
+    def __init__(self, sink: JsonlSink):
+        self.sink = sink
+
+    def __call__(self, key: str, status_code: Optional[int], timings: Dict[str, float]):
+        record = {"ts": round(time.time(), 3), "route": key, "status": status_code}
+        record.update({phase: round(seconds * 1000, 3) for phase, seconds in timings.items()})
+        self.sink.write(record)
+
+
+async def socket_churn(accounts: List[Dict], seed: int) -> Dict[str, int]:
+    """Connect, authenticate, announce online and disconnect each account once"""
+    run = SocketRun()
+    options = {"base_url": BASE_URL, "seed": seed}
+    clients = [SocketClient(i, account, account, run, options) for i, account in enumerate(accounts)]
+    ready = await asyncio.gather(*(client.connect() for client in clients))
+    for client, ok in zip(clients, ready):
+        if ok:
+            await client.emit("user_online")
+    await asyncio.sleep(0.5)
+    for client in clients:
+        client.close()
+    return {"connected": run.counts["connected"], "authenticated": run.counts["authenticated"]}
+
+
+def window_row(index: int, elapsed_hours: float, window: RequestMetrics, proc: Optional[ProcReader],
+               runtime: RuntimeReader, sockets: Dict[str, int]) -> Dict:
+    """One compact summary row for a finished window"""
+    combined = LatencyHistogram()
+    requests = errors = 0
+    for route in window.routes.values():
+        combined.merge(route["phases"].get("total", LatencyHistogram()))
+        requests += sum(route["statuses"].values()) + sum(route["errors"].values())
+        errors += sum(count for code, count in route["statuses"].items() if code >= 500) + sum(route["errors"].values())
+    now = time.time()
+    row = {"window": index, "hours": round(elapsed_hours, 4), "requests": requests, "errors": errors,
+           **{key: round(value, 3) for key, value in combined.percentiles_ms().items()}}
+    if proc:
+        try:
+            row.update({key: value for key, value in proc.read(now).items() if key in ("rss_mb", "fds", "threads", "cpu")})
+        except OSError:
+            row["process"] = "gone"
+    row.update({key: value for key, value in runtime.read(now).items()
+                if key in ("heap_mb", "node_rss_mb", "loop_max_ms", "gc_pause_ms")})
+    row.setdefault("rss_mb", row.get("node_rss_mb"))
+    row.update({f"sockets_{key}": value for key, value in sockets.items()})
+    return row
+
+
+def _slope(xs: List[float], ys: List[float]) -> float:
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+
+def detect_drift(rows: List[Dict], warmup: int) -> List[Dict]:
+    """Compare the first and last third of the post-warmup windows for p99 and memory"""
+    rows = rows[warmup:]
+    if len(rows) < MIN_DRIFT_WINDOWS:
+        return []
+    findings = []
+    third = len(rows) // 3
+    for field, unit, flagged in (
+            ("p99", "ms", lambda base, delta: delta > max(P99_DRIFT_MS, base * P99_DRIFT_SHARE)),
+            ("rss_mb", "MB", lambda base, delta: delta > max(RSS_DRIFT_MB, base * RSS_DRIFT_SHARE)),
+            ("heap_mb", "MB", lambda base, delta: delta > max(RSS_DRIFT_MB, base * RSS_DRIFT_SHARE))):
+        points = [(row["hours"], row[field]) for row in rows if row.get(field) is not None]
+        if len(points) < MIN_DRIFT_WINDOWS:
+            continue
+        early = statistics.median(value for _, value in points[:third])
+        late = statistics.median(value for _, value in points[-third:])
+        rate = _slope([hours for hours, _ in points], [value for _, value in points])
+        findings.append({"metric": field, "unit": unit, "early": early, "late": late,
+                         "per_hour": rate, "drifting": flagged(early, late - early)})
+    return findings
+
+
+def print_window(row: Dict, baseline: Optional[Dict]):
+    rss = row.get("rss_mb")
+    growth = f" ({rss - baseline['rss_mb']:+.1f})" if rss is not None and baseline and baseline.get("rss_mb") else ""
+    heap = f", heap {row['heap_mb']:.1f}MB" if row.get("heap_mb") is not None else ""
+    print(f"[{row['hours'] * 60:7.1f} min] {row['requests']} req, {row['errors']} err, "
+          f"p50 {row['p50']:.1f}ms p99 {row['p99']:.1f}ms, RSS {rss if rss is None else round(rss, 1)}MB{growth}{heap}")
+
+
+def print_soak_summary(rows: List[Dict], findings: List[Dict], sink: JsonlSink, cumulative: RequestMetrics):
+    print("\n" + "="*50)
+    print("SOAK SUMMARY")
+    print("="*50)
+    print(f"Windows: {len(rows)}, requests: {sum(row['requests'] for row in rows)}, "
+          f"errors: {sum(row['errors'] for row in rows)}, records streamed: {sink.records}")
+    if not findings:
+        print(f"⚠️  Fewer than {MIN_DRIFT_WINDOWS} post-warmup windows; no drift verdict")
+    for finding in findings:
+        status = "❌ DRIFT" if finding["drifting"] else "✅ STABLE"
+        print(f"{status}: {finding['metric']} {finding['early']:.1f} -> {finding['late']:.1f}{finding['unit']} "
+              f"({finding['per_hour']:+.2f}{finding['unit']}/hour)")
+    cumulative.print_summary()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-hour constant-memory soak test with drift detection")
+    parser.add_argument("--hours", type=float, default=DEFAULT_HOURS, help="soak length in hours")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="seconds per measurement window")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="target arrivals per second")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="pool users to rotate tokens across")
+    parser.add_argument("--endpoint", action="append", dest="endpoints", help="restrict to a path (repeatable)")
+    parser.add_argument("--socket-churn", type=int, default=0,
+                        help="socket connect/online/disconnect cycles per window")
+    parser.add_argument("--sink", default=DEFAULT_SINK, help="JSONL file for per-request and per-window records")
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_MB, help="rotate the sink at this size")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="rotated gzip files to keep")
+    parser.add_argument("--windows-only", action="store_true", help="stream window summaries, not every request")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_WINDOWS, help="windows ignored for drift")
+    parser.add_argument("--pid", type=int, help="backend process id (default: the local listener on the BASE_URL port)")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    pid = args.pid or find_listener_pid(urlsplit(BASE_URL).port or 80)
+    print("🚀 Starting Au Pair soak test")
+    print(f"Testing against: {BASE_URL}, backend pid: {pid or 'not found'}, sink: {args.sink}")
+
+    sink = JsonlSink(args.sink, int(args.max_mb * 2**20), args.keep)
+    stream = RequestStream(sink)
+    if not args.windows_only:
+        add_observer(stream)
+    proc = ProcReader(pid) if pid else None
+    runtime = RuntimeReader()
+    pool = TokenPool()
+    cumulative = RequestMetrics()
+    rows = deque(maxlen=MAX_WINDOWS)
+    baseline = None
+    started = time.monotonic()
+    deadline = started + args.hours * 3600
+    window_index = 0
+    try:
+        if proc:
+            proc.read(time.time())
+        runtime.read(time.time())
+        while time.monotonic() < deadline:
+            # Tokens are re-checked every window so hours-long runs refresh them before expiry
+            accounts = [user for user in asyncio.run(pool.ensure(max(args.users, args.socket_churn)))
+                        if user.get("id")]
+            sockets = asyncio.run(socket_churn(accounts[:args.socket_churn], window_index)) \
+                if args.socket_churn else {}
+            targets = build_user_targets([user["accessToken"] for user in accounts[:args.users]], args.endpoints)
+            duration = min(args.window, deadline - time.monotonic())
+            result = asyncio.run(run_load(args.rate, max(duration, 1.0), targets=targets))
+            cumulative.merge(result.metrics)
+
+            row = window_row(window_index, (time.monotonic() - started) / 3600, result.metrics,
+                             proc, runtime, sockets)
+            sink.write(dict(row, type="window"))
+            rows.append(row)
+            baseline = baseline or (row if window_index >= args.warmup - 1 else None)
+            print_window(row, baseline)
+            window_index += 1
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted, summarizing the windows so far")
+    finally:
+        remove_observer(stream)
+
+    findings = detect_drift(list(rows), args.warmup)
+    sink.write({"type": "summary", "drift": findings})
+    print_soak_summary(list(rows), findings, sink, cumulative)
+    sink.close()
+    if not args.no_save:
+        save_run("soak", cumulative, dict(vars(args), base_url=BASE_URL), {"drift": findings}, args.label)
+    return 1 if any(finding["drifting"] for finding in findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
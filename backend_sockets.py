@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Socket.IO Messaging Load Simulator for Au Pair Backend
+Opens many concurrent Socket.IO connections (Engine.IO v4 over WebSocket), each
+authenticated as a distinct pool user, and drives the handlers in
+backend/src/sockets/messageHandlers.ts: authenticate, private_message,
+typing_start/typing_stop, mark_read and user_online. Reports connection-setup
+rate, end-to-end delivery latency from sender emit to receiver event, and
+server fan-out throughput.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from backend_metrics import LatencyHistogram
+from backend_test import BASE_URL
+from backend_tokens import TokenPool
+
+DEFAULT_CLIENTS = 1000
+DEFAULT_CONNECT_RATE = 500.0
+DEFAULT_DURATION = 60.0
+DEFAULT_MESSAGE_RATE = 0.2
+DEFAULT_TYPING_FRACTION = 0.5
+DEFAULT_READ_FRACTION = 0.5
+# user_online is broadcast to every other socket, so only a few clients announce
+DEFAULT_ONLINE_FRACTION = 0.01
+SETUP_TIMEOUT = 30.0
+DRAIN_SECONDS = 5.0
+MESSAGE_TAG = "lt:"
+
+# WebSocket opcodes
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class WebSocket:
+    """Minimal RFC 6455 client: masked text frames out, control frames handled inline"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, base_url: str, path: str) -> "WebSocket":
+        parts = urlsplit(base_url)
+        use_ssl = parts.scheme == "https"
+        context = ssl.create_default_context() if use_ssl else None
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if use_ssl else 80), ssl=context)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                      f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        if b" 101 " not in status_line:
+            writer.close()
+            raise ConnectionError(f"WebSocket upgrade refused: {status_line.decode().strip()}")
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        return cls(reader, writer)
+
+    def _frame(self, opcode: int, payload: bytes) -> bytes:
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x80 | opcode, 0x80 | length])
+        elif length < 65536:
+            header = bytes([0x80 | opcode, 0x80 | 126]) + length.to_bytes(2, "big")
+        else:
+            header = bytes([0x80 | opcode, 0x80 | 127]) + length.to_bytes(8, "big")
+        mask = os.urandom(4)
+        if not payload:
+            return header + mask
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+        return header + mask + masked
+
+    async def send_text(self, text: str):
+        self.writer.write(self._frame(OP_TEXT, text.encode()))
+        await self.writer.drain()
+
+    async def recv(self) -> Optional[str]:
+        """Next text message, or None once the server closes the connection"""
+        fragments = []
+        while True:
+            try:
+                head = await self.reader.readexactly(2)
+            except asyncio.IncompleteReadError:
+                return None
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = int.from_bytes(await self.reader.readexactly(2), "big")
+            elif length == 127:
+                length = int.from_bytes(await self.reader.readexactly(8), "big")
+            payload = await self.reader.readexactly(length) if length else b""
+
+            if opcode == OP_PING:
+                self.writer.write(self._frame(OP_PONG, payload))
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                return None
+            fragments.append(payload)
+            if fin:
+                return b"".join(fragments).decode("utf-8", "replace")
+
+    def close(self):
+        if not self.writer.is_closing():
+            try:
+                self.writer.write(self._frame(OP_CLOSE, b""))
+            except (OSError, RuntimeError):
+                pass
+            self.writer.close()
+
+
+class SocketRun:
+    """State shared by the simulated clients in one process"""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.counts = Counter()
+        self.sent_messages: Dict[str, float] = {}
+        self.pending_acks: Dict[str, float] = {}
+        self.typing_sent: Dict[tuple, float] = {}
+        self.read_sent: Dict[tuple, float] = {}
+        self.online_sent: Dict[str, float] = {}
+        self.connect_started = 0.0
+        self.connect_finished = 0.0
+        self.traffic_started = 0.0
+        self.traffic_finished = 0.0
+
+    def observe(self, key: str, seconds: float):
+        if key not in self.latency:
+            self.latency[key] = LatencyHistogram()
+        self.latency[key].record_seconds(seconds)
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency": {key: histogram.to_dict() for key, histogram in self.latency.items()},
+            "counts": dict(self.counts),
+            "undelivered": len(self.sent_messages),
+            "connect_seconds": self.connect_finished - self.connect_started,
+            "traffic_seconds": self.traffic_finished - self.traffic_started
+        }
+
+
+class SocketClient:
+    """One simulated chat user speaking Engine.IO v4 / Socket.IO v5 framing"""
+
+    def __init__(self, index: int, account: Dict, partner: Dict, run: SocketRun, options: Dict):
+        self.index = index
+        self.account = account
+        self.partner = partner
+        self.run = run
+        self.options = options
+        self.rng = random.Random(options["seed"] * 100003 + index)
+        self.ws: Optional[WebSocket] = None
+        self.authenticated: Optional[asyncio.Future] = None
+        self.sequence = 0
+
+    async def emit(self, event: str, data=None):
+        payload = [event] if data is None else [event, data]
+        await self.ws.send_text("42" + json.dumps(payload))
+        self.run.counts[f"emit {event}"] += 1
+
+    async def connect(self) -> bool:
+        """Open the socket, join the default namespace and authenticate"""
+        start = time.perf_counter()
+        try:
+            self.ws = await asyncio.wait_for(
+                WebSocket.connect(self.options["base_url"], "/socket.io/?EIO=4&transport=websocket"),
+                SETUP_TIMEOUT)
+            opened = await asyncio.wait_for(self.ws.recv(), SETUP_TIMEOUT)
+            if not opened or not opened.startswith("0"):
+                raise ConnectionError("Missing Engine.IO open packet")
+            await self.ws.send_text("40")
+            while True:
+                packet = await asyncio.wait_for(self.ws.recv(), SETUP_TIMEOUT)
+                if packet is None or packet.startswith("44"):
+                    raise ConnectionError(f"Namespace connect refused: {packet}")
+                if packet.startswith("40"):
+                    break
+                if packet == "2":
+                    await self.ws.send_text("3")
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            self.run.counts[f"connect failed ({type(e).__name__})"] += 1
+            if self.ws:
+                self.ws.close()
+            self.ws = None
+            return False
+        self.run.observe("connect (tcp + upgrade + namespace)", time.perf_counter() - start)
+        self.run.counts["connected"] += 1
+
+        self.authenticated = asyncio.get_running_loop().create_future()
+        asyncio.ensure_future(self.listen())
+        auth_start = time.perf_counter()
+        await self.emit("authenticate", self.account["accessToken"])
+        try:
+            ok = await asyncio.wait_for(asyncio.shield(self.authenticated), SETUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            ok = False
+        self.run.counts["authenticated" if ok else "auth failed"] += 1
+        if ok:
+            self.run.observe("authenticate", time.perf_counter() - auth_start)
+        return ok
+
+    async def listen(self):
+        """Answer Engine.IO pings and dispatch Socket.IO events until the socket closes"""
+        while self.ws:
+            packet = await self.ws.recv()
+            if packet is None:
+                break
+            if packet == "2":
+                await self.ws.send_text("3")
+            elif packet.startswith("42"):
+                try:
+                    event = json.loads(packet[2:])
+                except ValueError:
+                    continue
+                self.on_event(event[0], event[1] if len(event) > 1 else None)
+        if self.authenticated and not self.authenticated.done():
+            self.authenticated.set_result(False)
+
+    def on_event(self, name: str, data):
+        now = time.perf_counter()
+        run = self.run
+        run.counts[f"recv {name}"] += 1
+        if name == "authenticated":
+            if not self.authenticated.done():
+                self.authenticated.set_result(True)
+        elif name == "auth_error":
+            if not self.authenticated.done():
+                self.authenticated.set_result(False)
+        elif name in ("new_message", "message_sent"):
+            content = (data or {}).get("content", "")
+            if content.startswith(MESSAGE_TAG):
+                message_id = content[len(MESSAGE_TAG):].split(" ", 1)[0]
+                if name == "message_sent":
+                    sent = run.pending_acks.pop(message_id, None)
+                    if sent:
+                        run.observe("message_sent ack", now - sent)
+                else:
+                    sent = run.sent_messages.pop(message_id, None)
+                    if sent:
+                        run.observe("new_message delivery", now - sent)
+                    if self.rng.random() < self.options["read_fraction"]:
+                        run.read_sent[(self.account["id"], data.get("senderId"))] = time.perf_counter()
+                        asyncio.ensure_future(self.emit("mark_read", {"senderId": data.get("senderId")}))
+        elif name == "user_typing":
+            key = ((data or {}).get("userId"), self.account["id"], (data or {}).get("typing"))
+            sent = run.typing_sent.pop(key, None)
+            if sent:
+                run.observe("user_typing delivery", now - sent)
+        elif name == "messages_read":
+            sent = run.read_sent.pop(((data or {}).get("readBy"), self.account["id"]), None)
+            if sent:
+                run.observe("messages_read delivery", now - sent)
+        elif name == "user_status":
+            sent = run.online_sent.get((data or {}).get("userId"))
+            if sent and (data or {}).get("online"):
+                run.observe("user_status fan-out", now - sent)
+
+    async def traffic(self, deadline: float):
+        """Send Poisson-spaced messages to the partner, with typing indicators around some"""
+        options = self.options
+        if self.rng.random() < options["online_fraction"]:
+            self.run.online_sent[self.account["id"]] = time.perf_counter()
+            await self.emit("user_online")
+        while self.ws and time.monotonic() < deadline:
+            await asyncio.sleep(self.rng.expovariate(options["message_rate"]))
+            if not self.ws or time.monotonic() >= deadline:
+                break
+            partner_id = self.partner["id"]
+            try:
+                if self.rng.random() < options["typing_fraction"]:
+                    self.run.typing_sent[(self.account["id"], partner_id, True)] = time.perf_counter()
+                    await self.emit("typing_start", {"receiverId": partner_id})
+                    await asyncio.sleep(self.rng.uniform(0.5, 2.0))
+                    self.run.typing_sent[(self.account["id"], partner_id, False)] = time.perf_counter()
+                    await self.emit("typing_stop", {"receiverId": partner_id})
+                self.sequence += 1
+                message_id = f"{self.index}-{self.sequence}"
+                self.run.sent_messages[message_id] = self.run.pending_acks[message_id] = time.perf_counter()
+                await self.emit("private_message", {"receiverId": partner_id,
+                                                    "content": f"{MESSAGE_TAG}{message_id} hello from load test"})
+            except (OSError, RuntimeError):
+                self.run.counts["send failed"] += 1
+                break
+
+    def close(self):
+        if self.ws:
+            self.ws.close()
+            self.ws = None
+
+
+def _raise_fd_limit():
+    """Lift the soft open-file limit to the hard limit; tens of thousands of sockets need it"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+async def simulate(accounts: List[Dict], options: Dict) -> SocketRun:
+    """Connect every account at the configured rate, then run chat traffic between partners"""
+    run = SocketRun()
+    # Pair neighbours (0<->1, 2<->3, ...) so both ends of a conversation live in this process
+    clients = [SocketClient(i, account, accounts[i ^ 1 if (i ^ 1) < len(accounts) else i], run, options)
+               for i, account in enumerate(accounts)]
+
+    run.connect_started = time.perf_counter()
+    connects = []
+    for i, client in enumerate(clients):
+        delay = run.connect_started + i / options["connect_rate"] - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        connects.append(asyncio.ensure_future(client.connect()))
+    ready = await asyncio.gather(*connects)
+    run.connect_finished = time.perf_counter()
+
+    active = [client for client, ok in zip(clients, ready) if ok]
+    run.traffic_started = time.perf_counter()
+    deadline = time.monotonic() + options["duration"]
+    await asyncio.gather(*(client.traffic(deadline) for client in active))
+    await asyncio.sleep(DRAIN_SECONDS)
+    run.traffic_finished = time.perf_counter()
+
+    for client in clients:
+        client.close()
+    return run
+
+
+def _worker(accounts: List[Dict], options: Dict) -> Dict:
+    """Process entry point: run one slice of clients and return aggregated histograms"""
+    _raise_fd_limit()
+    return asyncio.run(simulate(accounts, options)).to_dict()
+
+
+def merge_results(results: List[Dict]) -> Dict:
+    """Combine per-worker results; workers ran concurrently so durations take the max"""
+    merged = {"latency": {}, "counts": Counter(), "undelivered": 0, "connect_seconds": 0.0,
+              "traffic_seconds": 0.0}
+    for result in results:
+        for key, data in result["latency"].items():
+            histogram = LatencyHistogram.from_dict(data)
+            if key in merged["latency"]:
+                merged["latency"][key].merge(histogram)
+            else:
+                merged["latency"][key] = histogram
+        merged["counts"].update(result["counts"])
+        merged["undelivered"] += result["undelivered"]
+        merged["connect_seconds"] = max(merged["connect_seconds"], result["connect_seconds"])
+        merged["traffic_seconds"] = max(merged["traffic_seconds"], result["traffic_seconds"])
+    return merged
+
+
+def print_socket_summary(result: Dict, clients: int):
+    """Print connection, delivery and fan-out results"""
+    counts = result["counts"]
+    print("\n" + "="*50)
+    print("SOCKET.IO SUMMARY")
+    print("="*50)
+    connect_seconds = result["connect_seconds"] or 1.0
+    traffic_seconds = result["traffic_seconds"] or 1.0
+    print(f"Connections: {counts['connected']}/{clients} established, {counts['authenticated']} authenticated, "
+          f"{counts['auth failed']} auth failures")
+    print(f"Connection setup rate: {counts['connected'] / connect_seconds:.1f} conn/s")
+    for key, count in sorted(counts.items()):
+        if key.startswith("connect failed") or key == "send failed":
+            print(f"    {key}: {count}")
+
+    sent = counts["emit private_message"]
+    delivered = counts["recv new_message"]
+    print(f"\nMessages: {sent} sent, {delivered} delivered, {result['undelivered']} undelivered")
+    received = sum(count for key, count in counts.items() if key.startswith("recv "))
+    print(f"Server fan-out: {received / traffic_seconds:.1f} events/s delivered to clients "
+          f"({counts['recv user_status']} user_status broadcasts received)")
+
+    print("\nLatency (ms):")
+    for key, histogram in sorted(result["latency"].items()):
+        values = histogram.percentiles_ms()
+        print(f"    {key:<36} n={histogram.total_count:<8} p50 {values['p50']:8.2f}  "
+              f"p90 {values['p90']:8.2f}  p99 {values['p99']:8.2f}  p99.9 {values['p99.9']:8.2f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Socket.IO messaging load simulator for the Au Pair backend")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS, help="concurrent socket connections")
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread clients across")
+    parser.add_argument("--connect-rate", type=float, default=DEFAULT_CONNECT_RATE,
+                        help="new connections per second (total)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds of chat traffic")
+    parser.add_argument("--message-rate", type=float, default=DEFAULT_MESSAGE_RATE,
+                        help="messages per second per client")
+    parser.add_argument("--typing-fraction", type=float, default=DEFAULT_TYPING_FRACTION,
+                        help="share of messages preceded by typing_start/typing_stop")
+    parser.add_argument("--read-fraction", type=float, default=DEFAULT_READ_FRACTION,
+                        help="share of received messages answered with mark_read")
+    parser.add_argument("--online-fraction", type=float, default=DEFAULT_ONLINE_FRACTION,
+                        help="share of clients that broadcast user_online")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print("🔌 Starting Au Pair Socket.IO Load Simulation")
+    print(f"Testing against: {BASE_URL}")
+
+    _raise_fd_limit()
+    accounts = [user for user in asyncio.run(TokenPool(BASE_URL).ensure(args.clients)) if user.get("id")]
+    if len(accounts) < 2:
+        print("❌ Need at least two pool users with ids to exchange messages")
+        return 1
+
+    workers = max(1, min(args.workers, len(accounts) // 2))
+    options = {
+        "base_url": BASE_URL,
+        "connect_rate": args.connect_rate / workers,
+        "duration": args.duration,
+        "message_rate": args.message_rate,
+        "typing_fraction": args.typing_fraction,
+        "read_fraction": args.read_fraction,
+        "online_fraction": args.online_fraction,
+        "seed": args.seed
+    }
+    # Even-sized slices keep each conversation pair inside one worker
+    per_worker = (len(accounts) // workers) & ~1
+    slices = [accounts[i * per_worker:(i + 1) * per_worker] for i in range(workers - 1)]
+    slices.append(accounts[(workers - 1) * per_worker:])
+
+    if workers == 1:
+        results = [asyncio.run(simulate(accounts, options)).to_dict()]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_worker, slices, [options] * workers))
+
+    print_socket_summary(merge_results(results), len(accounts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
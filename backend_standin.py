@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Offline Stand-in Server for the Au Pair Backend API
+An asyncio HTTP/1.1 server (keep-alive, chunked request bodies, no third-party
+dependencies) implementing the routes the harness uses: /, /health, /api/demo/*,
+/api/auth/* and the protected /api/* routes with HS256 JWT checks. Latency,
+500s and dropped connections can be injected. Use it to measure the client's
+own overhead and ceiling, or to run the harness offline:
+
+    python backend_standin.py -- python backend_suite.py --no-save
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from backend_test import BASE_URL
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+ACCESS_SECRET = "standin-access-secret"
+REFRESH_SECRET = "standin-refresh-secret"
+# Same lifetimes as backend/src/utils/jwt.ts
+ACCESS_TTL = 15 * 60
+REFRESH_TTL = 7 * 24 * 3600
+DEMO_PASSWORDS = ("password123", "demo")
+ALLOWED_ORIGINS = ("http://localhost:3000", "https://au-pair.netlify.app")
+# Request bodies beyond this are read and discarded (document uploads)
+MAX_BUFFERED_BODY = 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+# Same ids and profiles as the demoUsers list in backend/src/routes/demo.ts
+DEMO_USERS = [
+    {"id": "550e8400-e29b-41d4-a716-446655440001", "email": "sarah@demo.com", "role": "AU_PAIR",
+     "isEmailVerified": True, "profilecompleted": True,
+     "profile": {"firstName": "Sarah", "lastName": "Johnson",
+                 "bio": "Experienced au pair with 3 years of childcare experience.",
+                 "profilePhotoUrl": "https://images.unsplash.com/photo-1494790108755-2616b612b47c?w=300"}},
+    {"id": "550e8400-e29b-41d4-a716-446655440002", "email": "mueller@demo.com", "role": "HOST_FAMILY",
+     "isEmailVerified": True, "profilecompleted": True,
+     "profile": {"familyName": "Mueller Family", "contactPersonName": "Anna Mueller",
+                 "bio": "We are a friendly family looking for an au pair.",
+                 "profilePhotoUrl": "https://images.unsplash.com/photo-1511895426328-dc8714191300?w=300"}},
+]
+
+# Statuses that hold an au pair's time slot, as in backend/src/routes/bookings.ts
+ACTIVE_BOOKING_STATUSES = ("PENDING", "APPROVED")
+DELETABLE_BOOKING_STATUSES = ("PENDING", "REJECTED", "CANCELLED")
+COUNTERPART_ROLES = {"AU_PAIR": "HOST_FAMILY", "HOST_FAMILY": "AU_PAIR"}
+
+# (status, JSON payload, extra headers); None drops the connection
+Response = Optional[Tuple[int, Dict, Dict[str, str]]]
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+JWT_HEADER = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def jwt_encode(claims: Dict, secret: str) -> str:
+    """HS256 token in the shape jsonwebtoken.sign produces"""
+    signing_input = f"{JWT_HEADER}.{_b64(json.dumps(claims, separators=(',', ':')).encode())}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64(signature)}"
+
+
+def jwt_decode(token: str, secret: str) -> Optional[Dict]:
+    """Claims of a valid, unexpired HS256 token, else None"""
+    try:
+        header, payload, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _unb64(signature)):
+            return None
+        if json.loads(_unb64(header)).get("alg") != "HS256":
+            return None
+        claims = json.loads(_unb64(payload))
+    except (ValueError, TypeError):
+        return None
+    return claims if claims.get("exp", 0) > time.time() else None
+
+
+def parse_date(value) -> Optional[float]:
+    """Epoch seconds for an ISO 8601 date as new Date() reads it; None when missing or invalid"""
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def iso_date(seconds: float = None) -> str:
+    """Date.toISOString() form"""
+    moment = datetime.fromtimestamp(time.time() if seconds is None else seconds, timezone.utc)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class FaultConfig:
+    """Latency and failure injection applied to every route except /health"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 drop_rate: float = 0.0, slow_routes: Dict[str, float] = None, seed: int = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.slow_routes = slow_routes or {}
+        self.random = random.Random(seed)
+
+    def delay(self, path: str) -> float:
+        """Seconds to wait before answering; jitter is exponential for a realistic tail"""
+        ms = self.latency_ms + next((extra for prefix, extra in self.slow_routes.items()
+                                     if path.startswith(prefix)), 0.0)
+        if self.jitter_ms:
+            ms += self.random.expovariate(1 / self.jitter_ms)
+        return ms / 1000
+
+    def outcome(self) -> Optional[str]:
+        roll = self.random.random()
+        if roll < self.drop_rate:
+            return "drop"
+        if roll < self.drop_rate + self.error_rate:
+            return "error"
+        return None
+
+
+class StandinServer:
+    """In-memory implementation of the API routes the harness calls"""
+
+    def __init__(self, faults: FaultConfig = None, access_secret: str = ACCESS_SECRET,
+                 refresh_secret: str = REFRESH_SECRET):
+        self.faults = faults or FaultConfig()
+        self.access_secret = access_secret
+        self.refresh_secret = refresh_secret
+        self.users: Dict[str, Dict] = {user["email"]: dict(user, password=None) for user in DEMO_USERS}
+        self.by_id: Dict[str, Dict] = {user["id"]: user for user in self.users.values()}
+        self.bookings: Dict[str, Dict] = {}
+        self.messages: List[Dict] = []
+        self.counts = Counter()
+        self.injected = Counter()
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        # (method, pattern, handler, needs a valid access token)
+        self.routes: List[Tuple[str, re.Pattern, Callable, bool]] = [
+            ("GET", "/", self.root, False),
+            ("GET", "/health", self.health, False),
+            ("POST", "/api/demo/login", self.login, False),
+            ("POST", "/api/demo/register", self.register, False),
+            ("GET", "/api/demo/users/search", self.search, False),
+            ("GET", "/api/demo/stats", self.demo_stats, False),
+            ("GET", "/api/demo/endpoints", self.demo_endpoints, False),
+            ("GET", "/api/demo/matches", self.demo_matches, False),
+            ("GET", "/api/demo/messages/conversations", self.demo_conversations, False),
+            ("GET", "/api/demo/dashboard/stats", self.dashboard, False),
+            ("GET", "/api/demo/profiles/completion", self.completion, False),
+            ("POST", "/api/auth/login", self.login, False),
+            ("POST", "/api/auth/register", self.register, False),
+            ("POST", "/api/auth/refresh", self.refresh, False),
+            ("POST", "/api/documents/upload", self.upload, False),
+            ("GET", "/api/auth/me", self.me, True),
+            ("GET", "/api/dashboard/stats", self.dashboard, True),
+            ("GET", "/api/profiles?/completion", self.completion, True),
+            ("GET", "/api/matches", self.matches, True),
+            ("GET", "/api/matches/recent", self.recent_matches, True),
+            ("GET", "/api/(?:messages/)?conversations", self.conversations, True),
+            ("GET", "/api/messages/with/(?P<user_id>[^/]+)", self.thread, True),
+            ("POST", "/api/messages", self.send_message, True),
+            ("GET", "/api/users/search", self.search, True),
+            ("GET", "/api/admin/users", self.admin_users, True),
+            ("GET", "/api/admin/dashboard", self.demo_stats, True),
+            ("GET", "/api/bookings", self.list_bookings, True),
+            ("POST", "/api/bookings", self.create_booking, True),
+            ("GET", "/api/bookings/au-pair/(?P<au_pair_id>[^/]+)/availability", self.availability, True),
+            ("GET", "/api/bookings/(?P<booking_id>[^/]+)", self.get_booking, True),
+            ("DELETE", "/api/bookings/(?P<booking_id>[^/]+)", self.cancel_booking, True),
+        ]
+        self.routes = [(method, re.compile(f"^{pattern}/?$"), handler, protected)
+                       for method, pattern, handler, protected in self.routes]
+
+    # --- helpers ---
+
+    def _public(self, user: Dict) -> Dict:
+        return {key: user[key] for key in ("id", "email", "role", "isEmailVerified", "profilecompleted", "profile")}
+
+    def _tokens(self, user: Dict) -> Dict:
+        now = int(time.time())
+        return {
+            "accessToken": jwt_encode({"userId": user["id"], "iat": now, "exp": now + ACCESS_TTL}, self.access_secret),
+            "refreshToken": jwt_encode({"userId": user["id"], "iat": now, "exp": now + REFRESH_TTL},
+                                       self.refresh_secret),
+        }
+
+    def _counterparts(self, user: Dict) -> List[Dict]:
+        """Every user of the opposite role; the stand-in treats each such pair as an APPROVED match"""
+        role = COUNTERPART_ROLES.get(user["role"])
+        return [other for other in self.by_id.values() if other["role"] == role]
+
+    def _match(self, user: Dict, other: Dict) -> Dict:
+        host, au_pair = (user, other) if user["role"] == "HOST_FAMILY" else (other, user)
+        return {"id": str(uuid.uuid5(uuid.NAMESPACE_OID, f"{host['id']}:{au_pair['id']}")), "matchScore": 80,
+                "status": "APPROVED", "createdAt": iso_date(self.started_at), "hostId": host["id"],
+                "auPairId": au_pair["id"]}
+
+    def _authenticate(self, headers: Dict[str, str]) -> Tuple[Optional[Dict], Optional[str]]:
+        token = headers.get("authorization", "").partition(" ")[2]
+        if not token:
+            return None, "Authentication token required"
+        claims = jwt_decode(token, self.access_secret)
+        user = self.by_id.get(claims.get("userId")) if claims else None
+        return user, None if user else "Invalid or expired token"
+
+    # --- handlers: (request dict) -> (status, payload) ---
+
+    def root(self, request):
+        return 200, {"message": "🎉 Au-Pair Backend API", "service": "au-pair-backend", "version": "1.0.0",
+                     "environment": "standin", "documentation": "Check /api/demo/endpoints"}
+
+    def health(self, request):
+        return 200, {"status": "OK", "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                     "service": "au-pair-backend", "version": "1.0.0", "environment": "standin"}
+
+    def login(self, request):
+        body = request["json"]
+        user = self.users.get(body.get("email"))
+        # Demo accounts take the demo passwords, registered ones their own
+        accepted = DEMO_PASSWORDS if user and user["password"] is None else ((user or {}).get("password"),)
+        if not user or body.get("password") not in accepted:
+            return 401, {"message": "Invalid credentials"}
+        return 200, dict({"message": "Login successful", "user": self._public(user)}, **self._tokens(user))
+
+    def register(self, request):
+        body = request["json"]
+        email, password, role = body.get("email"), body.get("password"), str(body.get("role", "")).upper()
+        if not email or not password or role not in ("AU_PAIR", "HOST_FAMILY", "ADMIN"):
+            return 400, {"message": "Email, password and a valid role are required"}
+        if email in self.users:
+            return 400, {"message": "User already exists in demo"}
+        user = {"id": str(uuid.uuid4()), "email": email, "password": password, "role": role,
+                "isEmailVerified": True, "profilecompleted": False, "profile": {}}
+        self.users[email] = user
+        self.by_id[user["id"]] = user
+        return 201, dict({"message": "Registration successful", "user": self._public(user)}, **self._tokens(user))
+
+    def refresh(self, request):
+        token = request["json"].get("refreshToken")
+        if not token:
+            return 401, {"message": "Refresh token is required"}
+        claims = jwt_decode(token, self.refresh_secret)
+        user = self.by_id.get(claims.get("userId")) if claims else None
+        if not user:
+            return 401, {"message": "Invalid refresh token"}
+        return 200, self._tokens(user)
+
+    def me(self, request):
+        return 200, {"user": self._public(request["user"])}
+
+    def search(self, request):
+        role = request["query"].get("role") or (request["user"] or {}).get("role")
+        users = [self._public(user) for user in self.users.values() if user["role"] != role]
+        return 200, {"users": users, "total": len(users), "message": "Demo users loaded"}
+
+    def demo_stats(self, request):
+        roles = Counter(user["role"] for user in self.users.values())
+        return 200, {"totalUsers": len(self.users), "auPairs": roles["AU_PAIR"], "hostFamilies": roles["HOST_FAMILY"],
+                     "matches": 1, "messages": 3, "bookings": len(self.bookings), "mode": "demo"}
+
+    def demo_endpoints(self, request):
+        return 200, {"endpoints": [f"{method} {pattern.pattern[1:-3]}" for method, pattern, _, _ in self.routes]}
+
+    def demo_matches(self, request):
+        host, au_pair = DEMO_USERS[1], DEMO_USERS[0]
+        return 200, {"matches": [{"id": "demo-match-1", "status": "APPROVED", "matchScore": 92,
+                                  "hostId": host["id"], "auPairId": au_pair["id"]}]}
+
+    def demo_conversations(self, request):
+        return 200, {"conversations": [{"id": "demo-conversation-1", "participants": [u["id"] for u in DEMO_USERS],
+                                        "lastMessage": "Looking forward to meeting you!", "unreadCount": 1}]}
+
+    def matches(self, request):
+        page, limit = int(request["query"].get("page") or 1), int(request["query"].get("limit") or 10)
+        user = request["user"]
+        matches = [self._match(user, other) for other in self._counterparts(user)]
+        return 200, {"matches": matches[(page - 1) * limit:page * limit], "page": page, "limit": limit}
+
+    def recent_matches(self, request):
+        # Bare array carrying only the counterpart's id field, like matches.ts /recent
+        user = request["user"]
+        other_field = "hostId" if user["role"] == "AU_PAIR" else "auPairId"
+        recent = []
+        for other in self._counterparts(user)[:int(request["query"].get("limit") or 5)]:
+            match = self._match(user, other)
+            recent.append({"id": match["id"], "matchScore": match["matchScore"], "status": match["status"],
+                           "createdAt": match["createdAt"], other_field: other["id"],
+                           "profile": dict(other["profile"], id=f"profile-{other['id']}")})
+        return 200, recent
+
+    def conversations(self, request):
+        # Bare array grouped by partner, newest message first, like messages.ts /conversations
+        user_id = request["user"]["id"]
+        by_partner: Dict[str, Dict] = {}
+        for message in reversed(self.messages):
+            if user_id not in (message["senderId"], message["receiverId"]):
+                continue
+            partner_id = message["receiverId"] if message["senderId"] == user_id else message["senderId"]
+            conversation = by_partner.setdefault(partner_id, {"partnerId": partner_id, "lastMessage": message,
+                                                              "unreadCount": 0, "messages": [message]})
+            if message["receiverId"] == user_id and not message["isRead"]:
+                conversation["unreadCount"] += 1
+        for partner_id, conversation in by_partner.items():
+            partner = self.by_id.get(partner_id)
+            conversation.update(partnerName=partner["email"] if partner else "Unknown User",
+                                partnerEmail=partner["email"] if partner else "unknown@email.com",
+                                partnerPhoto=None)
+        return 200, list(by_partner.values())
+
+    def thread(self, request):
+        other, me = request["params"]["user_id"], request["user"]["id"]
+        page, limit = int(request["query"].get("page") or 1), int(request["query"].get("limit") or 50)
+        between = [message for message in reversed(self.messages)
+                   if {message["senderId"], message["receiverId"]} == {me, other}][(page - 1) * limit:page * limit]
+        for message in between:
+            if message["receiverId"] == me:
+                message["isRead"] = True
+        return 200, {"messages": between[::-1], "page": page, "limit": limit}
+
+    def send_message(self, request):
+        body = request["json"]
+        receiver_id, content = body.get("receiverId"), body.get("content")
+        if not receiver_id or not content:
+            return 400, {"message": "Receiver ID and content are required"}
+        if receiver_id not in self.by_id:
+            return 400, {"message": "Receiver not found or inactive"}
+        now = iso_date()
+        message = {"id": str(uuid.uuid4()), "senderId": request["user"]["id"], "receiverId": receiver_id,
+                   "content": str(content).strip(), "isRead": False, "createdAt": now, "updatedAt": now}
+        self.messages.append(message)
+        return 201, {"message": "Message sent successfully", "data": message}
+
+    def dashboard(self, request):
+        return 200, {"totalMatches": 1, "pendingMatches": 0, "unreadMessages": 1,
+                     "upcomingBookings": len(self.bookings), "profileViews": 12}
+
+    def completion(self, request):
+        return 200, {"completionPercentage": 80, "missingFields": ["languages"]}
+
+    def admin_users(self, request):
+        users = [self._public(user) for user in self.users.values()]
+        return 200, {"users": users, "pagination": {"page": 1, "limit": len(users), "total": len(users), "pages": 1}}
+
+    def upload(self, request):
+        return 201, {"message": "Document uploaded successfully",
+                     "document": {"id": str(uuid.uuid4()), "size": request["length"], "status": "PENDING"}}
+
+    def list_bookings(self, request):
+        user = request["user"]
+        field = {"AU_PAIR": "auPairId", "HOST_FAMILY": "hostId"}.get(user["role"])
+        mine = [b for b in self.bookings.values() if not field or b[field] == user["id"]]
+        return 200, {"bookings": sorted(mine, key=lambda booking: parse_date(booking["startDate"]))}
+
+    def create_booking(self, request):
+        # Same checks and messages as POST /api/bookings in backend/src/routes/bookings.ts
+        body, user = request["json"], request["user"]
+        target_id = body.get("targetUserId")
+        start, end = parse_date(body.get("startDate")), parse_date(body.get("endDate"))
+        if not target_id or not body.get("startDate") or not body.get("endDate"):
+            return 400, {"message": "Target user, start date, and end date are required"}
+        if start is None or end is None or start >= end:
+            return 400, {"message": "End date must be after start date"}
+        if start < time.time():
+            return 400, {"message": "Start date cannot be in the past"}
+        target = self.by_id.get(target_id)
+        if not target:
+            return 404, {"message": "Target user not found or inactive"}
+        if target not in self._counterparts(user):
+            return 400, {"message": "Bookings can only be made between au pairs and host families"}
+
+        au_pair_id = user["id"] if user["role"] == "AU_PAIR" else target_id
+        for booking in self.bookings.values():
+            # Inclusive overlap, so bookings that merely touch conflict as in the real route
+            if (booking["auPairId"] == au_pair_id and booking["status"] in ACTIVE_BOOKING_STATUSES
+                    and parse_date(booking["startDate"]) <= end and parse_date(booking["endDate"]) >= start):
+                return 400, {"message": "There is a conflicting booking for this time period"}
+
+        total_hours, hourly_rate = body.get("totalHours"), body.get("hourlyRate")
+        now = iso_date()
+        booking = {
+            "id": str(uuid.uuid4()), "auPairId": au_pair_id,
+            "hostId": user["id"] if user["role"] == "HOST_FAMILY" else target_id,
+            "startDate": iso_date(start), "endDate": iso_date(end),
+            "totalHours": float(total_hours) if total_hours else None,
+            "hourlyRate": float(hourly_rate) if hourly_rate else None,
+            "totalAmount": float(total_hours) * float(hourly_rate) if total_hours and hourly_rate else None,
+            "currency": body.get("currency") or "USD", "notes": body.get("notes"), "status": "PENDING",
+            "createdAt": now, "updatedAt": now,
+        }
+        self.bookings[booking["id"]] = booking
+        return 201, {"message": "Booking request created successfully", "booking": booking}
+
+    def availability(self, request):
+        au_pair = self.by_id.get(request["params"]["au_pair_id"])
+        if not au_pair or au_pair["role"] != "AU_PAIR":
+            return 404, {"message": "Au pair not found or inactive"}
+        start, end = parse_date(request["query"].get("startDate")), parse_date(request["query"].get("endDate"))
+        slots = []
+        for booking in self.bookings.values():
+            if booking["auPairId"] != au_pair["id"] or booking["status"] not in ACTIVE_BOOKING_STATUSES:
+                continue
+            booked_start, booked_end = parse_date(booking["startDate"]), parse_date(booking["endDate"])
+            if start is not None and end is not None:
+                if booked_start > end or booked_end < start:
+                    continue
+            elif booked_start < time.time():
+                continue
+            slots.append({key: booking[key] for key in ("id", "startDate", "endDate", "status")})
+        return 200, {"bookedSlots": sorted(slots, key=lambda slot: parse_date(slot["startDate"]))}
+
+    def get_booking(self, request):
+        booking = self.bookings.get(request["params"]["booking_id"])
+        if not booking:
+            return 404, {"message": "Booking not found"}
+        if request["user"]["id"] not in (booking["auPairId"], booking["hostId"]):
+            return 403, {"message": "You can only view bookings you are part of"}
+        return 200, {"booking": booking}
+
+    def cancel_booking(self, request):
+        booking = self.bookings.get(request["params"]["booking_id"])
+        if not booking:
+            return 404, {"message": "Booking not found"}
+        if request["user"]["id"] not in (booking["auPairId"], booking["hostId"]):
+            return 403, {"message": "You can only delete bookings you are part of"}
+        if booking["status"] not in DELETABLE_BOOKING_STATUSES:
+            return 400, {"message": "Can only delete pending, rejected, or cancelled bookings"}
+        del self.bookings[booking["id"]]
+        return 200, {"message": "Booking deleted successfully"}
+
+    # --- HTTP ---
+
+    def _cors(self, headers: Dict[str, str]) -> Dict[str, str]:
+        origin = headers.get("origin")
+        if origin not in ALLOWED_ORIGINS:
+            return {}
+        return {"Access-Control-Allow-Origin": origin, "Access-Control-Allow-Credentials": "true", "Vary": "Origin"}
+
+    async def dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes,
+                       length: int) -> Response:
+        parts = urlsplit(target)
+        path = parts.path
+        cors = self._cors(headers)
+        if method == "OPTIONS":
+            return 204, None, dict(cors, **{"Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
+                                            "Access-Control-Allow-Headers": "Content-Type,Authorization"})
+
+        if not path.startswith("/health"):
+            await asyncio.sleep(self.faults.delay(path))
+            fault = self.faults.outcome()
+            if fault:
+                self.injected[fault] += 1
+                return None if fault == "drop" else (500, {"message": "Internal server error"}, cors)
+
+        for route_method, pattern, handler, protected in self.routes:
+            match = pattern.match(path)
+            if not match or route_method != method:
+                continue
+            request = {"params": match.groupdict(), "query": {k: v[-1] for k, v in parse_qs(parts.query).items()},
+                       "json": {}, "user": None, "length": length}
+            if body and "json" in headers.get("content-type", ""):
+                try:
+                    request["json"] = json.loads(body)
+                except ValueError:
+                    return 400, {"message": "Invalid JSON in request body"}, cors
+                # Handlers read fields off an object, as express' req.body is for these routes
+                if not isinstance(request["json"], dict):
+                    return 400, {"message": "Request body must be a JSON object"}, cors
+            if protected:
+                request["user"], error = self._authenticate(headers)
+                if error:
+                    return 401, {"message": error}, cors
+            status, payload = handler(request)
+            return status, payload, cors
+        return 404, {"message": "Route not found", "path": path, "method": method}, cors
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, version = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                body, length = await read_body(reader, headers)
+
+                response = await self.dispatch(method, target, headers, body, length)
+                self.counts[f"{method} {urlsplit(target).path}"] += 1
+                if response is None:
+                    break
+                status, payload, extra = response
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(encode_response(status, payload, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            # Client hung up mid-body or sent garbage framing; drop the connection quietly
+            pass
+        finally:
+            writer.close()
+
+    def print_summary(self):
+        elapsed = time.monotonic() - self.started
+        total = sum(self.counts.values())
+        print("\n" + "="*50)
+        print("STAND-IN SUMMARY")
+        print("="*50)
+        print(f"Served {total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} req/s)")
+        if self.injected:
+            print(f"Injected faults: {dict(self.injected)}")
+        for name, count in self.counts.most_common(15):
+            print(f"    {count:8d}  {name}")
+
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> Tuple[bytes, int]:
+    """Read a Content-Length or chunked body; returns (first MAX_BUFFERED_BODY bytes, full length)"""
+    parts, length = [], 0
+
+    def keep(chunk: bytes):
+        nonlocal length
+        if length < MAX_BUFFERED_BODY:
+            parts.append(chunk[:MAX_BUFFERED_BODY - length])
+        length += len(chunk)
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            while size:
+                chunk = await reader.readexactly(min(size, READ_CHUNK))
+                size -= len(chunk)
+                keep(chunk)
+            await reader.readexactly(2)
+    else:
+        remaining = int(headers.get("content-length") or 0)
+        while remaining:
+            chunk = await reader.readexactly(min(remaining, READ_CHUNK))
+            remaining -= len(chunk)
+            keep(chunk)
+    return b"".join(parts), length
+
+
+def encode_response(status: int, payload: Optional[Dict], headers: Dict[str, str], keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+             f"Content-Length: {len(body)}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    if payload is not None:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+async def serve(standin: StandinServer, host: str, port: int, command: List[str] = None) -> int:
+    """Serve until interrupted, or until command exits (returning its exit code)"""
+    server = await asyncio.start_server(standin.handle, host, port, reuse_address=True)
+    print(f"🧪 Stand-in backend listening on http://{host}:{port}")
+    try:
+        if command:
+            process = await asyncio.create_subprocess_exec(*command)
+            return await process.wait()
+        async with server:
+            await server.serve_forever()
+    finally:
+        server.close()
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run an in-memory stand-in for the backend API")
+    parser.add_argument("--host", default=urlsplit(BASE_URL).hostname, help="address to listen on")
+    parser.add_argument("--port", type=int, default=urlsplit(BASE_URL).port or 80, help="port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="fixed latency added to each response (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="mean of extra exponential latency (ms)")
+    parser.add_argument("--slow-route", action="append", default=[], metavar="PREFIX=MS",
+                        help="extra latency for paths starting with PREFIX (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections closed without reply")
+    parser.add_argument("--seed", type=int, help="seed for reproducible fault injection")
+    parser.add_argument("command", nargs=argparse.REMAINDER,
+                        help="after --, a command to run against the stand-in; its exit code is returned")
+    args = parser.parse_args(argv)
+
+    slow_routes = {prefix: float(ms) for prefix, _, ms in (rule.partition("=") for rule in args.slow_route)}
+    faults = FaultConfig(args.latency, args.jitter, args.error_rate, args.drop_rate, slow_routes, args.seed)
+    standin = StandinServer(faults)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if uvloop:
+        uvloop.install()
+    try:
+        code = asyncio.run(serve(standin, args.host, args.port, command))
+    except KeyboardInterrupt:
+        code = 0
+    standin.print_summary()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
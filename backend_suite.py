@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware Parallel Functional Suite for Au Pair Backend
+Every check from backend_test.py and final_backend_test.py declares the resources
+it needs (e.g. an auth token) and the ones it provides. Independent checks run
+concurrently, so wall-clock time is bounded by the longest dependency chain
+rather than the sum of all requests.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend_metrics import RequestMetrics, timed_request
+from backend_results import save_run
+from backend_test import BASE_URL, DEMO_CREDENTIALS, DEMO_ENDPOINTS, PROTECTED_ENDPOINTS, APITester
+
+DEFAULT_WORKERS = 16
+CORS_ORIGIN = "https://au-pair.netlify.app"
+
+# A check returns (success, details, value); value is published under `provides`
+CheckResult = Tuple[bool, str, Optional[object]]
+
+
+class Check:
+    """One functional check with the resources it needs and provides"""
+
+    def __init__(self, name: str, run: Callable[["SuiteContext"], CheckResult],
+                 needs: Tuple[str, ...] = (), provides: Optional[str] = None):
+        self.name = name
+        self.run = run
+        self.needs = needs
+        self.provides = provides
+
+
+class SuiteContext:
+    """Shared state for checks: published resources and per-thread API testers"""
+
+    def __init__(self):
+        self.metrics = RequestMetrics()
+        self.resources: Dict[str, object] = {}
+        self._local = threading.local()
+
+    @property
+    def tester(self) -> APITester:
+        # requests sessions are not thread-safe, so each worker gets its own
+        if not hasattr(self._local, "tester"):
+            self._local.tester = APITester()
+            self._local.tester.metrics = self.metrics
+        return self._local.tester
+
+    def request(self, method: str, endpoint: str, data: Dict = None, headers: Dict = None,
+                auth: str = None):
+        token = self.resources.get(auth) if auth else None
+        return self.tester.make_request(method, endpoint, data, headers, token)
+
+
+def _status(response) -> str:
+    return f"Status: {response.status_code if response is not None else 'No response'}"
+
+
+def endpoint_check(name: str, method: str, endpoint: str, expected: Tuple[int, ...], data: Dict = None,
+                   auth: str = None, provides: str = None, headers: Dict = None,
+                   detail: Callable = None) -> Check:
+    """Check that endpoint answers with one of the expected statuses.
+
+    With provides, the response's accessToken is published under that name.
+    """
+    def run(ctx: SuiteContext) -> CheckResult:
+        response = ctx.request(method, endpoint, data, dict(headers or {}), auth)
+        if response is None or response.status_code not in expected:
+            return False, f"Expected {'/'.join(map(str, expected))}, got: {_status(response)}", None
+        value = None
+        if provides:
+            value = response.json().get("accessToken")
+            if not value:
+                return False, "No accessToken in response", None
+        return True, detail(response) if detail else _status(response), value
+
+    return Check(name, run, needs=(auth,) if auth else (), provides=provides)
+
+
+def _cors(ctx: SuiteContext) -> CheckResult:
+    response = ctx.request("GET", "/health", headers={"Origin": CORS_ORIGIN})
+    if response is None:
+        return False, "No response received", None
+    header = response.headers.get("Access-Control-Allow-Origin")
+    return bool(header), f"CORS header present: {header}" if header else "No CORS headers found", None
+
+
+def _malformed_json(ctx: SuiteContext) -> CheckResult:
+    try:
+        response = timed_request(ctx.metrics, "POST", f"{BASE_URL}/api/auth/login", session=ctx.tester.session,
+                                 route="/api/auth/login", data="invalid json",
+                                 headers={"Content-Type": "application/json"}, timeout=10)
+    except Exception as e:
+        return False, f"Exception: {e}", None
+    return response.status_code in (400, 422), _status(response), None
+
+
+def build_checks() -> List[Check]:
+    """The union of backend_test.py and final_backend_test.py as a dependency graph"""
+    checks = [
+        endpoint_check("GET /", "GET", "/", (200,), detail=lambda r: f"Service: {r.json().get('service')}"),
+        endpoint_check("GET /health", "GET", "/health", (200,), detail=lambda r: f"Status: {r.json().get('status')}"),
+        endpoint_check("POST /api/auth/login (invalid)", "POST", "/api/auth/login", (400, 401),
+                       {"email": "invalid@test.com", "password": "wrong_password"}),
+        endpoint_check("GET /api/demo/stats", "GET", "/api/demo/stats", (200,),
+                       detail=lambda r: f"Users: {r.json().get('totalUsers')}, Mode: {r.json().get('mode')}"),
+        Check("CORS Headers", _cors),
+        endpoint_check("404 Error Handling", "GET", "/api/nonexistent", (404,)),
+        Check("Malformed JSON Handling", _malformed_json),
+    ]
+    for role, creds in DEMO_CREDENTIALS.items():
+        registration = {"email": f"test_{role}_{hash(role) % 10000}@test.com",
+                        "password": "test_password_123", "role": role.upper()}
+        # Any successful login or registration yields the shared "token" resource
+        checks.append(endpoint_check(f"POST /api/auth/register ({role})", "POST", "/api/auth/register",
+                                     (200, 201), registration, provides="token"))
+        checks.append(endpoint_check(f"POST /api/auth/login ({role})", "POST", "/api/auth/login", (200,),
+                                     creds, provides="token"))
+        checks.append(endpoint_check(f"POST /api/demo/login ({role})", "POST", "/api/demo/login", (200,),
+                                     creds, provides=f"demo_token:{role}"))
+    for method, endpoint in PROTECTED_ENDPOINTS:
+        checks.append(endpoint_check(f"{method} {endpoint} (no auth)", method, endpoint, (401, 403)))
+        checks.append(endpoint_check(f"{method} {endpoint} (with auth)", method, endpoint, (200,), auth="token"))
+        checks.append(endpoint_check(f"{method} {endpoint} (demo au_pair)", method, endpoint, (200,),
+                                     auth="demo_token:au_pair"))
+    for method, endpoint in DEMO_ENDPOINTS:
+        if method == "POST" and "login" in endpoint:
+            continue
+        data = {"email": f"demo_test_{hash('demo') % 10000}@test.com", "password": "demo_password",
+                "role": "AU_PAIR"} if "register" in endpoint else None
+        checks.append(endpoint_check(f"{method} {endpoint}", method, endpoint, (200, 201), data))
+    return checks
+
+
+class SuiteRunner:
+    """Runs checks on a thread pool as soon as the resources they need exist"""
+
+    def __init__(self, checks: List[Check], workers: int = DEFAULT_WORKERS):
+        self.checks = checks
+        self.workers = workers
+        self.ctx = SuiteContext()
+        self.providers = defaultdict(list)
+        for check in checks:
+            if check.provides:
+                self.providers[check.provides].append(check.name)
+        self.finished = set()
+        self.delivered_by: Dict[str, str] = {}
+        self.results: List[Dict] = []
+
+    def _readiness(self, check: Check) -> Optional[str]:
+        """None when runnable, "wait" while a provider may still deliver, else the missing resource"""
+        for need in check.needs:
+            if need in self.ctx.resources:
+                continue
+            if any(name not in self.finished for name in self.providers[need]):
+                return "wait"
+            return need
+        return None
+
+    def _timed(self, check: Check, start: float) -> Tuple[CheckResult, float, float]:
+        began = time.perf_counter() - start
+        try:
+            result = check.run(self.ctx)
+        except Exception as e:
+            result = (False, f"Exception: {e}", None)
+        return result, began, time.perf_counter() - start
+
+    def _record(self, check: Check, success: bool, details: str, began: float, ended: float):
+        """Log a finished check in the backend_test.py format (called from the scheduling thread only)"""
+        status = "✅ PASS" if success else "❌ FAIL"
+        self.results.append({"test": check.name, "status": status, "success": success, "details": details,
+                             "began": began, "ended": ended, "needs": check.needs})
+        self.finished.add(check.name)
+        print(f"{status}: {check.name}")
+        if details:
+            print(f"    Details: {details}")
+
+    def run(self) -> float:
+        """Run every check; returns the wall-clock time in seconds"""
+        start = time.perf_counter()
+        pending = list(self.checks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                for check in list(pending):
+                    state = self._readiness(check)
+                    if state == "wait":
+                        continue
+                    pending.remove(check)
+                    if state is None:
+                        running[executor.submit(self._timed, check, start)] = check
+                    else:
+                        now = time.perf_counter() - start
+                        self._record(check, False, f"Skipped: no provider delivered {state}", now, now)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    check = running.pop(future)
+                    (success, details, value), began, ended = future.result()
+                    if success and check.provides and check.provides not in self.ctx.resources:
+                        self.ctx.resources[check.provides] = value
+                        self.delivered_by[check.provides] = check.name
+                    self._record(check, success, details, began, ended)
+        return time.perf_counter() - start
+
+    def critical_path(self) -> List[Dict]:
+        """Chain of checks ending at the last one to finish, following delivered resources"""
+        by_name = {result["test"]: result for result in self.results}
+        chain = []
+        current = max(self.results, key=lambda result: result["ended"], default=None)
+        while current:
+            chain.append(current)
+            providers = [by_name[self.delivered_by[need]] for need in current["needs"] if need in self.delivered_by]
+            current = max(providers, key=lambda result: result["ended"], default=None)
+        return list(reversed(chain))
+
+
+def print_suite_summary(runner: SuiteRunner, wall: float):
+    results = runner.results
+    passed = sum(1 for result in results if result["success"])
+    print("\n" + "="*50)
+    print("TEST SUMMARY")
+    print("="*50)
+    print(f"Total Tests: {len(results)}")
+    print(f"Passed: {passed}")
+    print(f"Failed: {len(results) - passed}")
+    if results:
+        print(f"Success Rate: {passed / len(results) * 100:.1f}%")
+    failed = [result for result in results if not result["success"]]
+    if failed:
+        print("\nFAILED TESTS:")
+        for result in failed:
+            print(f"  ❌ {result['test']}: {result['details']}")
+
+    chain = runner.critical_path()
+    print("\n" + "="*50)
+    print("SUITE TIMING")
+    print("="*50)
+    print(f"Wall clock: {wall:.2f}s with {runner.workers} workers")
+    print(f"Sum of check durations: {sum(r['ended'] - r['began'] for r in results):.2f}s")
+    print(f"Longest dependency chain: {sum(r['ended'] - r['began'] for r in chain):.2f}s")
+    for result in chain:
+        print(f"    {result['ended'] - result['began']:6.3f}s  {result['test']}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the functional checks in parallel, respecting dependencies")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent checks (1 = sequential)")
+    parser.add_argument("--only", help="run checks whose name contains this text, plus their providers")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    checks = build_checks()
+    if args.only:
+        selected = [check for check in checks if args.only in check.name]
+        needed = {need for check in selected for need in check.needs}
+        checks = [check for check in checks if check in selected or check.provides in needed]
+
+    print("🚀 Starting Au Pair Backend API Tests (parallel)")
+    print(f"Testing against: {BASE_URL}")
+    runner = SuiteRunner(checks, args.workers)
+    wall = runner.run()
+    print_suite_summary(runner, wall)
+    runner.ctx.metrics.print_summary()
+    if not args.no_save:
+        save_run("functional", runner.ctx.metrics, dict(vars(args), base_url=BASE_URL),
+                 {"wall_seconds": wall}, args.label)
+    return 0 if all(result["success"] for result in runner.results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,9 @@ import json
 import sys
 from typing import Dict, Any, Optional
 
+from backend_metrics import RequestMetrics, timed_session
+from backend_transport import PooledTransport, Transport
+
 # Configuration
 BASE_URL = "http://localhost:8001"
 DEMO_CREDENTIALS = {
@@ -16,11 +19,35 @@ DEMO_CREDENTIALS = {
     "host_family": {"email": "mueller@demo.com", "password": "password123"}
 }
 
+# Endpoint lists shared by the functional tests and the load generator
+PROTECTED_ENDPOINTS = [
+    ("GET", "/api/dashboard/stats"),
+    ("GET", "/api/profile/completion"),
+    ("GET", "/api/profiles/completion"),
+    ("GET", "/api/matches/recent"),
+    ("GET", "/api/matches"),
+    ("GET", "/api/conversations"),
+    ("GET", "/api/bookings")
+]
+DEMO_ENDPOINTS = [
+    ("GET", "/api/demo/endpoints"),
+    ("POST", "/api/demo/login"),
+    ("POST", "/api/demo/register"),
+    ("GET", "/api/demo/users/search?role=AU_PAIR"),
+    ("GET", "/api/demo/matches"),
+    ("GET", "/api/demo/messages/conversations"),
+    ("GET", "/api/demo/dashboard/stats"),
+    ("GET", "/api/demo/profiles/completion")
+]
+
 class APITester:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, transport: Transport = None):
+        self.session = timed_session()
+        # Defaults to keep-alive over self.session; see backend_transport for the alternatives
+        self.transport = transport or PooledTransport(session=self.session)
         self.tokens = {}
         self.test_results = []
+        self.metrics = RequestMetrics()
         
     def log_test(self, test_name: str, success: bool, details: str = ""):
         """Log test results"""
@@ -37,22 +64,21 @@ class APITester:
     
     def make_request(self, method: str, endpoint: str, data: Dict = None, 
                     headers: Dict = None, auth_token: str = None) -> requests.Response:
-        """Make HTTP request with optional authentication"""
+        """Make HTTP request with optional authentication, recording its latency"""
         url = f"{BASE_URL}{endpoint}"
         request_headers = headers or {}
+        method = method.upper()
         
         if auth_token:
             request_headers["Authorization"] = f"Bearer {auth_token}"
         
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            return None
+        body = data if method in ("POST", "PUT") else None
+        
         try:
-            if method.upper() == "GET":
-                return self.session.get(url, headers=request_headers, timeout=10)
-            elif method.upper() == "POST":
-                return self.session.post(url, json=data, headers=request_headers, timeout=10)
-            elif method.upper() == "PUT":
-                return self.session.put(url, json=data, headers=request_headers, timeout=10)
-            elif method.upper() == "DELETE":
-                return self.session.delete(url, headers=request_headers, timeout=10)
+            return self.transport.request(self.metrics, method, url, route=endpoint,
+                                          json=body, headers=request_headers, timeout=10)
         except requests.exceptions.Timeout:
             print(f"Request timeout for {method} {endpoint}")
             return None
@@ -134,17 +160,7 @@ class APITester:
         """Test that protected endpoints require authentication"""
         print("\n=== Testing Protected Endpoints (No Auth) ===")
         
-        protected_endpoints = [
-            ("GET", "/api/dashboard/stats"),
-            ("GET", "/api/profile/completion"),
-            ("GET", "/api/profiles/completion"),
-            ("GET", "/api/matches/recent"),
-            ("GET", "/api/matches"),
-            ("GET", "/api/conversations"),
-            ("GET", "/api/bookings")
-        ]
-        
-        for method, endpoint in protected_endpoints:
+        for method, endpoint in PROTECTED_ENDPOINTS:
             response = self.make_request(method, endpoint)
             if response and response.status_code in [401, 403]:
                 self.log_test(f"{method} {endpoint} (no auth)", True, "Correctly requires authentication")
@@ -163,17 +179,7 @@ class APITester:
         # Use the first available token
         token = list(self.tokens.values())[0]
         
-        protected_endpoints = [
-            ("GET", "/api/dashboard/stats"),
-            ("GET", "/api/profile/completion"),
-            ("GET", "/api/profiles/completion"),
-            ("GET", "/api/matches/recent"),
-            ("GET", "/api/matches"),
-            ("GET", "/api/conversations"),
-            ("GET", "/api/bookings")
-        ]
-        
-        for method, endpoint in protected_endpoints:
+        for method, endpoint in PROTECTED_ENDPOINTS:
             response = self.make_request(method, endpoint, auth_token=token)
             if response and response.status_code == 200:
                 self.log_test(f"{method} {endpoint} (with auth)", True, "Successfully accessed with auth")
@@ -185,18 +191,7 @@ class APITester:
         """Test demo-specific endpoints"""
         print("\n=== Testing Demo Endpoints ===")
         
-        demo_endpoints = [
-            ("GET", "/api/demo/endpoints"),
-            ("POST", "/api/demo/login"),
-            ("POST", "/api/demo/register"),
-            ("GET", "/api/demo/users/search?role=AU_PAIR"),
-            ("GET", "/api/demo/matches"),
-            ("GET", "/api/demo/messages/conversations"),
-            ("GET", "/api/demo/dashboard/stats"),
-            ("GET", "/api/demo/profiles/completion")
-        ]
-        
-        for method, endpoint in demo_endpoints:
+        for method, endpoint in DEMO_ENDPOINTS:
             if method == "POST" and "login" in endpoint:
                 response = self.make_request(method, endpoint, DEMO_CREDENTIALS["au_pair"])
             elif method == "POST" and "register" in endpoint:
@@ -246,8 +241,8 @@ class APITester:
         # Test malformed JSON
         try:
             url = f"{BASE_URL}/api/auth/login"
-            response = requests.post(url, data="invalid json", 
-                                   headers={"Content-Type": "application/json"})
+            response = self.transport.request(self.metrics, "POST", url, data="invalid json", 
+                                              headers={"Content-Type": "application/json"})
             if response.status_code in [400, 422]:
                 self.log_test("Malformed JSON Handling", True, "Correctly handles malformed JSON")
             else:
@@ -288,6 +283,8 @@ class APITester:
                 if not result["success"]:
                     print(f"  ❌ {result['test']}: {result['details']}")
         
+        self.metrics.print_summary()
+        
         print("\n🎯 CRITICAL FINDINGS:")
         
         # Check for critical issues
@@ -318,6 +315,10 @@ class APITester:
         return failed_tests == 0
 
 if __name__ == "__main__":
+    # backend_results needs numpy; keep it out of the import path of every tool that uses APITester
+    from backend_results import save_run
+
     tester = APITester()
     success = tester.run_all_tests()
+    save_run("functional", tester.metrics, {"base_url": BASE_URL})
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Pre-authenticated Token Pool for Au Pair Backend Load Tests
+Registers and logs in many distinct demo users concurrently and caches their
+access/refresh tokens on disk with expiry tracking, so load runs warm up in
+seconds and login cost stays out of the measurements for other routes.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+from backend_load import AsyncHTTPClient, AsyncResponse
+from backend_test import BASE_URL
+
+TOKEN_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".token_cache.json")
+POOL_PASSWORD = "password123"
+POOL_EMAIL_DOMAIN = "loadtest.demo"
+POOL_ROLES = ("AU_PAIR", "HOST_FAMILY")
+# Refresh tokens this many seconds before they expire
+REFRESH_MARGIN = 60.0
+DEFAULT_CONCURRENCY = 64
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def token_expiry(token: str) -> float:
+    """Read the exp claim (epoch seconds) from a JWT without verifying it"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+    except (IndexError, ValueError, TypeError):
+        return 0.0
+
+
+def pool_email(index: int) -> str:
+    return f"load_user_{index:06d}@{POOL_EMAIL_DOMAIN}"
+
+
+class TokenPool:
+    """Disk-cached pool of demo users with access and refresh tokens"""
+
+    def __init__(self, base_url: str = BASE_URL, cache_path: str = TOKEN_CACHE_PATH):
+        self.base_url = base_url
+        self.cache_path = cache_path
+        self.users: Dict[str, Dict] = {}
+        self.stats = {"cached": 0, "registered": 0, "logged_in": 0, "refreshed": 0, "failed": 0}
+
+    def load(self):
+        """Load cached users for this base URL, if any"""
+        try:
+            with open(self.cache_path) as f:
+                self.users = json.load(f).get(self.base_url, {})
+        except (OSError, ValueError):
+            self.users = {}
+
+    def save(self):
+        """Write the pool back atomically, keeping entries for other base URLs"""
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self.base_url] = self.users
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _store(self, email: str, role: str, data: Dict):
+        previous = self.users.get(email, {})
+        refresh_token = data.get("refreshToken", previous.get("refreshToken", ""))
+        self.users[email] = {
+            "email": email,
+            "role": role,
+            "id": data.get("user", {}).get("id", previous.get("id")),
+            "accessToken": data["accessToken"],
+            "refreshToken": refresh_token,
+            "accessExpires": token_expiry(data["accessToken"]),
+            "refreshExpires": token_expiry(refresh_token)
+        }
+
+    @staticmethod
+    async def _post(client: AsyncHTTPClient, path: str, payload: Dict) -> Optional[AsyncResponse]:
+        try:
+            return await client.request("POST", path, json.dumps(payload).encode(), JSON_HEADERS)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+
+    async def _acquire(self, client: AsyncHTTPClient, index: int, margin: float):
+        """Make sure pool user #index holds a valid access token"""
+        email = pool_email(index)
+        role = POOL_ROLES[index % len(POOL_ROLES)]
+        cached = self.users.get(email)
+        now = time.time()
+
+        if cached and cached["accessExpires"] - margin > now:
+            self.stats["cached"] += 1
+            return
+        if cached and cached["refreshExpires"] - margin > now:
+            response = await self._post(client, "/api/auth/refresh", {"refreshToken": cached["refreshToken"]})
+            if response and response.status_code == 200:
+                self._store(email, role, response.json())
+                self.stats["refreshed"] += 1
+                return
+
+        credentials = {"email": email, "password": POOL_PASSWORD}
+        if not cached:
+            response = await self._post(client, "/api/demo/register", dict(credentials, role=role))
+            if response and response.status_code == 201:
+                self._store(email, role, response.json())
+                self.stats["registered"] += 1
+                return
+
+        # Already registered (or refresh rejected): fall back to a fresh login
+        response = await self._post(client, "/api/demo/login", credentials)
+        if response and response.status_code == 200:
+            self._store(email, role, response.json())
+            self.stats["logged_in"] += 1
+        else:
+            self.users.pop(email, None)
+            self.stats["failed"] += 1
+
+    async def ensure(self, count: int, concurrency: int = DEFAULT_CONCURRENCY,
+                     margin: float = REFRESH_MARGIN) -> List[Dict]:
+        """Load the cache, top the pool up to count users with fresh tokens and save it"""
+        self.load()
+        client = AsyncHTTPClient(self.base_url, max_connections=concurrency)
+        try:
+            await asyncio.gather(*(self._acquire(client, index, margin) for index in range(count)))
+        finally:
+            await client.close()
+        self.save()
+        return self.active(count)
+
+    def active(self, count: int = None) -> List[Dict]:
+        """Pool users (in index order) whose access token is still valid"""
+        now = time.time()
+        users = [self.users[pool_email(i)] for i in range(count if count is not None else len(self.users))
+                 if pool_email(i) in self.users]
+        return [user for user in users if user["accessExpires"] > now]
+
+    def tokens(self, count: int = None) -> List[str]:
+        return [user["accessToken"] for user in self.active(count)]
+
+
+def pool_tokens(count: int, base_url: str = BASE_URL) -> List[str]:
+    """Access tokens for count pool users, warming the cache as needed"""
+    pool = TokenPool(base_url)
+    return [user["accessToken"] for user in asyncio.run(pool.ensure(count))]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Warm the demo-user token cache for load tests")
+    parser.add_argument("--users", type=int, default=1000, help="number of distinct pool users")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="concurrent register/login/refresh calls")
+    parser.add_argument("--cache", default=TOKEN_CACHE_PATH, help="token cache file")
+    args = parser.parse_args(argv)
+
+    print("🔐 Warming Au Pair token pool")
+    print(f"Testing against: {BASE_URL}")
+
+    pool = TokenPool(BASE_URL, args.cache)
+    start = time.perf_counter()
+    users = asyncio.run(pool.ensure(args.users, args.concurrency))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{len(users)}/{args.users} users ready in {elapsed:.1f}s ({pool.cache_path})")
+    for name, count in pool.stats.items():
+        print(f"    {name}: {count}")
+    return 0 if len(users) == args.users else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
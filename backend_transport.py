@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTTP Transports for the Au Pair Backend Test Harness
+All transports record connect / TTFB / download / total like timed_request and
+count the connections they open and reuse:
+
+    fresh   a new connection per request (requests.get semantics)
+    pooled  a requests.Session keeping up to pool_size keep-alive connections per host
+    raw     a minimal HTTP/1.1 client on plain sockets with its own keep-alive pool
+"""
+
+import abc
+import json
+import socket
+import ssl
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from backend_metrics import RequestMetrics, connections_opened, timed_request, timed_session
+
+DEFAULT_POOL_SIZE = 10
+USER_AGENT = "au-pair-harness/1.0"
+READ_CHUNK = 64 * 1024
+# Responses that never carry a body
+NO_BODY_STATUSES = (204, 304)
+
+
+class Transport(abc.ABC):
+    """Issues requests and records their timings; subclasses decide how connections are made"""
+
+    name = "base"
+
+    def __init__(self):
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, opened: int):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["opened"] += opened
+            self.stats["reused"] += 0 if opened else 1
+
+    @abc.abstractmethod
+    def request(self, metrics: RequestMetrics, method: str, url: str, route: str = None,
+                **kwargs) -> requests.Response:
+        """Send one request, recording its timings in metrics under route (default: the URL)"""
+
+    def close(self):
+        pass
+
+    def connection_summary(self) -> Dict:
+        requests_made = self.stats["requests"]
+        return dict(self.stats, reuse_rate=self.stats["reused"] / requests_made if requests_made else 0.0)
+
+    def print_summary(self):
+        stats = self.connection_summary()
+        print(f"\n🔌 Transport {self.name}: {stats['requests']} requests, {stats['opened']} connections opened, "
+              f"{stats['reused']} reused ({stats['reuse_rate'] * 100:.0f}%)")
+
+
+class FreshTransport(Transport):
+    """A throwaway connection for every request, as bare requests.get() does"""
+
+    name = "fresh"
+
+    def request(self, metrics: RequestMetrics, method: str, url: str, route: str = None,
+                **kwargs) -> requests.Response:
+        try:
+            return timed_request(metrics, method, url, route=route, **kwargs)
+        finally:
+            self._count(connections_opened())
+
+
+class PooledTransport(Transport):
+    """requests.Session with a keep-alive pool of pool_size connections per host"""
+
+    name = "pooled"
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, session: requests.Session = None):
+        super().__init__()
+        self.session = session or timed_session(pool_size)
+
+    def request(self, metrics: RequestMetrics, method: str, url: str, route: str = None,
+                **kwargs) -> requests.Response:
+        try:
+            return timed_request(metrics, method, url, session=self.session, route=route, **kwargs)
+        finally:
+            self._count(connections_opened())
+
+    def close(self):
+        self.session.close()
+
+
+class RawResponse:
+    """The parts of requests.Response the harness reads"""
+
+    def __init__(self, url: str, status_code: int, headers: CaseInsensitiveDict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def __bool__(self) -> bool:
+        # requests.Response is falsy for error statuses; callers rely on it
+        return self.ok
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class RawTransport(Transport):
+    """HTTP/1.1 over plain sockets with a LIFO keep-alive pool per host.
+
+    Skips requests/urllib3 entirely (no Session, adapters or header merging), so
+    what remains is the backend plus the socket round trips. Raises the same
+    requests exceptions as the other transports so callers need no changes.
+    """
+
+    name = "raw"
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        super().__init__()
+        self.pool_size = pool_size
+        self._idle: Dict[Tuple[str, str, int], deque] = {}
+        self._ssl = ssl.create_default_context()
+
+    def _connect(self, key: Tuple[str, str, int], timeout: Optional[float]) -> socket.socket:
+        scheme, host, port = key
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if scheme == "https":
+            sock = self._ssl.wrap_socket(sock, server_hostname=host)
+        return sock
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Optional[socket.socket]:
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _release(self, key: Tuple[str, str, int], sock: socket.socket):
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.pool_size:
+                idle.append(sock)
+                return
+        sock.close()
+
+    @staticmethod
+    def _encode(method: str, parts, headers: Dict, body: bytes) -> bytes:
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        merged = CaseInsensitiveDict({"Host": parts.netloc, "User-Agent": USER_AGENT, "Accept": "*/*",
+                                      "Accept-Encoding": "identity", "Connection": "keep-alive"})
+        # Caller headers replace defaults of the same name, as requests merges them
+        merged.update(headers)
+        merged.pop("Content-Length", None)
+        if body or method in ("POST", "PUT", "PATCH"):
+            merged["Content-Length"] = str(len(body))
+        lines = [f"{method} {target} HTTP/1.1"] + [f"{name}: {value}" for name, value in merged.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    @staticmethod
+    def _read_response(reader, method: str) -> Tuple[int, CaseInsensitiveDict, bytes, float, bool]:
+        """(status, headers, body, first-byte time, connection reusable)"""
+        status_line = reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        first_byte = time.perf_counter()
+        version, status, _ = status_line.decode("latin-1").split(" ", 2)
+        headers = CaseInsensitiveDict()
+        while True:
+            line = reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip()] = value.strip()
+
+        status_code = int(status)
+        reusable = version == "HTTP/1.1" and headers.get("Connection", "").lower() != "close"
+        if method == "HEAD" or status_code in NO_BODY_STATUSES or 100 <= status_code < 200:
+            return status_code, headers, b"", first_byte, reusable
+        if headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(reader.readline().split(b";")[0], 16)
+                if size == 0:
+                    while reader.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(reader.read(size))
+                reader.readline()
+            body = b"".join(chunks)
+        elif "Content-Length" in headers:
+            length = int(headers["Content-Length"])
+            body = reader.read(length)
+            if len(body) != length:
+                raise ConnectionResetError("connection closed mid-body")
+        else:
+            # No framing: the body runs until the server closes the connection
+            body = reader.read()
+            reusable = False
+        return status_code, headers, body, first_byte, reusable
+
+    def _exchange(self, key, payload: bytes, method: str, timeout: Optional[float]):
+        """Send payload on a pooled connection, reconnecting once if the server closed it while idle.
+
+        Counts the request and the connections it opened even when it fails.
+        """
+        sock = self._acquire(key)
+        opened, connect = 0, 0.0
+        try:
+            while True:
+                reused = sock is not None
+                if not reused:
+                    start = time.perf_counter()
+                    opened += 1
+                    sock = self._connect(key, timeout)
+                    connect += time.perf_counter() - start
+                sock.settimeout(timeout)
+                reader = sock.makefile("rb", buffering=READ_CHUNK)
+                try:
+                    sock.sendall(payload)
+                    status_code, headers, body, first_byte, reusable = self._read_response(reader, method)
+                except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError):
+                    sock.close()
+                    if not reused:
+                        raise
+                    # The backend closed this connection while it sat in the pool (keep-alive timeout)
+                    with self._lock:
+                        self.stats["stale"] += 1
+                    sock = None
+                    continue
+                except BaseException:
+                    sock.close()
+                    raise
+                finally:
+                    reader.close()
+                if reusable:
+                    self._release(key, sock)
+                else:
+                    sock.close()
+                return status_code, headers, body, first_byte, connect
+        finally:
+            self._count(opened)
+
+    def request(self, metrics: RequestMetrics, method: str, url: str, route: str = None,
+                **kwargs) -> RawResponse:
+        """Same keyword arguments as requests (json, data, headers, timeout); others are ignored"""
+        method = method.upper()
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        headers = dict(kwargs.get("headers") or {})
+        timeout = kwargs.get("timeout")
+        if kwargs.get("json") is not None:
+            body = json.dumps(kwargs["json"]).encode()
+            headers.setdefault("Content-Type", "application/json")
+        else:
+            data = kwargs.get("data")
+            body = data.encode() if isinstance(data, str) else (data or b"")
+        payload = self._encode(method, parts, headers, body)
+        route = route or url
+
+        start = time.perf_counter()
+        try:
+            status_code, response_headers, content, first_byte, connect = \
+                self._exchange(key, payload, method, timeout)
+        except (socket.timeout, TimeoutError) as e:
+            metrics.record_error(method, route, "Timeout", {"total": time.perf_counter() - start})
+            raise requests.exceptions.Timeout(str(e)) from e
+        except (OSError, ValueError) as e:
+            metrics.record_error(method, route, "ConnectionError", {"total": time.perf_counter() - start})
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        done = time.perf_counter()
+        metrics.record(method, route, status_code, {
+            "total": done - start,
+            "connect": connect,
+            "ttfb": first_byte - start,
+            "download": done - first_byte
+        })
+        return RawResponse(url, status_code, response_headers, content)
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                while idle:
+                    idle.pop().close()
+            self._idle.clear()
+
+
+TRANSPORTS = {"fresh": FreshTransport, "pooled": PooledTransport, "raw": RawTransport}
+
+
+def make_transport(name: str, pool_size: int = DEFAULT_POOL_SIZE) -> Transport:
+    """Build a transport by name: fresh, pooled or raw"""
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {name!r}, expected one of {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[name]() if name == "fresh" else TRANSPORTS[name](pool_size)
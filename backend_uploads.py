@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Streaming Document-upload Benchmark for Au Pair Backend
+Streams generated files to /api/documents/upload as chunked multipart bodies from
+many concurrent uploaders, never holding a whole file in client memory. Reports
+MB/s, per-upload latency and backend RSS growth per concurrency level, and
+extrapolates the concurrency a single instance can take within a memory budget.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from backend_metrics import RequestMetrics, timed_request, timed_session
+from backend_load import login_for_load
+from backend_resources import ResourceSampler, find_listener_pid
+from backend_results import save_run
+from backend_test import BASE_URL
+
+UPLOAD_ENDPOINT = "/api/documents/upload"
+DEFAULT_SIZES_MB = "1,5,9"
+DEFAULT_CONCURRENCY = "1,4,16,32"
+DEFAULT_MEMORY_BUDGET_MB = 512.0
+CHUNK_SIZE = 64 * 1024
+SAMPLE_INTERVAL = 0.2
+UPLOAD_TIMEOUT = 120.0
+MB = 1024 * 1024
+# Growth below this is allocator noise rather than buffered upload data
+MIN_RSS_GROWTH_MB = 4.0
+# Accepted by the multer fileFilter in backend/src/utils/supabase.ts
+FILE_MIMETYPE = "application/pdf"
+DOCUMENT_TYPE = "ID"
+
+# One random block reused for every chunk keeps generation cheap and memory flat
+_BLOCK = os.urandom(CHUNK_SIZE)
+
+
+def multipart_stream(boundary: str, fields: Dict[str, str], filename: str, size: int,
+                     sent: List[int]) -> Iterator[bytes]:
+    """Yield a multipart/form-data body chunk by chunk; sent[0] counts file bytes"""
+    for name, value in fields.items():
+        yield (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+               f"{value}\r\n").encode()
+    yield (f"--{boundary}\r\nContent-Disposition: form-data; name=\"document\"; filename=\"{filename}\"\r\n"
+           f"Content-Type: {FILE_MIMETYPE}\r\n\r\n").encode()
+    remaining = size
+    while remaining > 0:
+        chunk = _BLOCK[:min(CHUNK_SIZE, remaining)]
+        remaining -= len(chunk)
+        sent[0] += len(chunk)
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+class UploadRun:
+    """Outcome of one concurrency level and file size"""
+
+    def __init__(self, concurrency: int, size_mb: float):
+        self.concurrency = concurrency
+        self.size_mb = size_mb
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.elapsed = 0.0
+        self.rss_before: Optional[float] = None
+        self.rss_peak: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return f"c={self.concurrency} {self.size_mb:g}MB"
+
+    def record(self, status: str, latency: float, sent: int):
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_sent += sent
+
+    def summary(self) -> Dict:
+        ordered = sorted(self.latencies)
+        pick = lambda pct: ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)] * 1000 if ordered else 0.0
+        growth = self.rss_peak - self.rss_before if self.rss_peak is not None and self.rss_before is not None else None
+        return {
+            "uploads": len(self.latencies),
+            "statuses": dict(self.statuses),
+            "mb_per_s": self.bytes_sent / MB / self.elapsed if self.elapsed else 0.0,
+            "throughput": len(self.latencies) / self.elapsed if self.elapsed else 0.0,
+            "p50": pick(50), "p99": pick(99),
+            "mean": statistics.fmean(ordered) * 1000 if ordered else 0.0,
+            "rss_before_mb": self.rss_before, "rss_peak_mb": self.rss_peak, "rss_growth_mb": growth,
+            # Memory held per in-flight upload, the basis for the concurrency estimate
+            "rss_per_upload_mb": growth / self.concurrency if growth is not None else None,
+        }
+
+
+def upload_once(metrics: RequestMetrics, session: requests.Session, token: Optional[str],
+                size: int, run: UploadRun):
+    """Stream one generated file and record its latency and outcome"""
+    boundary = uuid.uuid4().hex
+    sent = [0]
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    body = multipart_stream(boundary, {"type": DOCUMENT_TYPE}, f"bench-{boundary[:8]}.pdf", size, sent)
+    start = time.perf_counter()
+    try:
+        response = timed_request(metrics, "POST", f"{BASE_URL}{UPLOAD_ENDPOINT}", session=session,
+                                 route=f"{UPLOAD_ENDPOINT} [{run.name}]", data=body, headers=headers,
+                                 timeout=UPLOAD_TIMEOUT)
+        status = str(response.status_code)
+    except requests.exceptions.RequestException as e:
+        status = type(e).__name__
+    run.record(status, time.perf_counter() - start, sent[0])
+
+
+def _rss(samples: List[Dict]) -> Optional[float]:
+    values = [s.get("rss_mb") or s.get("node_rss_mb") for s in samples]
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def run_level(metrics: RequestMetrics, token: Optional[str], concurrency: int, size_mb: float,
+              uploads: int, sampler: Optional[ResourceSampler]) -> UploadRun:
+    """Run `uploads` uploads of size_mb with `concurrency` uploaders while sampling RSS.
+
+    RSS rarely shrinks after a level, so growth is measured from the level's own
+    starting point; run small levels first for the most conservative estimate.
+    """
+    run = UploadRun(concurrency, size_mb)
+    size = int(size_mb * MB)
+    if sampler:
+        time.sleep(SAMPLE_INTERVAL * 2)
+        run.rss_before = _rss(sampler.samples[-1:])
+        sampler.phase = run.name
+
+    local = threading.local()
+
+    def worker(_):
+        if not hasattr(local, "session"):
+            local.session = timed_session()
+        upload_once(metrics, local.session, token, size, run)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(uploads)))
+    run.elapsed = time.perf_counter() - start
+    if sampler:
+        time.sleep(SAMPLE_INTERVAL)
+        run.rss_peak = _rss([sample for sample in sampler.samples if sample["phase"] == run.name])
+        sampler.phase = None
+    return run
+
+
+def max_concurrency(runs: List[UploadRun], budget_mb: float) -> Optional[Dict]:
+    """Extrapolate the uploads a single instance can hold within budget_mb of RSS"""
+    measured = [run for run in runs if (run.summary()["rss_growth_mb"] or 0) >= MIN_RSS_GROWTH_MB]
+    if not measured:
+        return None
+    worst = max(measured, key=lambda run: run.summary()["rss_per_upload_mb"] / run.size_mb)
+    stats = worst.summary()
+    headroom = budget_mb - stats["rss_before_mb"]
+    return {"size_mb": worst.size_mb, "per_upload_mb": stats["rss_per_upload_mb"],
+            "concurrency": max(int(headroom / stats["rss_per_upload_mb"]), 0)}
+
+
+def print_upload_summary(runs: List[UploadRun], budget_mb: float):
+    print("\n" + "="*50)
+    print("DOCUMENT UPLOAD SUMMARY")
+    print("="*50)
+    for run in runs:
+        stats = run.summary()
+        ok = sum(count for status, count in stats["statuses"].items() if status.isdigit() and int(status) < 400)
+        status = "✅" if ok == stats["uploads"] else "⚠️ "
+        print(f"\n{status} {run.name}: {stats['uploads']} uploads, {stats['mb_per_s']:.1f} MB/s, "
+              f"{stats['throughput']:.2f} uploads/s")
+        print(f"    Latency (ms): p50 {stats['p50']:.0f}  p99 {stats['p99']:.0f}  mean {stats['mean']:.0f}")
+        print(f"    Statuses: {stats['statuses']}")
+        if stats["rss_growth_mb"] is not None:
+            print(f"    Backend RSS: {stats['rss_before_mb']:.0f}MB -> peak {stats['rss_peak_mb']:.0f}MB "
+                  f"(+{stats['rss_growth_mb']:.0f}MB, {stats['rss_per_upload_mb']:.1f}MB per in-flight upload)")
+
+    estimate = max_concurrency(runs, budget_mb)
+    if estimate:
+        print(f"\n🎯 Within {budget_mb:.0f}MB RSS: ~{estimate['concurrency']} concurrent "
+              f"{estimate['size_mb']:g}MB uploads ({estimate['per_upload_mb']:.1f}MB each)")
+    elif any(run.rss_peak is not None for run in runs):
+        print(f"\n✅ No level grew backend RSS by {MIN_RSS_GROWTH_MB:g}MB or more; uploads are not buffered in memory")
+    else:
+        print("\n⚠️  Backend process not found locally; RSS growth and the concurrency estimate are unavailable")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent streaming upload benchmark for /api/documents/upload")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES_MB, help="comma-separated file sizes in MB")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="comma-separated uploader counts")
+    parser.add_argument("--uploads", type=int, default=0,
+                        help="uploads per level (default: 4 per uploader)")
+    parser.add_argument("--pid", type=int, help="backend process id (default: the local listener on the BASE_URL port)")
+    parser.add_argument("--memory-budget", type=float, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="RSS budget in MB for the concurrency estimate")
+    parser.add_argument("--label", help="label the saved run, e.g. baseline")
+    parser.add_argument("--no-save", action="store_true", help="do not record the run in the results store")
+    args = parser.parse_args(argv)
+
+    pid = args.pid or find_listener_pid(urlsplit(BASE_URL).port or 80)
+    print("🚀 Starting Au Pair document upload benchmark")
+    print(f"Testing against: {BASE_URL}, backend pid: {pid or 'not found'}")
+    token = login_for_load()
+
+    metrics = RequestMetrics()
+    sampler = ResourceSampler(pid, SAMPLE_INTERVAL) if pid else None
+    runs = []
+    if sampler:
+        sampler.start()
+    try:
+        for size_mb in (float(size) for size in args.sizes.split(",") if size):
+            for concurrency in (int(level) for level in args.concurrency.split(",") if level):
+                uploads = args.uploads or concurrency * 4
+                print(f"\n▶️  {uploads} uploads of {size_mb:g}MB with {concurrency} uploaders")
+                runs.append(run_level(metrics, token, concurrency, size_mb, uploads, sampler))
+    finally:
+        if sampler:
+            sampler.stop()
+
+    print_upload_summary(runs, args.memory_budget)
+    metrics.print_summary()
+    if not args.no_save:
+        summary = {f"POST {UPLOAD_ENDPOINT} [{run.name}]": run.summary() for run in runs}
+        save_run("upload", metrics, dict(vars(args), base_url=BASE_URL), summary, args.label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,11 +4,16 @@ Final Comprehensive Backend API Test for Au Pair Application
 Tests the actual working functionality in demo mode
 """
 
-import requests
 import json
 import sys
 
+from backend_metrics import RequestMetrics
+from backend_transport import PooledTransport
+
 BASE_URL = "http://localhost:8001"
+METRICS = RequestMetrics()
+# One keep-alive pool for the whole run instead of a new connection per call
+TRANSPORT = PooledTransport()
 
 def test_comprehensive_backend():
     """Run comprehensive backend tests"""
@@ -21,7 +26,7 @@ def test_comprehensive_backend():
     # 1. Basic Endpoints
     print("\n1. BASIC ENDPOINTS")
     try:
-        response = requests.get(f"{BASE_URL}/", timeout=10)
+        response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}/", timeout=10)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ GET / - {data['service']} v{data['version']}")
@@ -34,7 +39,7 @@ def test_comprehensive_backend():
         results.append(("Basic API", False))
     
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=10)
+        response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}/health", timeout=10)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ GET /health - {data['status']}")
@@ -53,7 +58,7 @@ def test_comprehensive_backend():
     # Demo Login
     try:
         login_data = {"email": "sarah@demo.com", "password": "password123"}
-        response = requests.post(f"{BASE_URL}/api/demo/login", json=login_data, timeout=10)
+        response = TRANSPORT.request(METRICS, "POST", f"{BASE_URL}/api/demo/login", json=login_data, timeout=10)
         if response.status_code == 200:
             data = response.json()
             demo_token = data.get('accessToken')
@@ -73,7 +78,7 @@ def test_comprehensive_backend():
             "password": "test123",
             "role": "AU_PAIR"
         }
-        response = requests.post(f"{BASE_URL}/api/demo/register", json=reg_data, timeout=10)
+        response = TRANSPORT.request(METRICS, "POST", f"{BASE_URL}/api/demo/register", json=reg_data, timeout=10)
         if response.status_code == 201:
             data = response.json()
             print(f"✅ Demo Registration - User: {data['user']['email']}")
@@ -90,7 +95,7 @@ def test_comprehensive_backend():
     
     # Demo Stats
     try:
-        response = requests.get(f"{BASE_URL}/api/demo/stats", timeout=10)
+        response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}/api/demo/stats", timeout=10)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Demo Stats - Users: {data['totalUsers']}, Mode: {data['mode']}")
@@ -104,7 +109,7 @@ def test_comprehensive_backend():
     
     # Demo User Search
     try:
-        response = requests.get(f"{BASE_URL}/api/demo/users/search?role=AU_PAIR", timeout=10)
+        response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}/api/demo/users/search?role=AU_PAIR", timeout=10)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Demo User Search - Found: {data['total']} users")
@@ -130,7 +135,7 @@ def test_comprehensive_backend():
     auth_required_working = True
     for endpoint in protected_endpoints:
         try:
-            response = requests.get(f"{BASE_URL}{endpoint}", timeout=10)
+            response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}{endpoint}", timeout=10)
             if response.status_code == 401:
                 print(f"✅ {endpoint} - Correctly requires auth")
             else:
@@ -147,7 +152,7 @@ def test_comprehensive_backend():
     
     try:
         login_data = {"email": "sarah@demo.com", "password": "password123"}
-        response = requests.post(f"{BASE_URL}/api/auth/login", json=login_data, timeout=10)
+        response = TRANSPORT.request(METRICS, "POST", f"{BASE_URL}/api/auth/login", json=login_data, timeout=10)
         if response.status_code == 401:
             print("✅ Regular Auth - Correctly fails without Supabase")
             results.append(("Regular Auth Validation", True))
@@ -163,7 +168,7 @@ def test_comprehensive_backend():
     
     try:
         headers = {"Origin": "https://au-pair.netlify.app"}
-        response = requests.get(f"{BASE_URL}/health", headers=headers, timeout=10)
+        response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}/health", headers=headers, timeout=10)
         cors_header = response.headers.get("Access-Control-Allow-Origin")
         if cors_header:
             print(f"✅ CORS Headers - Origin allowed: {cors_header}")
@@ -180,7 +185,7 @@ def test_comprehensive_backend():
     
     # 404 handling
     try:
-        response = requests.get(f"{BASE_URL}/api/nonexistent", timeout=10)
+        response = TRANSPORT.request(METRICS, "GET", f"{BASE_URL}/api/nonexistent", timeout=10)
         if response.status_code == 404:
             print("✅ 404 Handling - Correctly returns 404 for non-existent endpoints")
             results.append(("Error Handling", True))
@@ -210,6 +215,9 @@ def test_comprehensive_backend():
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"  {status}: {test_name}")
     
+    METRICS.print_summary()
+    TRANSPORT.print_summary()
+    
     # Critical Assessment
     print("\n🎯 CRITICAL ASSESSMENT:")
     
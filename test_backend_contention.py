@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for backend_contention
+Double-booking detection over a throwaway bookings table.
+"""
+
+import sqlite3
+
+from backend_contention import find_double_bookings
+
+
+def test_find_double_bookings(tmp_path):
+    db_path = str(tmp_path / "dev.db")
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE bookings (id TEXT, auPairId TEXT, startDate, endDate, status TEXT)")
+    connection.executemany("INSERT INTO bookings VALUES (?, ?, ?, ?, ?)", [
+        ("a", "p1", "2025-07-01T00:00:00Z", "2025-07-05T00:00:00Z", "APPROVED"),
+        ("b", "p1", "2025-07-04T00:00:00Z", "2025-07-08T00:00:00Z", "PENDING"),
+        # Touches b's end: the route's inclusive comparison calls that a conflict
+        ("c", "p1", "2025-07-08T00:00:00Z", "2025-07-09T00:00:00Z", "APPROVED"),
+        ("d", "p1", "2025-07-02T00:00:00Z", "2025-07-03T00:00:00Z", "CANCELLED"),
+        ("e", "p2", "2025-07-01T00:00:00Z", "2025-07-05T00:00:00Z", "APPROVED"),
+        ("f", "p3", "2025-07-01T00:00:00Z", "2025-07-05T00:00:00Z", "APPROVED"),
+    ])
+    connection.commit()
+    connection.close()
+
+    active, overlaps = find_double_bookings(db_path, [{"id": "p1"}, {"id": "p2"}])
+    assert active == 4
+    assert sorted(overlaps) == [("p1", "a", "b"), ("p1", "b", "c")]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline Tests for the Au Pair Backend Test Harness
+Runs backend_test.py, backend_suite.py and a scenario journey against the
+in-memory stand-in (backend_standin) on an ephemeral port, so no Node backend
+is needed.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+import backend_scenarios
+import backend_suite
+import backend_test
+import backend_tokens
+from backend_standin import StandinServer
+
+
+@pytest.fixture
+def standin_url():
+    """Serve a fresh StandinServer on 127.0.0.1:<ephemeral> from a background event loop.
+
+    Each test gets its own: the functional runs register fixed accounts.
+    """
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(StandinServer().handle, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+@pytest.fixture
+def base_url(standin_url, monkeypatch, tmp_path):
+    # Modules copy BASE_URL at import, so point every copy the runs read at the stand-in
+    for module in (backend_test, backend_suite, backend_scenarios):
+        monkeypatch.setattr(module, "BASE_URL", standin_url)
+    # Pool accounts exist only in this stand-in; keep their tokens out of the repo's cache
+    monkeypatch.setattr(backend_scenarios, "TokenPool",
+                        lambda url: backend_tokens.TokenPool(url, str(tmp_path / "tokens.json")))
+    return standin_url
+
+
+def test_backend_test_against_standin(base_url):
+    tester = backend_test.APITester()
+    tester.run_all_tests()
+    passed = {result["test"] for result in tester.test_results if result["success"]}
+    assert {"GET /", "GET /health"} <= passed
+    assert any("login" in name.lower() for name in passed)
+    assert any("demo" in name.lower() for name in passed)
+    assert tester.metrics.routes
+
+
+def test_backend_suite_against_standin(base_url):
+    assert backend_suite.main(["--no-save"]) == 0
+
+
+def test_booking_journey_against_standin(base_url):
+    journey = next(journey for journey in backend_scenarios.DEFAULT_SCENARIO["journeys"]
+                   if journey["name"] == "browse_and_book")
+    # Short think times so every user gets through the journey once within the run
+    steps = [dict(step, think=0.1) for step in journey["steps"]]
+    scenario = {"journeys": [dict(journey, steps=steps)]}
+    result = asyncio.run(backend_scenarios.run_scenario(scenario, users=2, duration=1.0, ramp=0.0))
+
+    assert result.failed == {}
+    assert result.journeys["browse_and_book"]["completed"] >= 2
+    for step, status in (("send_message", 201), ("create_booking", 201), ("booking_detail", 200)):
+        assert result.metrics.routes[f"browse_and_book/{step}"]["statuses"][status] >= 2
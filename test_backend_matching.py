@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for backend_matching
+The vectorized score matrix against a scalar port of calculateMatchScore.
+"""
+
+import math
+import random
+
+from backend_matching import DAY_MS, YEAR_MS, ProfileTables, score_matrix
+
+
+def reference_score(au_pair: dict, host: dict, now_ms: float) -> int:
+    """calculateMatchScore (backend/src/utils/matching.ts) one pair at a time"""
+    preferred = [language.lower() for language in host["preferredLanguages"]]
+    common = [language for language in au_pair["languages"] if language.lower() in preferred]
+    score = (len(common) / len(preferred) * 100 if preferred else 100) * 0.3
+    if host["country"] in au_pair["preferredCountries"]:
+        score += 25
+
+    children = host["childrenAges"]
+    if au_pair["dateOfBirth"] is None or not children:
+        age_score = 50
+    else:
+        age = math.floor((now_ms - au_pair["dateOfBirth"]) / YEAR_MS)
+        if any(a <= 10 for a in children) and 18 <= age <= 30:
+            age_score = 100
+        elif any(a >= 11 for a in children) and 20 <= age <= 35:
+            age_score = 100
+        else:
+            age_score = 70 if 18 <= age <= 35 else 30
+    score += age_score * 0.2
+
+    start, end = au_pair["availableFrom"], au_pair["availableTo"]
+    if start is None or end is None:
+        availability = 50
+    elif start <= now_ms <= end:
+        availability = 100
+    else:
+        days = abs(now_ms - start) / DAY_MS
+        availability = 80 if days <= 30 else 60 if days <= 90 else 30 if days <= 180 else 10
+    score += availability * 0.15
+
+    rate, budget = au_pair["hourlyRate"], host["maxBudget"]
+    if not rate or not budget:
+        budget_score = 50
+    elif rate <= budget:
+        budget_score = 100
+    else:
+        budget_score = 70 if rate / budget <= 1.2 else 40 if rate / budget <= 1.5 else 10
+    score += budget_score * 0.1
+    # Math.round rounds halves up
+    return math.floor(score + 0.5)
+
+
+def test_score_matrix_matches_scalar_reference():
+    rng = random.Random(7)
+    now_ms = 1_750_000_000_000.0
+    languages = ["English", "spanish", "French", "german", "italian"]
+    countries = ["US", "DE", "FR", "ES"]
+    au_pairs = [{
+        "userId": f"au_pair_{i}",
+        "languages": rng.sample(languages, rng.randint(1, 3)),
+        "preferredCountries": rng.sample(countries, rng.randint(0, 2)),
+        "dateOfBirth": rng.choice([None, now_ms - rng.uniform(16, 40) * YEAR_MS]),
+        "availableFrom": rng.choice([None, now_ms + rng.uniform(-200, 200) * DAY_MS]),
+        "availableTo": now_ms + rng.uniform(-100, 400) * DAY_MS,
+        "hourlyRate": rng.choice([None, 10.0, 12.0, 15.0, 18.0, 24.0]),
+    } for i in range(60)]
+    hosts = [{
+        "userId": f"host_{j}",
+        "country": rng.choice(countries),
+        "preferredLanguages": [language.lower() for language in rng.sample(languages, rng.randint(0, 3))],
+        "childrenAges": [rng.randint(0, 17) for _ in range(rng.randint(0, 3))],
+        "maxBudget": rng.choice([None, 10.0, 12.0, 16.0]),
+    } for j in range(40)]
+
+    matrix = score_matrix(ProfileTables(au_pairs, hosts), now_ms, block_rows=16)
+    expected = [[reference_score(au_pair, host, now_ms) for host in hosts] for au_pair in au_pairs]
+    assert matrix.tolist() == expected
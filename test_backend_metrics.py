@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for backend_metrics
+LatencyHistogram precision and merging.
+"""
+
+import random
+
+import pytest
+
+from backend_metrics import LatencyHistogram
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 100_001):
+        histogram.record(value)
+    assert histogram.total_count == 100_000
+    # Two significant figures: reported values are within 1% of the exact percentile
+    for pct in (50, 90, 99, 99.9):
+        exact = pct / 100 * 100_000
+        assert abs(histogram.value_at_percentile(pct) - exact) <= exact * 0.01
+    assert histogram.value_at_percentile(100) == histogram.max_value()
+
+
+def test_histogram_merge_matches_single_histogram():
+    rng = random.Random(1)
+    values = [int(rng.expovariate(1 / 5000)) for _ in range(5000)]
+    combined, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for index, value in enumerate(values):
+        combined.record(value)
+        (left if index % 2 else right).record(value)
+    left.merge(right)
+    assert list(left.counts) == list(combined.counts)
+    assert left.percentiles_ms() == combined.percentiles_ms()
+    with pytest.raises(ValueError):
+        left.merge(LatencyHistogram(significant_figures=3))
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Tests for backend_results
+The Mann-Whitney U test used for regression gating.
+"""
+
+import numpy as np
+import pytest
+
+from backend_results import mann_whitney
+
+
+def test_mann_whitney_matches_pairwise_count():
+    base = np.array([3, 5, 2, 0, 1])
+    new = np.array([0, 2, 4, 3, 1])
+    # U counts (new, base) pairs where new is higher, ties as half
+    u = sum(n * b * (1.0 if i > j else 0.5 if i == j else 0.0)
+            for i, n in enumerate(new) for j, b in enumerate(base))
+    result = mann_whitney(base, new)
+    assert result["p_slower"] == pytest.approx(u / (new.sum() * base.sum()))
+    assert result["p_value"] < 0.05
+    assert mann_whitney(new, base)["p_value"] > 0.95
+
+
+def test_mann_whitney_identical_samples():
+    counts = np.array([10, 40, 30, 20])
+    result = mann_whitney(counts, counts)
+    assert result["p_slower"] == pytest.approx(0.5)
+    assert result["p_value"] == pytest.approx(0.5)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Tests for backend_soak
+Drift detection over per-window soak rows.
+"""
+
+import pytest
+
+from backend_soak import MIN_DRIFT_WINDOWS, detect_drift
+
+
+def drift_rows(p99, rss):
+    return [{"hours": index / 6, "p99": p99(index), "rss_mb": rss(index), "heap_mb": None}
+            for index in range(MIN_DRIFT_WINDOWS + 5)]
+
+
+def test_detect_drift_flags_growing_memory_only():
+    rows = drift_rows(lambda i: 20.0 + (i % 2), lambda i: 200.0 + 10 * i)
+    findings = {finding["metric"]: finding for finding in detect_drift(rows, warmup=2)}
+    assert set(findings) == {"p99", "rss_mb"}
+    assert not findings["p99"]["drifting"]
+    assert findings["rss_mb"]["drifting"]
+    assert findings["rss_mb"]["per_hour"] == pytest.approx(60.0)
+
+
+def test_detect_drift_needs_enough_windows_after_warmup():
+    rows = drift_rows(lambda i: 20.0, lambda i: 200.0 + 10 * i)
+    assert detect_drift(rows, warmup=len(rows) - MIN_DRIFT_WINDOWS + 1) == []